@@ -3,7 +3,7 @@ Admin API routes for LearnAid.
 Handles faculty and student management, departments, and system administration.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import List, Optional
@@ -13,10 +13,12 @@ from app.core.database import get_db
 from app.core.security import get_password_hash
 from app.models.user import User, UserRole, Department, Student, Faculty
 from app.models.course import Course
+from app.services.user_service import DepartmentService
 from app.schemas.user import (
     DepartmentCreate, DepartmentUpdate, DepartmentResponse,
     StudentCreate, StudentUpdate, StudentResponse,
     FacultyCreate, FacultyUpdate, FacultyResponse,
+    StudentListItem, FacultyListItem, STUDENT_LIST_ADAPTER, FACULTY_LIST_ADAPTER,
     UserResponse, UserStats, DashboardSummary
 )
 
@@ -72,8 +74,8 @@ async def get_departments(
 ):
     """Get all departments."""
     try:
-        departments = db.query(Department).offset(skip).limit(limit).all()
-        return departments
+        departments = DepartmentService(db).get_all_departments_cached()
+        return departments[skip:skip + limit]
     except Exception as e:
         logger.error(f"Error fetching departments: {e}")
         raise HTTPException(
@@ -89,7 +91,7 @@ async def get_department(
 ):
     """Get a specific department."""
     try:
-        department = db.query(Department).filter(Department.id == department_id).first()
+        department = DepartmentService(db).get_department(department_id)
         if not department:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -153,8 +155,8 @@ async def create_faculty(
     try:
         # Check if user already exists
         existing_user = db.query(User).filter(
-            (User.email == faculty_data.email) |
-            (User.username == faculty_data.username)
+            (func.lower(User.email) == faculty_data.email.lower()) |
+            (func.lower(User.username) == faculty_data.username.lower())
         ).first()
         
         if existing_user:
@@ -216,7 +218,7 @@ async def create_faculty(
         )
 
 
-@router.get("/faculty", response_model=List[FacultyResponse])
+@router.get("/faculty", response_model=List[FacultyListItem])
 async def get_faculty(
     department_id: Optional[int] = Query(None),
     skip: int = Query(0, ge=0),
@@ -225,13 +227,24 @@ async def get_faculty(
 ):
     """Get all faculty members."""
     try:
-        query = db.query(Faculty)
+        # One joined row per faculty member instead of lazy-loading user/department
+        query = db.query(
+            Faculty.id, Faculty.user_id, Faculty.employee_id, Faculty.designation,
+            Faculty.qualification, Faculty.specialization, Faculty.experience_years,
+            Faculty.office_location, Faculty.office_hours, Faculty.created_at,
+            User.email, User.username, User.full_name, User.is_active,
+            Faculty.department_id,
+            Department.name.label("department_name"),
+            Department.code.label("department_code")
+        ).join(User, Faculty.user_id == User.id)\
+            .join(Department, Faculty.department_id == Department.id)
         
         if department_id:
             query = query.filter(Faculty.department_id == department_id)
         
-        faculty = query.offset(skip).limit(limit).all()
-        return faculty
+        rows = query.offset(skip).limit(limit).all()
+        faculty = FACULTY_LIST_ADAPTER.validate_python([row._mapping for row in rows])
+        return Response(content=FACULTY_LIST_ADAPTER.dump_json(faculty), media_type="application/json")
     except Exception as e:
         logger.error(f"Error fetching faculty: {e}")
         raise HTTPException(
@@ -274,8 +287,8 @@ async def create_student(
     try:
         # Check if user already exists
         existing_user = db.query(User).filter(
-            (User.email == student_data.email) |
-            (User.username == student_data.username)
+            (func.lower(User.email) == student_data.email.lower()) |
+            (func.lower(User.username) == student_data.username.lower())
         ).first()
         
         if existing_user:
@@ -336,7 +349,7 @@ async def create_student(
         )
 
 
-@router.get("/students", response_model=List[StudentResponse])
+@router.get("/students", response_model=List[StudentListItem])
 async def get_students(
     department_id: Optional[int] = Query(None),
     class_name: Optional[str] = Query(None),
@@ -347,7 +360,17 @@ async def get_students(
 ):
     """Get all students with optional filters."""
     try:
-        query = db.query(Student)
+        # One joined row per student instead of lazy-loading user/department
+        query = db.query(
+            Student.id, Student.user_id, Student.student_id, Student.class_name,
+            Student.semester, Student.academic_year, Student.cgpa, Student.batch_year,
+            Student.total_points, Student.current_streak, Student.created_at,
+            User.email, User.username, User.full_name, User.is_active,
+            Student.department_id,
+            Department.name.label("department_name"),
+            Department.code.label("department_code")
+        ).join(User, Student.user_id == User.id)\
+            .join(Department, Student.department_id == Department.id)
         
         if department_id:
             query = query.filter(Student.department_id == department_id)
@@ -356,8 +379,9 @@ async def get_students(
         if semester:
             query = query.filter(Student.semester == semester)
         
-        students = query.offset(skip).limit(limit).all()
-        return students
+        rows = query.offset(skip).limit(limit).all()
+        students = STUDENT_LIST_ADAPTER.validate_python([row._mapping for row in rows])
+        return Response(content=STUDENT_LIST_ADAPTER.dump_json(students), media_type="application/json")
     except Exception as e:
         logger.error(f"Error fetching students: {e}")
         raise HTTPException(
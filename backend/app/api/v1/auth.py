@@ -6,6 +6,7 @@ Handles user login, registration, token refresh, and password management.
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from sqlalchemy import func
 from datetime import timedelta
 import logging
 
@@ -37,10 +38,11 @@ async def login_json(
     Accepts username/email and password via JSON, returns JWT tokens.
     """
     try:
-        # Find user by username or email
+        # Find user by username or email (case-insensitive, served by the lower() indexes)
+        identifier = login_request.username.lower()
         user = db.query(User).filter(
-            (User.username == login_request.username) | 
-            (User.email == login_request.username)
+            (func.lower(User.username) == identifier) | 
+            (func.lower(User.email) == identifier)
         ).first()
         
         if not user:
@@ -108,10 +110,11 @@ async def login_form(
     Accepts username/email and password via form data, returns JWT tokens.
     """
     try:
-        # Find user by username or email
+        # Find user by username or email (case-insensitive, served by the lower() indexes)
+        identifier = form_data.username.lower()
         user = db.query(User).filter(
-            (User.username == form_data.username) | 
-            (User.email == form_data.username)
+            (func.lower(User.username) == identifier) | 
+            (func.lower(User.email) == identifier)
         ).first()
         
         if not user:
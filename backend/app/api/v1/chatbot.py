@@ -2,7 +2,7 @@
 Chatbot API endpoints for student self-learning
 """
 from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel
@@ -46,12 +46,12 @@ class ChatHistoryResponse(BaseModel):
 # Initialize router
 router = APIRouter(prefix="/api/v1/chatbot", tags=["chatbot"])
 
-@router.post("/ask")
+@router.post("/ask", response_model=ChatMessageResponse)
 async def ask_chatbot(
     request: ChatMessageRequest,
     student_id: int,
     db: Session = Depends(get_db)
-) -> ChatMessageResponse:
+):
     """
     Ask the AI chatbot a question about course materials
     """
@@ -71,34 +71,36 @@ async def ask_chatbot(
         )
         
         # Convert sources to dict format
-        sources = []
-        for source in rag_response.sources:
-            sources.append({
+        sources = [
+            {
                 'content': source.content,
                 'score': source.score,
                 'source_file': source.source_file,
                 'chapter_name': source.chapter_name,
                 'course_id': source.course_id
-            })
+            }
+            for source in rag_response.sources
+        ]
         
-        return ChatMessageResponse(
-            session_id=session_id,
-            message=request.message,
-            response=rag_response.answer,
-            sources=sources,
-            confidence=rag_response.confidence,
-            processing_time=rag_response.processing_time
-        )
+        # Serialize the plain dict with orjson instead of re-validating a response model
+        return ORJSONResponse({
+            'session_id': session_id,
+            'message': request.message,
+            'response': rag_response.answer,
+            'sources': sources,
+            'confidence': rag_response.confidence,
+            'processing_time': rag_response.processing_time
+        })
         
     except Exception as e:
         logger.error(f"Error processing chatbot request: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to process message: {str(e)}")
 
-@router.get("/history/{session_id}")
+@router.get("/history/{session_id}", response_model=ChatHistoryResponse)
 async def get_chat_history(
     session_id: str,
     db: Session = Depends(get_db)
-) -> ChatHistoryResponse:
+):
     """
     Get chat history for a session
     """
@@ -108,25 +110,26 @@ async def get_chat_history(
         if not session:
             raise HTTPException(status_code=404, detail="Chat session not found")
         
-        # Convert messages to dict format
-        messages = []
-        for msg in session.messages:
-            messages.append({
-                'message_id': msg.message_id,
+        # Convert messages to dict format; orjson writes datetimes as ISO 8601
+        messages = [
+            {
+                'message_id': f"{session.session_id}_{msg.message_id}",
                 'content': msg.content,
                 'role': msg.role,
-                'timestamp': msg.timestamp.isoformat(),
+                'timestamp': msg.timestamp,
                 'metadata': msg.metadata
-            })
+            }
+            for msg in session.messages
+        ]
         
-        return ChatHistoryResponse(
-            session_id=session.session_id,
-            student_id=session.student_id,
-            course_id=session.course_id,
-            messages=messages,
-            created_at=session.created_at.isoformat(),
-            updated_at=session.updated_at.isoformat()
-        )
+        return ORJSONResponse({
+            'session_id': session.session_id,
+            'student_id': session.student_id,
+            'course_id': session.course_id,
+            'messages': messages,
+            'created_at': session.created_at,
+            'updated_at': session.updated_at
+        })
         
     except HTTPException:
         raise
@@ -3,7 +3,8 @@ Faculty API routes for LearnAid.
 Handles course management, exam creation, student performance tracking.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Response
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import func, and_, desc
 from typing import List, Optional
@@ -23,7 +24,9 @@ from app.schemas.course import (
     ChapterCreate, ChapterUpdate, ChapterResponse,
     ExamCreate, ExamUpdate, ExamResponse,
     StudentResponseBulkCreate, ExamResultsSummary,
-    FacultyDashboard, FacultyDashboardStats, CourseAnalytics
+    FacultyDashboard, FacultyDashboardStats, FacultyDashboardData, FacultyDashboardStatsData,
+    CourseAnalytics,
+    COURSE_LIST_ADAPTER, EXAM_LIST_ADAPTER
 )
 
 logger = logging.getLogger(__name__)
@@ -137,24 +140,28 @@ async def get_faculty_courses(
                     {
                         "id": chapter.id,
                         "title": chapter.title,
+                        "chapter_number": chapter.chapter_number,
                         "description": chapter.description,
-                        "content": chapter.content,
-                        "order_index": chapter.order_index,
+                        "learning_objectives": chapter.learning_objectives,
                         "estimated_hours": chapter.estimated_hours,
                         "course_id": chapter.course_id,
-                        "file_path": chapter.file_path,
-                        "file_size": chapter.file_size,
+                        "pdf_file_path": chapter.pdf_file_path,
+                        "content_summary": chapter.content_summary,
+                        "key_topics": chapter.key_topics,
+                        "is_published": chapter.is_published,
                         "upload_date": chapter.upload_date,
-                        "is_active": chapter.is_active,
-                        "created_at": chapter.created_at
+                        "created_at": chapter.created_at,
+                        "updated_at": chapter.updated_at
                     }
-                    for chapter in sorted(course.chapters, key=lambda x: x.order_index)
-                ],
-                "total_chapters": len(course.chapters)
+                    for chapter in sorted(course.chapters, key=lambda x: x.chapter_number)
+                ]
             }
             result.append(course_dict)
         
-        return result
+        return Response(
+            content=COURSE_LIST_ADAPTER.dump_json(COURSE_LIST_ADAPTER.validate_python(result)),
+            media_type="application/json"
+        )
     
     except Exception as e:
         logger.error(f"Error fetching faculty courses: {e}")
@@ -203,9 +210,9 @@ async def create_course(
             for chapter_data in course.chapters:
                 db_chapter = Chapter(
                     title=chapter_data.title,
+                    chapter_number=chapter_data.chapter_number,
                     description=chapter_data.description,
-                    content=chapter_data.content,
-                    order_index=chapter_data.order_index,
+                    learning_objectives=chapter_data.learning_objectives,
                     estimated_hours=chapter_data.estimated_hours,
                     course_id=db_course.id
                 )
@@ -249,20 +256,21 @@ async def create_course(
                 {
                     "id": chapter.id,
                     "title": chapter.title,
+                    "chapter_number": chapter.chapter_number,
                     "description": chapter.description,
-                    "content": chapter.content,
-                    "order_index": chapter.order_index,
+                    "learning_objectives": chapter.learning_objectives,
                     "estimated_hours": chapter.estimated_hours,
                     "course_id": chapter.course_id,
-                    "file_path": chapter.file_path,
-                    "file_size": chapter.file_size,
+                    "pdf_file_path": chapter.pdf_file_path,
+                    "content_summary": chapter.content_summary,
+                    "key_topics": chapter.key_topics,
+                    "is_published": chapter.is_published,
                     "upload_date": chapter.upload_date,
-                    "is_active": chapter.is_active,
-                    "created_at": chapter.created_at
+                    "created_at": chapter.created_at,
+                    "updated_at": chapter.updated_at
                 }
-                for chapter in sorted(course_with_relations.chapters, key=lambda x: x.order_index)
-            ],
-            "total_chapters": len(course_with_relations.chapters)
+                for chapter in sorted(course_with_relations.chapters, key=lambda x: x.chapter_number)
+            ]
         }
         
     except HTTPException:
@@ -341,20 +349,21 @@ async def update_course(
                 {
                     "id": chapter.id,
                     "title": chapter.title,
+                    "chapter_number": chapter.chapter_number,
                     "description": chapter.description,
-                    "content": chapter.content,
-                    "order_index": chapter.order_index,
+                    "learning_objectives": chapter.learning_objectives,
                     "estimated_hours": chapter.estimated_hours,
                     "course_id": chapter.course_id,
-                    "file_path": chapter.file_path,
-                    "file_size": chapter.file_size,
+                    "pdf_file_path": chapter.pdf_file_path,
+                    "content_summary": chapter.content_summary,
+                    "key_topics": chapter.key_topics,
+                    "is_published": chapter.is_published,
                     "upload_date": chapter.upload_date,
-                    "is_active": chapter.is_active,
-                    "created_at": chapter.created_at
+                    "created_at": chapter.created_at,
+                    "updated_at": chapter.updated_at
                 }
-                for chapter in sorted(course_with_relations.chapters, key=lambda x: x.order_index)
-            ],
-            "total_chapters": len(course_with_relations.chapters)
+                for chapter in sorted(course_with_relations.chapters, key=lambda x: x.chapter_number)
+            ]
         }
         
     except HTTPException:
@@ -392,9 +401,9 @@ async def create_chapter(
         # Create chapter
         db_chapter = Chapter(
             title=chapter.title,
+            chapter_number=chapter.chapter_number,
             description=chapter.description,
-            content=chapter.content,
-            order_index=chapter.order_index,
+            learning_objectives=chapter.learning_objectives,
             estimated_hours=chapter.estimated_hours,
             course_id=course_id
         )
@@ -403,20 +412,7 @@ async def create_chapter(
         db.commit()
         db.refresh(db_chapter)
         
-        return {
-            "id": db_chapter.id,
-            "title": db_chapter.title,
-            "description": db_chapter.description,
-            "content": db_chapter.content,
-            "order_index": db_chapter.order_index,
-            "estimated_hours": db_chapter.estimated_hours,
-            "course_id": db_chapter.course_id,
-            "file_path": db_chapter.file_path,
-            "file_size": db_chapter.file_size,
-            "upload_date": db_chapter.upload_date,
-            "is_active": db_chapter.is_active,
-            "created_at": db_chapter.created_at
-        }
+        return db_chapter
         
     except HTTPException:
         raise
@@ -473,8 +469,7 @@ async def upload_chapter_pdf(
         
         # Update chapter with file information
         file_size = os.path.getsize(file_path)
-        chapter.file_path = str(file_path)
-        chapter.file_size = file_size
+        chapter.pdf_file_path = str(file_path)
         chapter.upload_date = datetime.utcnow()
         
         db.commit()
@@ -556,12 +551,14 @@ async def get_faculty_exams(
                         } if question.chapter else None
                     }
                     for question in sorted(exam.questions, key=lambda x: x.question_number)
-                ],
-                "total_questions": len(exam.questions)
+                ]
             }
             result.append(exam_dict)
         
-        return result
+        return Response(
+            content=EXAM_LIST_ADAPTER.dump_json(EXAM_LIST_ADAPTER.validate_python(result)),
+            media_type="application/json"
+        )
         
     except Exception as e:
         logger.error(f"Error fetching faculty exams: {e}")
@@ -593,7 +590,7 @@ async def create_exam(
         # Create exam
         db_exam = Exam(
             name=exam.name,
-            exam_type=exam.exam_type.value,
+            exam_type=exam.exam_type,
             exam_date=exam.exam_date,
             duration_minutes=exam.duration_minutes,
             total_marks=exam.total_marks,
@@ -668,8 +665,7 @@ async def create_exam(
                     }
                 }
                 for question in sorted(exam_with_relations.questions, key=lambda x: x.question_number)
-            ],
-            "total_questions": len(exam_with_relations.questions)
+            ]
         }
         
     except HTTPException:
@@ -774,7 +770,7 @@ async def get_faculty_dashboard(
             .filter(Course.faculty_id == faculty_id)\
             .scalar() or 0
         
-        stats = {
+        stats: FacultyDashboardStatsData = {
             "total_courses": total_courses,
             "active_courses": active_courses,
             "total_students": total_students,
@@ -806,7 +802,7 @@ async def get_faculty_dashboard(
             .limit(5)\
             .all()
         
-        return {
+        dashboard: FacultyDashboardData = {
             "stats": stats,
             "recent_courses": [
                 {
@@ -869,9 +865,15 @@ async def get_faculty_dashboard(
                 "Review pending exam submissions",
                 "Update course materials",
                 "Prepare next week's lectures"
-            ]
+            ],
+            "department_name": None,
+            "enrolled_students": 0,
+            "total_chapters": 0
         }
         
+        # Built from trusted ORM rows; FacultyDashboard only documents the shape
+        return ORJSONResponse(dashboard)
+        
     except Exception as e:
         logger.error(f"Error fetching faculty dashboard: {e}")
         raise HTTPException(
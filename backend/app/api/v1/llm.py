@@ -4,13 +4,13 @@ Handles file uploads, question generation, and task creation
 """
 
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends
-from fastapi.responses import JSONResponse
-from typing import List, Dict, Any, Optional
+from fastapi.responses import JSONResponse, ORJSONResponse
+from typing import List, Dict, Any, Optional, Literal
 import logging
 from pydantic import BaseModel
 
 from app.services.llm_service import llm_service
-from app.services.pdf_service import pdf_service
+from app.services.pdf_service import pdf_service, read_upload_chunks
 # from app.services.task_service import task_generator  # Not implemented yet
 from app.core.database import get_db
 from sqlalchemy.orm import Session
@@ -24,7 +24,7 @@ class QuestionGenerationRequest(BaseModel):
     content: str
     topic: str
     num_questions: int = 5
-    difficulty: str = "medium"
+    difficulty: Literal["easy", "medium", "hard"] = "medium"
 
 class QuestionGenerationResponse(BaseModel):
     success: bool
@@ -61,24 +61,12 @@ async def generate_questions(request: QuestionGenerationRequest):
             difficulty=request.difficulty
         )
         
-        # Convert Pydantic models to dictionaries
-        questions_dict = [
-            {
-                "question": q.question,
-                "options": q.options,
-                "correct_answer": q.correct_answer,
-                "explanation": q.explanation,
-                "difficulty": q.difficulty,
-                "chapter_topic": q.chapter_topic
-            }
-            for q in questions
-        ]
-        
-        return QuestionGenerationResponse(
-            success=True,
-            questions=questions_dict,
-            message=f"Generated {len(questions)} questions successfully"
-        )
+        # Serialize the plain dict with orjson instead of re-validating a response model
+        return ORJSONResponse({
+            "success": True,
+            "questions": [q.model_dump() for q in questions],
+            "message": f"Generated {len(questions)} questions successfully"
+        })
         
     except Exception as e:
         logger.error(f"Question generation failed: {e}")
@@ -107,13 +95,9 @@ async def upload_pdf(
         raise HTTPException(status_code=400, detail="Only PDF files are allowed")
     
     try:
-        # Read file content
-        file_content = await file.read()
-        logger.info(f"Read file content: {len(file_content)} bytes")
-        
-        # Process the PDF with vector database integration
+        # Process the PDF with vector database integration, streaming the upload to disk
         processing_result = await pdf_service.upload_and_process_pdf(
-            file_content=file_content,
+            file_stream=read_upload_chunks(file),
             filename=file.filename,
             course_id=int(course_id),  # Convert string to int
             chapter_name=chapter_name,
@@ -154,15 +138,16 @@ async def upload_pdf(
                 logger.warning(f"Question generation failed, but PDF processing succeeded: {e}")
                 generated_questions_count = 0
         
-        return PDFUploadResponse(
-            success=True,
-            content_id=processing_result.get("file_info", {}).get("file_path", ""),
-            filename=file.filename,
-            text_length=processing_result.get("processing_info", {}).get("content_length", 0),
-            chunk_count=processing_result.get("processing_info", {}).get("chunks_created", 0),
-            generated_questions=generated_questions_count,
-            message=f"PDF processed successfully. Generated {generated_questions_count} questions. Stored {processing_result.get('processing_info', {}).get('chunks_created', 0)} chunks in vector database."
-        )
+        chunks_created = processing_result.get("processing_info", {}).get("chunks_created", 0)
+        return ORJSONResponse({
+            "success": True,
+            "content_id": processing_result.get("file_info", {}).get("file_path", ""),
+            "filename": file.filename,
+            "text_length": processing_result.get("processing_info", {}).get("content_length", 0),
+            "chunk_count": chunks_created,
+            "generated_questions": generated_questions_count,
+            "message": f"PDF processed successfully. Generated {generated_questions_count} questions. Stored {chunks_created} chunks in vector database."
+        })
         
     except HTTPException:
         raise
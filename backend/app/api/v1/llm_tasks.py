@@ -4,15 +4,16 @@ LLM Tasks API - Handles task generation, PDF processing, and LLM integration
 from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, UploadFile, File, Form
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Literal
 from pydantic import BaseModel
 import logging
 
 from app.core.database import get_db
 from app.models.course import Course, Chapter
 from app.models.task import Task, TaskQuestion
-from app.services.llm_service import GroqLLMService, MCQQuestion
-from app.services.pdf_service import PDFProcessingService
+from app.schemas.course import StudentPerformanceAnalysis
+from app.services.llm_service import llm_service, MCQQuestion
+from app.services.pdf_service import PDFProcessingService, read_upload_chunks
 from app.services.task_service import TaskGenerationService
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
@@ -31,7 +32,6 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 # Initialize services
-llm_service = GroqLLMService()
 pdf_service = PDFProcessingService()
 task_generator = TaskGenerationService()
 
@@ -39,13 +39,13 @@ task_generator = TaskGenerationService()
 class MCQGenerationRequest(BaseModel):
     content: str
     num_questions: int = 5
-    difficulty: str = "medium"
+    difficulty: Literal["easy", "medium", "hard"] = "medium"
     chapter_topic: Optional[str] = None
 
 class GenerateTaskRequest(BaseModel):
     student_id: int
     course_id: int
-    task_type: str  # "improvement", "reinforcement", "challenge"
+    task_type: Literal["improvement", "reinforcement", "challenge"]
 
 class TaskGenerationResponse(BaseModel):
     success: bool
@@ -130,12 +130,9 @@ async def upload_chapter_pdf(
         if not course:
             raise HTTPException(status_code=404, detail="Course not found")
         
-        # Read file content
-        file_content = await file.read()
-        
-        # Save PDF file
+        # Stream PDF file to disk
         file_path = await pdf_service.save_uploaded_file(
-            file_content=file_content,
+            file_stream=read_upload_chunks(file),
             filename=file.filename,
             course_id=course_id,
             chapter_name=chapter_name
@@ -203,13 +200,6 @@ async def generate_personalized_task(
     Generate a personalized task for a student based on their performance
     """
     try:
-        # Validate request
-        if request.task_type not in ["improvement", "reinforcement", "challenge"]:
-            raise HTTPException(
-                status_code=400, 
-                detail="Task type must be 'improvement', 'reinforcement', or 'challenge'"
-            )
-        
         # Generate task
         task_id = await task_generator.generate_personalized_task(
             db=db,
@@ -249,10 +239,11 @@ async def analyze_student_performance(
     """
     try:
         analysis = await task_generator.analyze_student_performance(db, student_id)
+        analysis = StudentPerformanceAnalysis.model_validate(analysis)
         
         return JSONResponse({
             "success": True,
-            "data": analysis
+            "data": analysis.model_dump(mode="json")
         })
         
     except Exception as e:
@@ -322,8 +313,10 @@ async def get_task_generation_stats(
                 "total_tasks": total_tasks,
                 "active_tasks": active_tasks,
                 "total_questions": total_questions,
-                "task_types": [{"type": t[0], "count": t[1]} for t in task_types],
-                "difficulty_distribution": [{"level": d[0], "count": d[1]} for d in difficulty_dist]
+                "task_types": [{"type": t[0].value, "count": t[1]} for t in task_types],
+                "difficulty_distribution": [
+                    {"level": d[0].value if d[0] else None, "count": d[1]} for d in difficulty_dist
+                ]
             }
         })
         
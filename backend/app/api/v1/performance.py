@@ -5,9 +5,10 @@ Handles student performance tracking, weak chapter identification, and task assi
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
+from sqlalchemy import and_
 from typing import List, Optional
 from app.core.database import get_db
-from app.models.exam import StudentChapterPerformance, ExamResult, ExamResponse
+from app.models.exam import StudentChapterPerformance, StudentChapterPerf, ExamResult, ExamResponse
 from app.models.task import TaskAssignment, Task
 from app.models.user import Student
 from app.models.course import Chapter, Course
@@ -209,16 +210,19 @@ async def auto_assign_tasks_to_weak_students(
     """
     try:
         # Get all weak students for the course/chapter
-        weak_students = await get_weak_students_by_chapter(
-            course_id=course_id,
-            chapter_id=chapter_id,
-            threshold=performance_threshold,
-            db=db
-        )
+        if db.get_bind().dialect.name == "postgresql":
+            weak_students = _weak_students_from_view(course_id, chapter_id, performance_threshold, db)
+        else:
+            weak_students = (await get_weak_students_by_chapter(
+                course_id=course_id,
+                chapter_id=chapter_id,
+                threshold=performance_threshold,
+                db=db
+            ))["weak_students"]
         
         assignments_created = 0
         
-        for weak_student in weak_students["weak_students"]:
+        for weak_student in weak_students:
             if weak_student["needs_task_assignment"]:
                 # Find available tasks for this chapter
                 available_tasks = db.query(Task).filter(
@@ -272,6 +276,48 @@ async def auto_assign_tasks_to_weak_students(
         raise HTTPException(status_code=500, detail="Failed to auto-assign tasks")
 
 
+def _weak_students_from_view(course_id: int, chapter_id: Optional[int], threshold: float, db: Session) -> List[dict]:
+    """
+    Read weak (student, chapter) pairs from the mv_student_chapter_perf materialized view.
+    Task bookkeeping still comes from StudentChapterPerformance when a record exists.
+    """
+    query = db.query(
+        StudentChapterPerf.student_id,
+        StudentChapterPerf.chapter_id,
+        StudentChapterPerf.avg_pct,
+        Chapter.title,
+        StudentChapterPerformance.tasks_assigned,
+        StudentChapterPerformance.next_task_due_date
+    ).join(
+        Chapter, Chapter.id == StudentChapterPerf.chapter_id
+    ).outerjoin(
+        StudentChapterPerformance,
+        and_(
+            StudentChapterPerformance.student_id == StudentChapterPerf.student_id,
+            StudentChapterPerformance.chapter_id == StudentChapterPerf.chapter_id
+        )
+    ).filter(
+        Chapter.course_id == course_id,
+        StudentChapterPerf.avg_pct < threshold
+    )
+    
+    if chapter_id:
+        query = query.filter(StudentChapterPerf.chapter_id == chapter_id)
+    
+    now = datetime.utcnow()
+    return [
+        {
+            "student_id": row.student_id,
+            "chapter_id": row.chapter_id,
+            "chapter_title": row.title,
+            "performance_percentage": row.avg_pct,
+            "needs_task_assignment": not row.tasks_assigned or
+                                     (row.next_task_due_date is not None and row.next_task_due_date <= now)
+        }
+        for row in query.all()
+    ]
+
+
 async def _initialize_student_performance(student_id: int, course_id: Optional[int], db: Session):
     """
     Initialize student performance records based on existing exam results.
@@ -4,7 +4,7 @@ Handles student course access, CIA results, task retrieval, and performance trac
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, load_only
 from typing import List, Optional
 from datetime import datetime, timedelta
 import logging
@@ -97,8 +97,14 @@ async def get_student_dashboard(
         
         # Get pending tasks
         pending_assignments = db.query(TaskAssignment).options(
-            joinedload(TaskAssignment.task).joinedload(Task.course),
-            joinedload(TaskAssignment.task).joinedload(Task.chapter)
+            joinedload(TaskAssignment.task).options(
+                load_only(
+                    Task.id, Task.title, Task.course_id, Task.chapter_id,
+                    Task.task_type, Task.difficulty_level, Task.time_limit_minutes
+                ),
+                joinedload(Task.course),
+                joinedload(Task.chapter)
+            )
         ).filter(
             TaskAssignment.student_id == student_id,
             TaskAssignment.is_completed == False,
@@ -376,7 +382,7 @@ async def get_student_tasks(
                     "total_questions": task.total_questions,
                     "time_limit_minutes": task.time_limit_minutes,
                     "study_time_minutes": task.study_time_minutes,
-                    "study_material": task.study_material
+                    "study_material": task.load_study_material()
                 },
                 "assignment": {
                     "assigned_date": assignment.assigned_date,
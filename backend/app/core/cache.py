@@ -0,0 +1,97 @@
+"""
+Redis cache helpers for LearnAid.
+Caching is optional: without the redis package or a configured REDIS_URL
+every helper degrades to a cache miss / no-op.
+"""
+
+from functools import lru_cache
+from typing import Any, Optional
+import json
+import logging
+
+from app.core.config import settings
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+    logging.warning("Redis client not available. Install redis to enable caching.")
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache()
+def get_redis_client():
+    """Get cached Redis client, or None when caching is disabled."""
+    if not REDIS_AVAILABLE or not settings.redis_url:
+        return None
+
+    try:
+        return redis.Redis.from_url(settings.redis_url)
+    except Exception as e:
+        logger.error(f"Failed to create Redis client: {e}")
+        return None
+
+
+def cache_get_json(key: str) -> Optional[Any]:
+    """Return the decoded JSON value stored under key, or None on miss."""
+    client = get_redis_client()
+    if client is None:
+        return None
+
+    try:
+        raw = client.get(key)
+        return json.loads(raw) if raw is not None else None
+    except Exception as e:
+        logger.warning(f"Cache read failed for {key}: {e}")
+        return None
+
+
+def cache_set_json(key: str, value: Any, ttl_seconds: int) -> None:
+    """Store value as JSON under key with a TTL."""
+    client = get_redis_client()
+    if client is None:
+        return
+
+    try:
+        client.set(key, json.dumps(value, default=str), ex=ttl_seconds)
+    except Exception as e:
+        logger.warning(f"Cache write failed for {key}: {e}")
+
+
+def cache_get_bytes(key: str) -> Optional[bytes]:
+    """Return the raw value stored under key, or None on miss."""
+    client = get_redis_client()
+    if client is None:
+        return None
+
+    try:
+        return client.get(key)
+    except Exception as e:
+        logger.warning(f"Cache read failed for {key}: {e}")
+        return None
+
+
+def cache_set_bytes(key: str, value: bytes, ttl_seconds: int) -> None:
+    """Store a raw value under key with a TTL."""
+    client = get_redis_client()
+    if client is None:
+        return
+
+    try:
+        client.set(key, value, ex=ttl_seconds)
+    except Exception as e:
+        logger.warning(f"Cache write failed for {key}: {e}")
+
+
+def cache_delete(*keys: str) -> None:
+    """Delete keys from the cache."""
+    client = get_redis_client()
+    if client is None or not keys:
+        return
+
+    try:
+        client.delete(*keys)
+    except Exception as e:
+        logger.warning(f"Cache delete failed for {keys}: {e}")
@@ -44,6 +44,11 @@ class Settings(BaseSettings):
     embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
     vector_db_path: str = "vector_db"
     
+    # Cache Configuration (optional)
+    redis_url: Optional[str] = None
+    department_cache_ttl_seconds: int = 3600
+    chat_session_ttl_seconds: int = 86400
+    
     def get_allowed_origins_list(self) -> List[str]:
         """Get allowed origins as a list."""
         try:
@@ -2,8 +2,10 @@
 Database configuration and session management for LearnAid.
 """
 
-from sqlalchemy import create_engine, MetaData
+from sqlalchemy import create_engine, MetaData, event, DateTime
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.sql.expression import FunctionElement
 from sqlalchemy.orm import sessionmaker
 from app.core.config import get_database_config, settings
 import logging
@@ -23,12 +25,41 @@ engine = create_engine(
     connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
 )
 
+# SQLite only enforces ON DELETE CASCADE with foreign keys switched on
+if "sqlite" in DATABASE_URL:
+    @event.listens_for(engine, "connect")
+    def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Create Base class for declarative models
 Base = declarative_base()
 
+
+class utcnow(FunctionElement):
+    """Current UTC time as a naive timestamp, for server-side column defaults.
+
+    The application compares timestamps against datetime.utcnow(); PostgreSQL's
+    now() follows the session time zone, so convert explicitly.
+    """
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _utcnow_default(element, compiler, **kw):
+    # SQLite's CURRENT_TIMESTAMP is already UTC
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(utcnow, "postgresql")
+def _utcnow_postgresql(element, compiler, **kw):
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
 # Metadata for database operations
 metadata = MetaData()
 
@@ -42,6 +73,11 @@ def create_tables():
         # Create all tables
         Base.metadata.create_all(bind=engine)
         logger.info("Database tables created successfully")
+        
+        # Extend the monthly task_responses partitions on existing databases too
+        if task.PARTITION_TASK_RESPONSES:
+            with engine.begin() as conn:
+                task.ensure_task_response_partitions(conn)
     except Exception as e:
         logger.error(f"Error creating database tables: {e}")
         raise
@@ -0,0 +1,51 @@
+"""
+Content storage for large text blobs in LearnAid.
+Keeps bulky task material on disk and stores only a URI in the database row.
+"""
+
+from pathlib import Path
+from typing import Optional
+import hashlib
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ContentStorage:
+    """Filesystem-backed blob storage addressed by content hash."""
+
+    def __init__(self, root_directory: str):
+        self.root = Path(root_directory)
+
+    def save_text(self, category: str, content: Optional[str]) -> Optional[str]:
+        """Write text under a category and return its URI (None for empty content)."""
+        if not content:
+            return None
+
+        data = content.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.root / category / f"{digest}.txt"
+
+        # Content-addressed: identical material is written once
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+
+        return path.as_posix()
+
+    def load_text(self, uri: Optional[str]) -> Optional[str]:
+        """Read text back from a URI produced by save_text."""
+        if not uri:
+            return None
+
+        try:
+            return Path(uri).read_text(encoding="utf-8")
+        except OSError as e:
+            logger.error(f"Failed to load content from {uri}: {e}")
+            return None
+
+
+# Global instance
+content_storage = ContentStorage(str(Path(settings.upload_directory) / "content"))
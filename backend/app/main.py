@@ -7,6 +7,7 @@ from fastapi import FastAPI, HTTPException, Depends, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.staticfiles import StaticFiles
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 import logging
 from pathlib import Path
@@ -15,6 +16,7 @@ from pathlib import Path
 from app.core.config import settings
 from app.core.database import create_tables, get_db
 from app.core.security import verify_token
+from app.services.pdf_service import shutdown_pdf_pool
 
 # Import API routers
 from app.api.v1 import auth, admin, faculty, student
@@ -64,6 +66,9 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down LearnAid application...")
+    
+    # Stop PDF extraction workers so reloads don't leave them behind
+    shutdown_pdf_pool()
 
 
 # Create FastAPI application
@@ -73,6 +78,7 @@ app = FastAPI(
     description="Intelligent Learning & Performance Support System",
     docs_url="/api/docs" if settings.debug else None,
     redoc_url="/api/redoc" if settings.debug else None,
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -8,10 +8,10 @@ from .user import User, UserRole, Department, Student, Faculty
 from .course import Course, Chapter, CourseEnrollment
 from .exam import (
     Exam, ExamType, ExamQuestion, ExamResult, 
-    ExamResponse, StudentChapterPerformance
+    ExamResponse, StudentChapterPerformance, StudentChapterPerf
 )
 from .task import (
-    Task, TaskType, TaskDifficulty, TaskQuestion,
+    Task, TaskType, TaskDifficulty, QuestionType, TaskPriority, TaskQuestion,
     TaskAssignment, TaskAttempt, TaskResponse
 )
 
@@ -25,9 +25,9 @@ __all__ = [
     
     # Exam models
     "Exam", "ExamType", "ExamQuestion", "ExamResult", 
-    "ExamResponse", "StudentChapterPerformance",
+    "ExamResponse", "StudentChapterPerformance", "StudentChapterPerf",
     
     # Task models
-    "Task", "TaskType", "TaskDifficulty", "TaskQuestion",
+    "Task", "TaskType", "TaskDifficulty", "QuestionType", "TaskPriority", "TaskQuestion",
     "TaskAssignment", "TaskAttempt", "TaskResponse"
 ]
\ No newline at end of file
@@ -5,8 +5,7 @@ Includes Course, Chapter, and enrollment models.
 
 from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Float
 from sqlalchemy.orm import relationship
-from app.core.database import Base
-from datetime import datetime
+from app.core.database import Base, utcnow
 
 
 class Course(Base):
@@ -34,8 +33,8 @@ class Course(Base):
     max_students = Column(Integer, default=60)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow())
     
     # Relationships
     department = relationship("Department", back_populates="courses")
@@ -78,8 +77,8 @@ class Chapter(Base):
     upload_date = Column(DateTime, nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow())
     
     # Relationships
     course = relationship("Course", back_populates="chapters")
@@ -103,7 +102,7 @@ class CourseEnrollment(Base):
     course_id = Column(Integer, ForeignKey("courses.id"), nullable=False)
     
     # Enrollment details
-    enrollment_date = Column(DateTime, default=datetime.utcnow)
+    enrollment_date = Column(DateTime, server_default=utcnow())
     status = Column(String(20), default="active")  # active, completed, dropped
     
     # Academic progress
@@ -117,8 +116,8 @@ class CourseEnrollment(Base):
     grade = Column(String(2), nullable=True)  # A+, A, B+, etc.
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow())
     
     # Relationships
     student = relationship("Student", back_populates="enrollments")
@@ -3,11 +3,17 @@ Exam models for LearnAid system.
 Includes Exam, ExamQuestion, and ExamResult models for CIA management.
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Float, JSON
-from sqlalchemy.orm import relationship
-from app.core.database import Base
-from datetime import datetime
+from sqlalchemy import (
+    Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Float, JSON,
+    DDL, MetaData, Table, event, text
+)
+from sqlalchemy.orm import relationship, Session
+from app.core.database import Base, utcnow
+from itertools import chain
 import enum
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class ExamType(enum.Enum):
@@ -49,8 +55,8 @@ class Exam(Base):
     results_published = Column(Boolean, default=False)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow())
     
     # Relationships
     course = relationship("Course", back_populates="exams")
@@ -87,7 +93,7 @@ class ExamQuestion(Base):
     bloom_taxonomy_level = Column(String(50), nullable=True)  # remember, understand, apply, etc.
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
     
     # Relationships
     exam = relationship("Exam", back_populates="questions")
@@ -124,8 +130,8 @@ class ExamResult(Base):
     is_graded = Column(Boolean, default=False)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow())
     
     # Relationships
     exam = relationship("Exam", back_populates="results")
@@ -162,8 +168,8 @@ class ExamResponse(Base):
     feedback = Column(Text, nullable=True)  # Faculty feedback
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow())
     
     # Relationships
     exam_result = relationship("ExamResult", back_populates="responses")
@@ -214,8 +220,8 @@ class StudentChapterPerformance(Base):
     performance_history = Column(JSON, nullable=True)  # Store historical performance data
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow())
     
     # Relationships
     student = relationship("Student", back_populates="chapter_performance_records")
@@ -223,3 +229,85 @@ class StudentChapterPerformance(Base):
     
     def __repr__(self):
         return f"<StudentChapterPerformance(student_id={self.student_id}, chapter_id={self.chapter_id}, weak={self.is_weak_chapter})>"
+
+
+# Materialized per-student chapter averages (PostgreSQL only).
+# The view lives on its own MetaData so create_all never builds it as a plain table.
+view_metadata = MetaData()
+
+student_chapter_perf_view = Table(
+    "mv_student_chapter_perf",
+    view_metadata,
+    Column("student_id", Integer, primary_key=True),
+    Column("chapter_id", Integer, primary_key=True),
+    Column("avg_pct", Float),
+)
+
+
+class StudentChapterPerf(Base):
+    """
+    Read-only mapping of the mv_student_chapter_perf materialized view.
+    Used by auto-assignment to find students below a chapter threshold.
+    """
+    __table__ = student_chapter_perf_view
+
+    def __repr__(self):
+        return f"<StudentChapterPerf(student_id={self.student_id}, chapter_id={self.chapter_id}, avg_pct={self.avg_pct})>"
+
+
+event.listen(
+    Base.metadata,
+    "after_create",
+    DDL("""
+        CREATE MATERIALIZED VIEW IF NOT EXISTS mv_student_chapter_perf AS
+        SELECT er.student_id AS student_id,
+               eq.chapter_id AS chapter_id,
+               100.0 * SUM(resp.marks_obtained) / NULLIF(SUM(resp.max_marks), 0) AS avg_pct
+        FROM exam_responses resp
+        JOIN exam_results er ON er.id = resp.exam_result_id
+        JOIN exam_questions eq ON eq.id = resp.question_id
+        GROUP BY er.student_id, eq.chapter_id
+        WITH DATA;
+        CREATE UNIQUE INDEX IF NOT EXISTS ix_mv_student_chapter_perf
+            ON mv_student_chapter_perf (student_id, chapter_id);
+    """).execute_if(dialect="postgresql")
+)
+
+event.listen(
+    Base.metadata,
+    "before_drop",
+    DDL("DROP MATERIALIZED VIEW IF EXISTS mv_student_chapter_perf").execute_if(dialect="postgresql")
+)
+
+
+@event.listens_for(Session, "after_flush")
+def _flag_chapter_perf_refresh(session, flush_context):
+    """Mark the session when exam grading data changed."""
+    if any(
+        isinstance(obj, (ExamResult, ExamResponse))
+        for obj in chain(session.new, session.dirty, session.deleted)
+    ):
+        session.info["refresh_chapter_perf"] = True
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_chapter_perf_refresh(session):
+    """Rolled-back grading never reached the view's source tables, so there is nothing to refresh."""
+    session.info.pop("refresh_chapter_perf", None)
+
+
+@event.listens_for(Session, "after_commit")
+def _refresh_chapter_perf(session):
+    """Refresh mv_student_chapter_perf after a commit that graded exams."""
+    if not session.info.pop("refresh_chapter_perf", False):
+        return
+    
+    bind = session.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    
+    try:
+        with bind.engine.begin() as conn:
+            conn.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY mv_student_chapter_perf"))
+    except Exception as e:
+        logger.warning(f"Failed to refresh mv_student_chapter_perf: {e}")
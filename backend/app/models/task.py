@@ -3,11 +3,18 @@ Task models for LearnAid system.
 Includes Task, TaskQuestion, and TaskAttempt models for student assignments.
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Float, JSON
-from sqlalchemy.orm import relationship
-from app.core.database import Base
-from datetime import datetime
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import Integer, String, DateTime, Boolean, ForeignKey, Text, Float, JSON, Enum as SQLEnum, Index, Computed, event, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.core.database import Base, DATABASE_URL, utcnow
+from app.core.storage import content_storage
 import enum
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class TaskType(enum.Enum):
@@ -28,6 +35,47 @@ class TaskDifficulty(enum.Enum):
     HARD = "hard"
 
 
+class QuestionType(enum.Enum):
+    """Supported task question formats."""
+    MCQ = "mcq"
+    TRUE_FALSE = "true_false"
+    SHORT_ANSWER = "short_answer"
+
+
+class TaskPriority(enum.Enum):
+    """Priority of a task assignment."""
+    HIGH = "high"
+    NORMAL = "normal"
+    LOW = "low"
+
+
+# Precomputed lookups so hot paths skip Enum.__call__
+TASK_TYPE_VALUES = frozenset(t.value for t in TaskType)
+TASK_DIFFICULTY_VALUES = frozenset(d.value for d in TaskDifficulty)
+TASK_DIFFICULTY_BY_VALUE = {d.value: d for d in TaskDifficulty}
+
+
+# task_responses is range-partitioned by month on PostgreSQL. Months rather than attempt_id
+# ranges: attempt ids carry no notion of term, while month ranges line up with semesters, so
+# an expired term is dropped whole and current-term scans stay in the newest partitions.
+# The partition key has to be part of the primary key there, which SQLite cannot autoincrement.
+PARTITION_TASK_RESPONSES = DATABASE_URL.startswith("postgresql")
+# Monthly partitions kept created ahead of time, so new rows never fall into the default partition
+TASK_RESPONSE_PARTITION_MONTHS_AHEAD = 3
+
+# Elapsed attempt minutes for the generated time_taken_minutes column
+_ATTEMPT_MINUTES_SQL = (
+    "CAST(EXTRACT(EPOCH FROM (end_time - start_time)) / 60 AS INTEGER)"
+    if DATABASE_URL.startswith("postgresql")
+    else "CAST((julianday(end_time) - julianday(start_time)) * 1440 AS INTEGER)"
+)
+
+
+def _enum_values(enum_cls):
+    """Persist enum values (not member names) so existing rows stay valid."""
+    return [member.value for member in enum_cls]
+
+
 class Task(Base):
     """
     Task model for frequent assessments and student improvement.
@@ -35,69 +83,87 @@ class Task(Base):
     """
     __tablename__ = "tasks"
     
-    id = Column(Integer, primary_key=True, index=True)
-    title = Column(String(255), nullable=False)
-    course_id = Column(Integer, ForeignKey("courses.id"), nullable=False)
-    chapter_id = Column(Integer, ForeignKey("chapters.id"), nullable=False)
-    created_by_id = Column(Integer, ForeignKey("faculty.id"), nullable=True)  # Can be auto-generated
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    title: Mapped[str] = mapped_column(String(255), nullable=False)
+    course_id: Mapped[int] = mapped_column(Integer, ForeignKey("courses.id"), nullable=False)
+    chapter_id: Mapped[int] = mapped_column(Integer, ForeignKey("chapters.id"), nullable=False)
+    created_by_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("faculty.id"), nullable=True)  # Can be auto-generated
     
     # Task details
-    description = Column(Text, nullable=True)
-    task_type = Column(String(30), nullable=False)  # frequent_assessment, daily, bi_daily, remedial
-    difficulty_level = Column(String(20), default="medium")
+    description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    task_type: Mapped[TaskType] = mapped_column(
+        SQLEnum(TaskType, name="task_type_enum", values_callable=_enum_values),
+        nullable=False
+    )  # frequent_assessment, daily, bi_daily, remedial
+    difficulty_level: Mapped[Optional[TaskDifficulty]] = mapped_column(
+        SQLEnum(TaskDifficulty, name="task_difficulty_enum", values_callable=_enum_values),
+        default=TaskDifficulty.MEDIUM
+    )
     
     # Target audience (students who need improvement)
-    target_performance_threshold = Column(Float, default=50.0)  # Students below this % get this task
-    target_student_count = Column(Integer, default=0)  # Number of students this task is assigned to
+    target_performance_threshold: Mapped[Optional[float]] = mapped_column(Float, default=50.0)  # Students below this % get this task
+    target_student_count: Mapped[Optional[int]] = mapped_column(Integer, default=0)  # Number of students this task is assigned to
     
-    # Content and Study Material
-    study_material = Column(Text, nullable=True)  # Reading material before test
-    study_time_minutes = Column(Integer, default=15)  # Time to study before test
-    reading_material = Column(Text, nullable=True)  # Additional reading content
+    # Content and Study Material (text lives in content storage, rows keep the URI)
+    study_material_uri: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)  # Reading material before test
+    study_time_minutes: Mapped[Optional[int]] = mapped_column(Integer, default=15)  # Time to study before test
+    reading_material_uri: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)  # Additional reading content
     
     # Test Configuration
-    total_questions = Column(Integer, default=0)
-    total_marks = Column(Float, default=0.0)
+    total_questions: Mapped[Optional[int]] = mapped_column(Integer, default=0)
+    total_marks: Mapped[Optional[float]] = mapped_column(Float, default=0.0)
     
     # Timing and Scheduling
-    estimated_duration_minutes = Column(Integer, default=30)  # Test duration
-    due_date = Column(DateTime, nullable=True)
-    is_timed = Column(Boolean, default=True)  # Frequent assessments should be timed
-    time_limit_minutes = Column(Integer, default=20)  # Test time limit
+    estimated_duration_minutes: Mapped[Optional[int]] = mapped_column(Integer, default=30)  # Test duration
+    due_date: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    is_timed: Mapped[Optional[bool]] = mapped_column(Boolean, default=True)  # Frequent assessments should be timed
+    time_limit_minutes: Mapped[Optional[int]] = mapped_column(Integer, default=20)  # Test time limit
     
     # Assignment settings for frequent assessments
-    max_attempts = Column(Integer, default=2)  # Limited attempts for assessments
-    show_answers_after = Column(String(20), default="submission")  # Show answers after submission
-    is_mandatory = Column(Boolean, default=True)  # Frequent assessments are mandatory
+    max_attempts: Mapped[Optional[int]] = mapped_column(Integer, default=2)  # Limited attempts for assessments
+    show_answers_after: Mapped[Optional[str]] = mapped_column(String(20), default="submission")  # Show answers after submission
+    is_mandatory: Mapped[Optional[bool]] = mapped_column(Boolean, default=True)  # Frequent assessments are mandatory
     
     # Auto-generation for LLM-based tasks
-    is_auto_generated = Column(Boolean, default=False)
-    llm_generation_prompt = Column(Text, nullable=True)  # Prompt used for LLM generation
-    source_pdf_content = Column(Text, nullable=True)  # PDF content used for generation
-    llm_model_used = Column(String(100), nullable=True)  # Which LLM model was used
+    is_auto_generated: Mapped[Optional[bool]] = mapped_column(Boolean, default=False)
+    llm_generation_prompt: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # Prompt used for LLM generation
+    source_pdf_uri: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)  # PDF content used for generation
+    llm_model_used: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)  # Which LLM model was used
     
     # Assignment tracking
-    auto_assign_to_poor_performers = Column(Boolean, default=False)  # Auto-assign to students with low performance
-    performance_improvement_target = Column(Float, default=70.0)  # Target improvement percentage
+    auto_assign_to_poor_performers: Mapped[Optional[bool]] = mapped_column(Boolean, default=False)  # Auto-assign to students with low performance
+    performance_improvement_target: Mapped[Optional[float]] = mapped_column(Float, default=70.0)  # Target improvement percentage
     
     # Status
-    is_published = Column(Boolean, default=False)
-    is_active = Column(Boolean, default=True)
+    is_published: Mapped[Optional[bool]] = mapped_column(Boolean, default=False)
+    is_active: Mapped[Optional[bool]] = mapped_column(Boolean, default=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, server_default=utcnow())
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, server_default=utcnow(), onupdate=utcnow())
     
     # Relationships
     course = relationship("Course", back_populates="tasks")
     chapter = relationship("Chapter", back_populates="tasks")
     created_by = relationship("Faculty", back_populates="tasks")
-    questions = relationship("TaskQuestion", back_populates="task", cascade="all, delete-orphan")
-    attempts = relationship("TaskAttempt", back_populates="task")
-    assignments = relationship("TaskAssignment", back_populates="task")
+    questions = relationship("TaskQuestion", back_populates="task", cascade="all, delete-orphan", passive_deletes=True)
+    attempts = relationship("TaskAttempt", back_populates="task", cascade="all, delete-orphan", passive_deletes=True)
+    assignments = relationship("TaskAssignment", back_populates="task", cascade="all, delete-orphan", passive_deletes=True)
+    
+    def load_pdf_content(self):
+        """Fetch the source PDF text from content storage."""
+        return content_storage.load_text(self.source_pdf_uri)
+    
+    def load_study_material(self):
+        """Fetch the study material text from content storage."""
+        return content_storage.load_text(self.study_material_uri)
+    
+    def load_reading_material(self):
+        """Fetch the reading material text from content storage."""
+        return content_storage.load_text(self.reading_material_uri)
     
     def __repr__(self):
-        return f"<Task(id={self.id}, title={self.title}, type={self.task_type})>"
+        return "<Task(id=%s, title=%s, type=%s)>" % (self.id, self.title, self.task_type)
 
 
 class TaskQuestion(Base):
@@ -107,40 +173,50 @@ class TaskQuestion(Base):
     """
     __tablename__ = "task_questions"
     
-    id = Column(Integer, primary_key=True, index=True)
-    task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    task_id: Mapped[int] = mapped_column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False)
     
     # Question details
-    question_number = Column(Integer, nullable=False)
-    question_text = Column(Text, nullable=False)
-    question_type = Column(String(20), default="mcq")  # mcq, true_false, short_answer
-    marks = Column(Float, default=1.0)
+    question_number: Mapped[int] = mapped_column(Integer, nullable=False)
+    question_text: Mapped[str] = mapped_column(Text, nullable=False)
+    question_type: Mapped[Optional[QuestionType]] = mapped_column(
+        SQLEnum(QuestionType, name="task_question_type_enum", values_callable=_enum_values),
+        default=QuestionType.MCQ
+    )
+    marks: Mapped[Optional[float]] = mapped_column(Float, default=1.0)
     
     # MCQ options (JSON format)
-    options = Column(JSON, nullable=True)  # {"A": "option1", "B": "option2", ...}
-    correct_answer = Column(String(500), nullable=False)  # For MCQ: "A", for others: actual answer
+    options: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)  # {"A": "option1", "B": "option2", ...}
+    correct_answer: Mapped[str] = mapped_column(String(500), nullable=False)  # For MCQ: "A", for others: actual answer
     
     # Additional answer options for flexibility
-    alternative_answers = Column(JSON, nullable=True)  # List of acceptable answers
+    alternative_answers: Mapped[Optional[list]] = mapped_column(JSON, nullable=True)  # List of acceptable answers
     
     # Question metadata
-    explanation = Column(Text, nullable=True)  # Explanation of correct answer
-    difficulty_level = Column(String(20), default="medium")
-    learning_objective = Column(String(255), nullable=True)
+    explanation: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # Explanation of correct answer
+    difficulty_level: Mapped[Optional[TaskDifficulty]] = mapped_column(
+        SQLEnum(TaskDifficulty, name="task_difficulty_enum", values_callable=_enum_values),
+        default=TaskDifficulty.MEDIUM
+    )
+    learning_objective: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     
     # AI generation metadata
-    is_auto_generated = Column(Boolean, default=False)
-    source_text = Column(Text, nullable=True)  # Text from PDF that inspired this question
+    is_auto_generated: Mapped[Optional[bool]] = mapped_column(Boolean, default=False)
+    source_text_uri: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)  # Text from PDF that inspired this question
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, server_default=utcnow())
     
     # Relationships
     task = relationship("Task", back_populates="questions")
-    responses = relationship("TaskResponse", back_populates="question")
+    responses = relationship("TaskResponse", back_populates="question", passive_deletes=True)
+    
+    def load_source_text(self):
+        """Fetch the inspiring PDF excerpt from content storage."""
+        return content_storage.load_text(self.source_text_uri)
     
     def __repr__(self):
-        return f"<TaskQuestion(id={self.id}, task_id={self.task_id}, q_no={self.question_number})>"
+        return "<TaskQuestion(id=%s, task_id=%s, q_no=%s)>" % (self.id, self.task_id, self.question_number)
 
 
 class TaskAssignment(Base):
@@ -150,43 +226,46 @@ class TaskAssignment(Base):
     """
     __tablename__ = "task_assignments"
     
-    id = Column(Integer, primary_key=True, index=True)
-    task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False)
-    student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    task_id: Mapped[int] = mapped_column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False)
+    student_id: Mapped[int] = mapped_column(Integer, ForeignKey("students.id"), nullable=False)
     
     # Assignment details and reasoning
-    assigned_date = Column(DateTime, default=datetime.utcnow)
-    due_date = Column(DateTime, nullable=True)
-    priority = Column(String(20), default="normal")  # high, normal, low
+    assigned_date: Mapped[Optional[datetime]] = mapped_column(DateTime, server_default=utcnow())
+    due_date: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    priority: Mapped[Optional[TaskPriority]] = mapped_column(
+        SQLEnum(TaskPriority, name="task_priority_enum", values_callable=_enum_values),
+        default=TaskPriority.NORMAL
+    )
     
     # Assignment reason - why this student got this task
-    assignment_reason = Column(String(200), nullable=True)  # "Poor CIA1 performance in Chapter 3 (35%)"
-    triggering_exam_id = Column(Integer, ForeignKey("exams.id"), nullable=True)  # Which exam triggered this assignment
-    student_chapter_performance = Column(Float, nullable=True)  # The poor performance % that triggered assignment
-    target_improvement_percentage = Column(Float, default=70.0)  # Target performance after this task
+    assignment_reason: Mapped[Optional[str]] = mapped_column(String(200), nullable=True)  # "Poor CIA1 performance in Chapter 3 (35%)"
+    triggering_exam_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("exams.id"), nullable=True)  # Which exam triggered this assignment
+    student_chapter_performance: Mapped[Optional[float]] = mapped_column(Float, nullable=True)  # The poor performance % that triggered assignment
+    target_improvement_percentage: Mapped[Optional[float]] = mapped_column(Float, default=70.0)  # Target performance after this task
     
     # Assignment frequency settings
-    is_recurring = Column(Boolean, default=False)  # For daily/bi-daily assignments
-    recurrence_pattern = Column(String(50), nullable=True)  # "daily", "every_2_days", "weekly"
-    next_assignment_date = Column(DateTime, nullable=True)  # When to assign next similar task
+    is_recurring: Mapped[Optional[bool]] = mapped_column(Boolean, default=False)  # For daily/bi-daily assignments
+    recurrence_pattern: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)  # "daily", "every_2_days", "weekly"
+    next_assignment_date: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)  # When to assign next similar task
     
     # Status tracking
-    is_completed = Column(Boolean, default=False)
-    completion_date = Column(DateTime, nullable=True)
-    performance_after_completion = Column(Float, nullable=True)  # Performance improvement measurement
+    is_completed: Mapped[Optional[bool]] = mapped_column(Boolean, default=False)
+    completion_date: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    performance_after_completion: Mapped[Optional[float]] = mapped_column(Float, nullable=True)  # Performance improvement measurement
     
     # Notifications and reminders
-    reminder_sent = Column(Boolean, default=False)
-    reminder_count = Column(Integer, default=0)
-    last_reminder_date = Column(DateTime, nullable=True)
+    reminder_sent: Mapped[Optional[bool]] = mapped_column(Boolean, default=False)
+    reminder_count: Mapped[Optional[int]] = mapped_column(Integer, default=0)
+    last_reminder_date: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     
     # Auto-assignment metadata
-    is_auto_assigned = Column(Boolean, default=False)  # Was this auto-assigned by system?
-    auto_assignment_algorithm = Column(String(100), nullable=True)  # Which algorithm assigned this
+    is_auto_assigned: Mapped[Optional[bool]] = mapped_column(Boolean, default=False)  # Was this auto-assigned by system?
+    auto_assignment_algorithm: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)  # Which algorithm assigned this
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, server_default=utcnow())
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, server_default=utcnow(), onupdate=utcnow())
     
     # Relationships
     task = relationship("Task", back_populates="assignments")
@@ -194,7 +273,7 @@ class TaskAssignment(Base):
     triggering_exam = relationship("Exam")  # Which exam caused this assignment
     
     def __repr__(self):
-        return f"<TaskAssignment(id={self.id}, task_id={self.task_id}, student_id={self.student_id}, reason={self.assignment_reason})>"
+        return "<TaskAssignment(id=%s, task_id=%s, student_id=%s, reason=%s)>" % (self.id, self.task_id, self.student_id, self.assignment_reason)
 
 
 class TaskAttempt(Base):
@@ -204,48 +283,57 @@ class TaskAttempt(Base):
     """
     __tablename__ = "task_attempts"
     
-    id = Column(Integer, primary_key=True, index=True)
-    task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False)
-    student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    task_id: Mapped[int] = mapped_column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False)
+    student_id: Mapped[int] = mapped_column(Integer, ForeignKey("students.id"), nullable=False)
     
     # Attempt details
-    attempt_number = Column(Integer, default=1)  # 1st, 2nd, 3rd attempt
+    attempt_number: Mapped[Optional[int]] = mapped_column(Integer, default=1)  # 1st, 2nd, 3rd attempt
     
     # Timing
-    start_time = Column(DateTime, default=datetime.utcnow)
-    end_time = Column(DateTime, nullable=True)
-    time_taken_minutes = Column(Integer, nullable=True)
+    start_time: Mapped[Optional[datetime]] = mapped_column(DateTime, server_default=utcnow())
+    end_time: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    time_taken_minutes: Mapped[Optional[int]] = mapped_column(
+        Integer, Computed(_ATTEMPT_MINUTES_SQL, persisted=True), nullable=True
+    )  # Generated by the database from start/end time
     
     # Results
-    total_marks_obtained = Column(Float, default=0.0)
-    total_marks_possible = Column(Float, nullable=False)
-    percentage = Column(Float, default=0.0)
+    total_marks_obtained: Mapped[Optional[float]] = mapped_column(Float, default=0.0)
+    total_marks_possible: Mapped[float] = mapped_column(Float, nullable=False)
+    percentage: Mapped[Optional[float]] = mapped_column(
+        Float,
+        Computed(
+            "CASE WHEN total_marks_possible > 0 "
+            "THEN total_marks_obtained * 100.0 / total_marks_possible ELSE 0 END",
+            persisted=True
+        )
+    )  # Generated by the database from the marks columns
     
     # Performance metrics
-    correct_answers = Column(Integer, default=0)
-    incorrect_answers = Column(Integer, default=0)
-    unanswered = Column(Integer, default=0)
+    correct_answers: Mapped[Optional[int]] = mapped_column(Integer, default=0)
+    incorrect_answers: Mapped[Optional[int]] = mapped_column(Integer, default=0)
+    unanswered: Mapped[Optional[int]] = mapped_column(Integer, default=0)
     
     # Status
-    is_completed = Column(Boolean, default=False)
-    is_submitted = Column(Boolean, default=False)
-    is_graded = Column(Boolean, default=False)
+    is_completed: Mapped[Optional[bool]] = mapped_column(Boolean, default=False)
+    is_submitted: Mapped[Optional[bool]] = mapped_column(Boolean, default=False)
+    is_graded: Mapped[Optional[bool]] = mapped_column(Boolean, default=False)
     
     # Feedback and points
-    feedback = Column(Text, nullable=True)  # Auto-generated or manual feedback
-    points_earned = Column(Integer, default=0)  # Gamification points
+    feedback: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # Auto-generated or manual feedback
+    points_earned: Mapped[Optional[int]] = mapped_column(Integer, default=0)  # Gamification points
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, server_default=utcnow())
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, server_default=utcnow(), onupdate=utcnow())
     
     # Relationships
     task = relationship("Task", back_populates="attempts")
     student = relationship("Student", back_populates="task_attempts")
-    responses = relationship("TaskResponse", back_populates="attempt", cascade="all, delete-orphan")
+    responses = relationship("TaskResponse", back_populates="attempt", cascade="all, delete-orphan", passive_deletes=True)
     
     def __repr__(self):
-        return f"<TaskAttempt(id={self.id}, task_id={self.task_id}, attempt={self.attempt_number})>"
+        return "<TaskAttempt(id=%s, task_id=%s, attempt=%s)>" % (self.id, self.task_id, self.attempt_number)
 
 
 class TaskResponse(Base):
@@ -254,33 +342,86 @@ class TaskResponse(Base):
     Stores student answers and grading information.
     """
     __tablename__ = "task_responses"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    attempt_id = Column(Integer, ForeignKey("task_attempts.id"), nullable=False)
-    question_id = Column(Integer, ForeignKey("task_questions.id"), nullable=False)
+    __table_args__ = (
+        # Covering index so per-attempt grading sums run as index-only scans on PostgreSQL
+        Index(
+            "ix_resp_attempt_q_cov", "attempt_id", "question_id",
+            postgresql_include=["is_correct", "marks_obtained"]
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"} if PARTITION_TASK_RESPONSES else {},
+    )
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True, index=True)
+    attempt_id: Mapped[int] = mapped_column(Integer, ForeignKey("task_attempts.id", ondelete="CASCADE"), nullable=False)
+    question_id: Mapped[int] = mapped_column(Integer, ForeignKey("task_questions.id", ondelete="CASCADE"), nullable=False)
     
     # Student response
-    student_answer = Column(Text, nullable=True)  # The answer provided by student
-    is_correct = Column(Boolean, nullable=True)  # True/False for correctness
+    student_answer: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # The answer provided by student
+    is_correct: Mapped[Optional[bool]] = mapped_column(Boolean, nullable=True)  # True/False for correctness
     
     # Grading
-    marks_obtained = Column(Float, default=0.0)
-    max_marks = Column(Float, nullable=False)
+    marks_obtained: Mapped[Optional[float]] = mapped_column(Float, default=0.0)
+    max_marks: Mapped[float] = mapped_column(Float, nullable=False)
     
     # Timing (optional)
-    time_taken_seconds = Column(Integer, nullable=True)
+    time_taken_seconds: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     
     # Auto-grading metadata
-    confidence_score = Column(Float, nullable=True)  # AI confidence in grading
-    requires_manual_review = Column(Boolean, default=False)
+    confidence_score: Mapped[Optional[float]] = mapped_column(Float, nullable=True)  # AI confidence in grading
+    requires_manual_review: Mapped[Optional[bool]] = mapped_column(Boolean, default=False)
     
-    # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Timestamps (created_at is the partition key on PostgreSQL)
+    created_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime, primary_key=PARTITION_TASK_RESPONSES, server_default=utcnow()
+    )
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, server_default=utcnow(), onupdate=utcnow())
+    
+    # Rows are still identified by id alone
+    __mapper_args__ = {"primary_key": [id]}
     
     # Relationships
     attempt = relationship("TaskAttempt", back_populates="responses")
     question = relationship("TaskQuestion", back_populates="responses")
     
     def __repr__(self):
-        return f"<TaskResponse(id={self.id}, question_id={self.question_id}, correct={self.is_correct})>"
+        return "<TaskResponse(id=%s, question_id=%s, correct=%s)>" % (self.id, self.question_id, self.is_correct)
+
+
+def create_task_response_partition(connection, month_start: date):
+    """
+    Create the task_responses partition covering the month that starts at month_start.
+    Run ahead of the month; rows already in the default partition for that range block it.
+    """
+    next_month = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    connection.execute(text(
+        f"CREATE TABLE IF NOT EXISTS task_responses_{month_start:%Y_%m} PARTITION OF task_responses "
+        f"FOR VALUES FROM ('{month_start:%Y-%m-%d}') TO ('{next_month:%Y-%m-%d}')"
+    ))
+
+
+def ensure_task_response_partitions(connection, months_ahead: int = TASK_RESPONSE_PARTITION_MONTHS_AHEAD):
+    """Create the current month's task_responses partition and the next months_ahead ones, if missing."""
+    month_start = date.today().replace(day=1)
+    for _ in range(months_ahead + 1):
+        # A month whose rows already sit in the default partition can't be split out; skip it
+        try:
+            with connection.begin_nested():
+                create_task_response_partition(connection, month_start)
+        except DBAPIError as e:
+            logger.warning(f"Could not create task_responses partition for {month_start:%Y-%m}: {e}")
+        month_start = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def drop_task_response_partition(connection, month_start: date):
+    """Drop an expired monthly task_responses partition."""
+    connection.execute(text(f"DROP TABLE IF EXISTS task_responses_{month_start:%Y_%m}"))
+
+
+if PARTITION_TASK_RESPONSES:
+    @event.listens_for(TaskResponse.__table__, "after_create")
+    def _create_task_response_partitions(target, connection, **kw):
+        """Create the default partition and the upcoming monthly ones alongside task_responses."""
+        connection.execute(text(
+            "CREATE TABLE IF NOT EXISTS task_responses_default PARTITION OF task_responses DEFAULT"
+        ))
+        ensure_task_response_partitions(connection)
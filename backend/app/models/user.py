@@ -3,12 +3,13 @@ User models for LearnAid system.
 Includes base User class and specialized Student/Faculty models.
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Enum as SQLEnum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Enum as SQLEnum, Index, func, event
+from sqlalchemy.orm import relationship, Session
 from sqlalchemy.ext.declarative import declarative_base
-from app.core.database import Base
-from datetime import datetime
+from app.core.database import Base, utcnow
+from app.core.cache import cache_delete
 import enum
+from itertools import chain
 
 
 class UserRole(enum.Enum):
@@ -32,13 +33,19 @@ class User(Base):
     hashed_password = Column(String(255), nullable=False)
     role = Column(SQLEnum(UserRole), nullable=False)
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow())
     
     # Profile fields
     phone_number = Column(String(20), nullable=True)
     profile_picture = Column(String(500), nullable=True)  # URL or file path
     
+    __table_args__ = (
+        # Case-insensitive uniqueness; lets login match lower(...) without a sequential scan
+        Index("ix_users_email_lower", func.lower(email), unique=True),
+        Index("ix_users_username_lower", func.lower(username), unique=True),
+    )
+    
     # Relationships based on role
     student_profile = relationship("Student", back_populates="user", uselist=False, cascade="all, delete-orphan")
     faculty_profile = relationship("Faculty", back_populates="user", uselist=False, cascade="all, delete-orphan")
@@ -56,7 +63,7 @@ class Department(Base):
     code = Column(String(10), unique=True, nullable=False)  # e.g., "CSE", "ECE"
     description = Column(Text, nullable=True)
     head_of_department = Column(String(255), nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
     
     # Relationships
     courses = relationship("Course", back_populates="department")
@@ -67,6 +74,39 @@ class Department(Base):
         return f"<Department(id={self.id}, name={self.name}, code={self.code})>"
 
 
+DEPARTMENT_CACHE_KEY = "departments:{}"
+DEPARTMENT_LIST_CACHE_KEY = "departments:all"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_departments(session, flush_context):
+    """Remember which departments this transaction wrote; the cache is only touched on commit."""
+    changed = {
+        obj.id
+        for obj in chain(session.new, session.dirty, session.deleted)
+        if isinstance(obj, Department) and obj.id is not None
+    }
+    if changed:
+        session.info.setdefault("changed_department_ids", set()).update(changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_department_cache(session):
+    """Drop cached entries for departments changed by the committed transaction."""
+    changed = session.info.pop("changed_department_ids", None)
+    if changed:
+        cache_delete(
+            *(DEPARTMENT_CACHE_KEY.format(department_id) for department_id in changed),
+            DEPARTMENT_LIST_CACHE_KEY
+        )
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_departments(session):
+    """Rolled-back writes never reached readers, so there is nothing to invalidate."""
+    session.info.pop("changed_department_ids", None)
+
+
 class Student(Base):
     """
     Student profile extending base User.
@@ -93,7 +133,7 @@ class Student(Base):
     current_streak = Column(Integer, default=0)
     badges_earned = Column(Text, nullable=True)  # JSON string of badges
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
     
     # Relationships
     user = relationship("User", back_populates="student_profile")
@@ -130,7 +170,7 @@ class Faculty(Base):
     office_location = Column(String(100), nullable=True)
     office_hours = Column(String(200), nullable=True)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
     
     # Relationships
     user = relationship("User", back_populates="faculty_profile")
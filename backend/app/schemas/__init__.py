@@ -1,48 +1,56 @@
 """
 Schemas package for LearnAid API.
 Contains Pydantic models for request/response validation.
-"""
 
-# Import all schemas
-from .user import (
-    UserRole, UserBase, UserCreate, UserUpdate, UserInDB, UserResponse,
-    DepartmentBase, DepartmentCreate, DepartmentUpdate, DepartmentResponse,
-    StudentBase, StudentCreate, StudentUpdate, StudentResponse,
-    FacultyBase, FacultyCreate, FacultyUpdate, FacultyResponse,
-    Token, TokenData, LoginRequest, RefreshTokenRequest,
-    PasswordResetRequest, PasswordResetConfirm, ChangePasswordRequest,
-    BulkStudentCreate, BulkFacultyCreate,
-    UserStats, DashboardSummary
-)
+Schemas are resolved lazily (PEP 562) so importing one schema module does
+not pull in the others at startup.
+"""
 
-from .course import (
-    CourseBase, CourseCreate, CourseUpdate, CourseResponse,
-    ChapterBase, ChapterCreate, ChapterUpdate, ChapterResponse,
-    ChapterFileUpload,
-    CourseEnrollmentBase, CourseEnrollmentCreate, CourseEnrollmentUpdate, CourseEnrollmentResponse,
-    BulkEnrollmentCreate, BulkEnrollmentByClass,
-    CourseAnalytics, ChapterAnalytics, CourseProgressSummary,
-    CourseSearchFilters, CourseListResponse
-)
+import importlib
 
-# Make all schemas available for import
-__all__ = [
-    # User schemas
+_USER_SCHEMAS = (
     "UserRole", "UserBase", "UserCreate", "UserUpdate", "UserInDB", "UserResponse",
     "DepartmentBase", "DepartmentCreate", "DepartmentUpdate", "DepartmentResponse",
-    "StudentBase", "StudentCreate", "StudentUpdate", "StudentResponse",
-    "FacultyBase", "FacultyCreate", "FacultyUpdate", "FacultyResponse",
+    "StudentBase", "StudentCreate", "StudentUpdate", "StudentResponse", "StudentListItem",
+    "FacultyBase", "FacultyCreate", "FacultyUpdate", "FacultyResponse", "FacultyListItem",
     "Token", "TokenData", "LoginRequest", "RefreshTokenRequest",
     "PasswordResetRequest", "PasswordResetConfirm", "ChangePasswordRequest",
     "BulkStudentCreate", "BulkFacultyCreate",
     "UserStats", "DashboardSummary",
-    
-    # Course schemas
+)
+
+_COURSE_SCHEMAS = (
     "CourseBase", "CourseCreate", "CourseUpdate", "CourseResponse",
     "ChapterBase", "ChapterCreate", "ChapterUpdate", "ChapterResponse",
     "ChapterFileUpload",
     "CourseEnrollmentBase", "CourseEnrollmentCreate", "CourseEnrollmentUpdate", "CourseEnrollmentResponse",
     "BulkEnrollmentCreate", "BulkEnrollmentByClass",
     "CourseAnalytics", "ChapterAnalytics", "CourseProgressSummary",
-    "CourseSearchFilters", "CourseListResponse"
-]
\ No newline at end of file
+    "ChapterPerformanceSummary", "StudentPerformanceAnalysis",
+    "CourseSearchFilters", "CourseListResponse",
+)
+
+# Schema name -> defining module
+_LAZY = {
+    **{name: "app.schemas.user" for name in _USER_SCHEMAS},
+    **{name: "app.schemas.course" for name in _COURSE_SCHEMAS},
+}
+
+# Make all schemas available for import
+__all__ = _USER_SCHEMAS + _COURSE_SCHEMAS
+
+
+def __getattr__(name):
+    """Import the defining module on first access and cache the schema."""
+    try:
+        module_name = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
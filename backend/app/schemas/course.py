@@ -3,75 +3,141 @@ Course and Exam schemas for LearnAid.
 Handles course creation, chapter management, exam creation, and performance tracking.
 """
 
-from pydantic import BaseModel, Field, validator
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints, TypeAdapter, ValidationInfo, computed_field, field_validator
+from pydantic.dataclasses import dataclass
+from typing import Annotated, List, Literal, Optional, Dict, Any, TypedDict
 from datetime import datetime, date
-from enum import Enum
+from operator import attrgetter
+
+
+_get_max_marks = attrgetter('max_marks')
+
+# Output-only DTOs: slotted, immutable pydantic dataclasses instead of BaseModel
+_output_dataclass = dataclass(frozen=True, slots=True, kw_only=True)
+
+# ORM-backed response models: attribute copy only, no assignment validation or aliasing
+ORM_RESPONSE_CONFIG = ConfigDict(
+    from_attributes=True,
+    frozen=True,
+    extra='ignore',
+    validate_assignment=False,
+    populate_by_name=False,
+    ser_json_bytes='utf8'
+)
+
+# Shared constrained type so every academic_year field reuses one pattern
+AcademicYear = Annotated[str, StringConstraints(pattern=r"^\d{4}-\d{2}$")]
+
+# Shared length-capped text types, one per bound used below
+TextStr = Annotated[str, StringConstraints(max_length=2000)]
+AnswerStr = Annotated[str, StringConstraints(max_length=5000)]
+FeedbackStr = Annotated[str, StringConstraints(max_length=1000)]
+
+
+def _marks_to_hundredths(marks: float) -> int:
+    """Convert a marks value to integer hundredths."""
+    return int(round(marks * 100))
+
+
+# Nested reference schemas
+class DepartmentRef(BaseModel):
+    """Department summary embedded in course responses."""
+    id: int
+    name: str
+    code: str
+
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+
+class FacultyRef(BaseModel):
+    """Faculty summary embedded in course and exam responses."""
+    id: int
+    employee_id: str
+    full_name: str
+
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+
+class CourseRef(BaseModel):
+    """Course summary embedded in exam responses."""
+    id: int
+    name: str
+    code: str
+
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+
+class ChapterRef(BaseModel):
+    """Chapter summary embedded in question responses."""
+    id: int
+    title: str
+
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 # Course Management Schemas
 class ChapterBase(BaseModel):
-    """Base schema for chapter information."""
-    title: str = Field(..., min_length=1, max_length=200)
-    description: Optional[str] = Field(None, max_length=1000)
-    content: Optional[str] = Field(None, max_length=10000)
-    order_index: int = Field(..., ge=1, description="Chapter order in course")
-    estimated_hours: Optional[float] = Field(None, ge=0.1, le=100)
+    """Base chapter schema."""
+    title: str = Field(..., min_length=2, max_length=255)
+    chapter_number: int = Field(..., ge=1)
+    description: Optional[str] = None
+    learning_objectives: Optional[str] = None
+    estimated_hours: float = Field(default=2.0, ge=0.5, le=10.0)
 
 
 class ChapterCreate(ChapterBase):
-    """Schema for creating a new chapter."""
-    pass
+    """Schema for creating a chapter."""
+    course_id: Optional[int] = None  # Taken from the parent course when nested or routed
 
 
 class ChapterUpdate(BaseModel):
     """Schema for updating chapter information."""
-    title: Optional[str] = Field(None, min_length=1, max_length=200)
-    description: Optional[str] = Field(None, max_length=1000)
-    content: Optional[str] = Field(None, max_length=10000)
-    order_index: Optional[int] = Field(None, ge=1)
-    estimated_hours: Optional[float] = Field(None, ge=0.1, le=100)
-    is_active: Optional[bool] = None
+    title: Optional[str] = Field(None, min_length=2, max_length=255)
+    description: Optional[str] = None
+    learning_objectives: Optional[str] = None
+    estimated_hours: Optional[float] = Field(None, ge=0.5, le=10.0)
+    is_published: Optional[bool] = None
 
 
 class ChapterResponse(ChapterBase):
-    """Schema for chapter response."""
+    """Chapter schema for API responses."""
     id: int
     course_id: int
-    file_path: Optional[str] = None
-    file_size: Optional[int] = None
+    pdf_file_path: Optional[str] = None
+    content_summary: Optional[str] = None
+    key_topics: Optional[str] = None
+    is_published: bool
     upload_date: Optional[datetime] = None
-    is_active: bool
     created_at: datetime
-
-    class Config:
-        from_attributes = True
+    updated_at: datetime
+    
+    model_config = ORM_RESPONSE_CONFIG
 
 
 class CourseBase(BaseModel):
     """Base schema for course information."""
     name: str = Field(..., min_length=1, max_length=200)
     code: str = Field(..., min_length=2, max_length=10)
-    description: Optional[str] = Field(None, max_length=2000)
+    description: Optional[TextStr] = None
     credits: int = Field(..., ge=1, le=10)
     semester: int = Field(..., ge=1, le=8)
-    academic_year: str = Field(..., pattern=r"^\d{4}-\d{2}$", description="Format: YYYY-YY")
+    academic_year: AcademicYear = Field(..., description="Format: YYYY-YY")
 
 
 class CourseCreate(CourseBase):
     """Schema for creating a new course."""
     department_id: int
-    chapters: Optional[List[ChapterCreate]] = []
+    chapters: Optional[List[ChapterCreate]] = Field(default_factory=list)
 
 
 class CourseUpdate(BaseModel):
     """Schema for updating course information."""
     name: Optional[str] = Field(None, min_length=1, max_length=200)
     code: Optional[str] = Field(None, min_length=2, max_length=10)
-    description: Optional[str] = Field(None, max_length=2000)
+    description: Optional[TextStr] = None
     credits: Optional[int] = Field(None, ge=1, le=10)
     semester: Optional[int] = Field(None, ge=1, le=8)
-    academic_year: Optional[str] = Field(None, pattern=r"^\d{4}-\d{2}$")
+    academic_year: Optional[AcademicYear] = None
     is_active: Optional[bool] = None
 
 
@@ -80,26 +146,23 @@ class CourseResponse(CourseBase):
     id: int
     department_id: int
     faculty_id: int
-    department: Optional[Dict[str, Any]] = None
-    faculty: Optional[Dict[str, Any]] = None
-    chapters: List[ChapterResponse] = []
-    total_chapters: int = 0
+    department: Optional[DepartmentRef] = None
+    faculty: Optional[FacultyRef] = None
+    chapters: List[ChapterResponse] = Field(default_factory=list)
     is_active: bool
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ORM_RESPONSE_CONFIG
+
+    @computed_field
+    @property
+    def total_chapters(self) -> int:
+        return len(self.chapters)
 
 
 # Exam Management Schemas
-class ExamType(str, Enum):
-    """Enum for exam types."""
-    CIA1 = "CIA1"
-    CIA2 = "CIA2"
-    CIA3 = "CIA3"
-    END_SEM = "END_SEM"
-    QUIZ = "QUIZ"
-    ASSIGNMENT = "ASSIGNMENT"
+# Exam types travel as plain strings; the ExamType enum lives on the DB model
+ExamTypeName = Literal["CIA1", "CIA2", "CIA3", "END_SEM", "QUIZ", "ASSIGNMENT"]
 
 
 class QuestionBase(BaseModel):
@@ -107,8 +170,8 @@ class QuestionBase(BaseModel):
     question_number: int = Field(..., ge=1, le=100)
     max_marks: float = Field(..., ge=0.5, le=100)
     chapter_id: int
-    question_text: Optional[str] = Field(None, max_length=2000)
-    expected_answer: Optional[str] = Field(None, max_length=5000)
+    question_text: Optional[TextStr] = None
+    expected_answer: Optional[AnswerStr] = None
 
 
 class QuestionCreate(QuestionBase):
@@ -120,51 +183,58 @@ class QuestionUpdate(BaseModel):
     """Schema for updating exam question."""
     max_marks: Optional[float] = Field(None, ge=0.5, le=100)
     chapter_id: Optional[int] = None
-    question_text: Optional[str] = Field(None, max_length=2000)
-    expected_answer: Optional[str] = Field(None, max_length=5000)
+    question_text: Optional[TextStr] = None
+    expected_answer: Optional[AnswerStr] = None
 
 
 class QuestionResponse(QuestionBase):
     """Schema for question response."""
     id: int
     exam_id: int
-    chapter: Optional[Dict[str, Any]] = None
+    chapter: Optional[ChapterRef] = None
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ORM_RESPONSE_CONFIG
 
 
 class ExamBase(BaseModel):
     """Base schema for exam information."""
     name: str = Field(..., min_length=1, max_length=200)
-    exam_type: ExamType
+    exam_type: ExamTypeName
     exam_date: date
     duration_minutes: int = Field(..., ge=30, le=300, description="Exam duration in minutes")
     total_marks: float = Field(..., ge=1, le=500)
-    instructions: Optional[str] = Field(None, max_length=2000)
+    instructions: Optional[TextStr] = None
 
 
 class ExamCreate(ExamBase):
     """Schema for creating a new exam."""
     course_id: int
-    questions: List[QuestionCreate] = Field(..., min_items=1, max_items=100)
+    questions: List[QuestionCreate] = Field(..., min_length=1, max_length=100)
 
-    @validator('questions')
-    def validate_questions_total_marks(cls, questions, values):
+    @field_validator('questions', mode='after')
+    @classmethod
+    def validate_questions_total_marks(cls, questions, info: ValidationInfo):
         """Validate that total marks of questions match exam total marks."""
-        if 'total_marks' in values:
-            total_question_marks = sum(q.max_marks for q in questions)
-            if abs(total_question_marks - values['total_marks']) > 0.01:
-                raise ValueError(f"Total marks of questions ({total_question_marks}) must equal exam total marks ({values['total_marks']})")
+        if 'total_marks' in info.data:
+            # Compare in hundredths of a mark to avoid float epsilon handling
+            total_question_marks = sum(map(_marks_to_hundredths, map(_get_max_marks, questions)))
+            if total_question_marks != _marks_to_hundredths(info.data['total_marks']):
+                raise ValueError(f"Total marks of questions ({total_question_marks / 100}) must equal exam total marks ({info.data['total_marks']})")
         return questions
 
-    @validator('questions')
+    @field_validator('questions')
+    @classmethod
     def validate_question_numbers(cls, questions):
         """Validate that question numbers are unique and sequential."""
-        question_numbers = [q.question_number for q in questions]
-        expected_numbers = list(range(1, len(questions) + 1))
-        if sorted(question_numbers) != expected_numbers:
+        # Set bit n-1 for question n; unique 1..len(questions) fills the low bits exactly
+        seen = 0
+        for q in questions:
+            bit = 1 << (q.question_number - 1)
+            if seen & bit:
+                raise ValueError("Question numbers must be unique and sequential starting from 1")
+            seen |= bit
+        if seen != (1 << len(questions)) - 1:
             raise ValueError("Question numbers must be unique and sequential starting from 1")
         return questions
 
@@ -174,7 +244,7 @@ class ExamUpdate(BaseModel):
     name: Optional[str] = Field(None, min_length=1, max_length=200)
     exam_date: Optional[date] = None
     duration_minutes: Optional[int] = Field(None, ge=30, le=300)
-    instructions: Optional[str] = Field(None, max_length=2000)
+    instructions: Optional[TextStr] = None
     is_active: Optional[bool] = None
 
 
@@ -183,15 +253,18 @@ class ExamResponse(ExamBase):
     id: int
     course_id: int
     faculty_id: int
-    course: Optional[Dict[str, Any]] = None
-    faculty: Optional[Dict[str, Any]] = None
-    questions: List[QuestionResponse] = []
-    total_questions: int = 0
+    course: Optional[CourseRef] = None
+    faculty: Optional[FacultyRef] = None
+    questions: List[QuestionResponse] = Field(default_factory=list)
     is_active: bool
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ORM_RESPONSE_CONFIG
+
+    @computed_field
+    @property
+    def total_questions(self) -> int:
+        return len(self.questions)
 
 
 # Student Response and Performance Schemas
@@ -200,9 +273,9 @@ class StudentResponseBase(BaseModel):
     question_id: int
     student_id: int
     marks_obtained: float = Field(..., ge=0, description="Marks obtained by student")
-    answer_text: Optional[str] = Field(None, max_length=5000)
+    answer_text: Optional[AnswerStr] = None
     is_correct: Optional[bool] = None
-    feedback: Optional[str] = Field(None, max_length=1000)
+    feedback: Optional[FeedbackStr] = None
 
 
 class StudentResponseCreate(StudentResponseBase):
@@ -213,15 +286,15 @@ class StudentResponseCreate(StudentResponseBase):
 class StudentResponseBulkCreate(BaseModel):
     """Schema for bulk creating student responses."""
     exam_id: int
-    responses: List[StudentResponseCreate] = Field(..., min_items=1)
+    responses: List[StudentResponseCreate] = Field(..., min_length=1)
 
 
 class StudentResponseUpdate(BaseModel):
     """Schema for updating student response."""
     marks_obtained: Optional[float] = Field(None, ge=0)
-    answer_text: Optional[str] = Field(None, max_length=5000)
+    answer_text: Optional[AnswerStr] = None
     is_correct: Optional[bool] = None
-    feedback: Optional[str] = Field(None, max_length=1000)
+    feedback: Optional[FeedbackStr] = None
 
 
 class StudentResponseResponse(StudentResponseBase):
@@ -233,11 +306,11 @@ class StudentResponseResponse(StudentResponseBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ORM_RESPONSE_CONFIG
 
 
-class ChapterPerformance(BaseModel):
+@_output_dataclass
+class ChapterPerformance:
     """Schema for chapter-wise performance."""
     chapter_id: int
     chapter_name: str
@@ -247,7 +320,8 @@ class ChapterPerformance(BaseModel):
     questions_count: int
 
 
-class StudentExamResult(BaseModel):
+@_output_dataclass
+class StudentExamResult:
     """Schema for student exam result."""
     exam_id: int
     student_id: int
@@ -257,7 +331,7 @@ class StudentExamResult(BaseModel):
     obtained_marks: float
     percentage: float
     grade: Optional[str] = None
-    chapter_performance: List[ChapterPerformance] = []
+    chapter_performance: List[ChapterPerformance] = Field(default_factory=list)
     exam_date: date
     submitted_at: Optional[datetime] = None
 
@@ -266,18 +340,21 @@ class ExamResultsSummary(BaseModel):
     """Schema for exam results summary."""
     exam_id: int
     exam_name: str
-    exam_type: ExamType
+    exam_type: ExamTypeName
     total_students: int
     submitted_count: int
     average_marks: float
     highest_marks: float
     lowest_marks: float
     pass_percentage: float
-    student_results: List[StudentExamResult] = []
+    student_results: List[StudentExamResult] = Field(default_factory=list)
+
+    model_config = ConfigDict(defer_build=True, from_attributes=True)
 
 
 # Analytics Schemas
-class FacultyDashboardStats(BaseModel):
+@_output_dataclass
+class FacultyDashboardStats:
     """Schema for faculty dashboard statistics."""
     total_courses: int
     active_courses: int
@@ -288,69 +365,59 @@ class FacultyDashboardStats(BaseModel):
 
 
 class CourseAnalytics(BaseModel):
-    """Schema for course analytics."""
+    """Course analytics schema."""
     course_id: int
-    course_name: str
-    enrolled_students: int
-    completed_exams: int
+    total_enrolled: int
+    active_students: int
+    completion_rate: float
     average_performance: float
-    weak_chapters: List[Dict[str, Any]] = []
-    strong_chapters: List[Dict[str, Any]] = []
+    
+    # Chapter-wise data
+    chapters_completed: int
+    total_chapters: int
+    
+    # Engagement metrics
+    active_last_week: int
+    tasks_completed: int
+    average_task_score: float
+
+    model_config = ConfigDict(defer_build=True, from_attributes=True)
 
 
 class FacultyDashboard(BaseModel):
     """Schema for complete faculty dashboard."""
     stats: FacultyDashboardStats
-    recent_courses: List[CourseResponse] = []
-    recent_exams: List[ExamResponse] = []
-    course_analytics: List[CourseAnalytics] = []
-    pending_tasks: List[str] = []
+    recent_courses: List[CourseResponse] = Field(default_factory=list)
+    recent_exams: List[ExamResponse] = Field(default_factory=list)
+    course_analytics: List[CourseAnalytics] = Field(default_factory=list)
+    pending_tasks: List[str] = Field(default_factory=list)
     department_name: Optional[str] = None
     enrolled_students: int = 0
     total_chapters: int = 0
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(defer_build=True, from_attributes=True, frozen=True)
 
 
-# Chapter schemas
-class ChapterBase(BaseModel):
-    """Base chapter schema."""
-    title: str = Field(..., min_length=2, max_length=255)
-    chapter_number: int = Field(..., ge=1)
-    description: Optional[str] = None
-    learning_objectives: Optional[str] = None
-    estimated_hours: float = Field(default=2.0, ge=0.5, le=10.0)
-
-
-class ChapterCreate(ChapterBase):
-    """Schema for creating a chapter."""
-    course_id: int
-
-
-class ChapterUpdate(BaseModel):
-    """Schema for updating chapter information."""
-    title: Optional[str] = Field(None, min_length=2, max_length=255)
-    description: Optional[str] = None
-    learning_objectives: Optional[str] = None
-    estimated_hours: Optional[float] = Field(None, ge=0.5, le=10.0)
-    is_published: Optional[bool] = None
+class FacultyDashboardStatsData(TypedDict):
+    """Plain-dict form of FacultyDashboardStats."""
+    total_courses: int
+    active_courses: int
+    total_students: int
+    total_exams: int
+    recent_exams: int
+    pending_evaluations: int
 
 
-class ChapterResponse(ChapterBase):
-    """Chapter schema for API responses."""
-    id: int
-    course_id: int
-    pdf_file_path: Optional[str] = None
-    content_summary: Optional[str] = None
-    key_topics: Optional[str] = None
-    is_published: bool
-    upload_date: Optional[datetime] = None
-    created_at: datetime
-    updated_at: datetime
-    
-    class Config:
-        from_attributes = True
+class FacultyDashboardData(TypedDict):
+    """Plain-dict form of FacultyDashboard, serialized directly by orjson."""
+    stats: FacultyDashboardStatsData
+    recent_courses: List[Dict[str, Any]]
+    recent_exams: List[Dict[str, Any]]
+    course_analytics: List[Dict[str, Any]]
+    pending_tasks: List[str]
+    department_name: Optional[str]
+    enrolled_students: int
+    total_chapters: int
 
 
 # Chapter file upload schema
@@ -366,9 +433,13 @@ class ChapterFileUpload(BaseModel):
 
 
 # Course enrollment schemas
+EnrollmentStatus = Literal["active", "completed", "dropped"]
+GradeName = Literal["A+", "A", "B+", "B", "C", "D", "F"]
+
+
 class CourseEnrollmentBase(BaseModel):
     """Base course enrollment schema."""
-    status: str = Field(default="active")  # active, completed, dropped
+    status: EnrollmentStatus = "active"
 
 
 class CourseEnrollmentCreate(BaseModel):
@@ -379,13 +450,13 @@ class CourseEnrollmentCreate(BaseModel):
 
 class CourseEnrollmentUpdate(BaseModel):
     """Schema for updating enrollment status."""
-    status: Optional[str] = None
+    status: Optional[EnrollmentStatus] = None
     current_chapter: Optional[int] = None
     completion_percentage: Optional[float] = Field(None, ge=0.0, le=100.0)
     internal_marks: Optional[float] = None
     external_marks: Optional[float] = None
     total_marks: Optional[float] = None
-    grade: Optional[str] = Field(None, max_length=2)
+    grade: Optional[GradeName] = None
 
 
 class CourseEnrollmentResponse(CourseEnrollmentBase):
@@ -399,7 +470,7 @@ class CourseEnrollmentResponse(CourseEnrollmentBase):
     internal_marks: Optional[float] = None
     external_marks: Optional[float] = None
     total_marks: Optional[float] = None
-    grade: Optional[str] = None
+    grade: Optional[GradeName] = None
     created_at: datetime
     updated_at: datetime
     
@@ -409,8 +480,7 @@ class CourseEnrollmentResponse(CourseEnrollmentBase):
     course_name: Optional[str] = None
     course_code: Optional[str] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ORM_RESPONSE_CONFIG
 
 
 # Bulk enrollment schemas
@@ -428,24 +498,6 @@ class BulkEnrollmentByClass(BaseModel):
 
 
 # Course analytics schemas
-class CourseAnalytics(BaseModel):
-    """Course analytics schema."""
-    course_id: int
-    total_enrolled: int
-    active_students: int
-    completion_rate: float
-    average_performance: float
-    
-    # Chapter-wise data
-    chapters_completed: int
-    total_chapters: int
-    
-    # Engagement metrics
-    active_last_week: int
-    tasks_completed: int
-    average_task_score: float
-
-
 class ChapterAnalytics(BaseModel):
     """Chapter analytics schema."""
     chapter_id: int
@@ -461,8 +513,29 @@ class ChapterAnalytics(BaseModel):
     tasks_generated: int
     total_task_attempts: int
 
+    model_config = ConfigDict(defer_build=True, from_attributes=True)
 
-class CourseProgressSummary(BaseModel):
+
+class ChapterPerformanceSummary(BaseModel):
+    """Per-chapter average used to flag weak and strong areas."""
+    chapter_id: int
+    chapter_name: str
+    performance: float
+    needs_improvement: bool
+
+
+class StudentPerformanceAnalysis(BaseModel):
+    """Student performance analysis with typed weak/strong chapter lists."""
+    student_id: int
+    weak_chapters: List[ChapterPerformanceSummary] = Field(default_factory=list)
+    strong_chapters: List[ChapterPerformanceSummary] = Field(default_factory=list)
+    overall_performance: float
+    total_exams_taken: int = 0
+    recommendation: str
+
+
+@_output_dataclass
+class CourseProgressSummary:
     """Course progress summary for students."""
     course_id: int
     course_name: str
@@ -476,7 +549,7 @@ class CourseProgressSummary(BaseModel):
     # Performance
     internal_marks: Optional[float] = None
     current_grade: Optional[str] = None
-    performance_trend: str  # improving, declining, stable
+    performance_trend: Literal["improving", "declining", "stable"]
     
     # Tasks and activities
     pending_tasks: int
@@ -490,8 +563,8 @@ class CourseSearchFilters(BaseModel):
     department_id: Optional[int] = None
     faculty_id: Optional[int] = None
     semester: Optional[int] = None
-    academic_year: Optional[str] = None
-    course_type: Optional[str] = None
+    academic_year: Optional[AcademicYear] = None
+    course_type: Optional[Literal["core", "elective", "lab"]] = None
     is_active: Optional[bool] = True
     
     # Search parameters
@@ -510,3 +583,8 @@ class CourseListResponse(BaseModel):
     per_page: int
     has_next: bool
     has_prev: bool
+
+
+# Shared list adapters: validator/serializer built once at import, reused by list routes
+COURSE_LIST_ADAPTER = TypeAdapter(List[CourseResponse])
+EXAM_LIST_ADAPTER = TypeAdapter(List[ExamResponse])
@@ -3,10 +3,11 @@ User schemas for LearnAid API.
 Pydantic models for user-related requests and responses.
 """
 
-from pydantic import BaseModel, EmailStr, Field, validator
-from typing import Optional, List
+from pydantic import AfterValidator, BaseModel, ConfigDict, EmailStr, Field, StringConstraints, TypeAdapter
+from typing import Annotated, Optional, List
 from datetime import datetime
 from enum import Enum
+import re
 
 
 class UserRole(str, Enum):
@@ -16,38 +17,54 @@ class UserRole(str, Enum):
     STUDENT = "student"
 
 
+# Shared string constraints
+UsernameStr = Annotated[str, StringConstraints(min_length=3, max_length=100)]
+FullNameStr = Annotated[str, StringConstraints(min_length=2, max_length=255)]
+PasswordStr = Annotated[str, StringConstraints(min_length=8, max_length=100)]
+PhoneStr = Annotated[str, StringConstraints(max_length=20)]
+AcademicYear = Annotated[str, StringConstraints(pattern=r'^\d{4}-\d{2}$')]
+
+
+# Password strength rules, each checked with a single regex scan
+_PASSWORD_RULES = (
+    (re.compile(r'[A-Z]'), 'Password must contain at least one uppercase letter'),
+    (re.compile(r'[a-z]'), 'Password must contain at least one lowercase letter'),
+    (re.compile(r'\d'), 'Password must contain at least one digit'),
+)
+
+
+def _validate_password_strength(password: str) -> str:
+    """Shared password strength check for the create/reset/change schemas."""
+    for pattern, message in _PASSWORD_RULES:
+        if pattern.search(password) is None:
+            raise ValueError(message)
+    return password
+
+
+StrongPassword = Annotated[PasswordStr, AfterValidator(_validate_password_strength)]
+
+
 # Base schemas
 class UserBase(BaseModel):
     """Base user schema with common fields."""
     email: EmailStr
-    username: str = Field(..., min_length=3, max_length=100)
-    full_name: str = Field(..., min_length=2, max_length=255)
-    phone_number: Optional[str] = Field(None, max_length=20)
+    username: UsernameStr
+    full_name: FullNameStr
+    phone_number: Optional[PhoneStr] = None
     profile_picture: Optional[str] = None
     is_active: bool = True
 
 
 class UserCreate(UserBase):
     """Schema for creating a new user."""
-    password: str = Field(..., min_length=8, max_length=100)
+    password: StrongPassword
     role: UserRole
-    
-    @validator('password')
-    def validate_password(cls, v):
-        """Validate password strength."""
-        if not any(c.isupper() for c in v):
-            raise ValueError('Password must contain at least one uppercase letter')
-        if not any(c.islower() for c in v):
-            raise ValueError('Password must contain at least one lowercase letter')
-        if not any(c.isdigit() for c in v):
-            raise ValueError('Password must contain at least one digit')
-        return v
 
 
 class UserUpdate(BaseModel):
     """Schema for updating user information."""
-    full_name: Optional[str] = Field(None, min_length=2, max_length=255)
-    phone_number: Optional[str] = Field(None, max_length=20)
+    full_name: Optional[FullNameStr] = None
+    phone_number: Optional[PhoneStr] = None
     profile_picture: Optional[str] = None
     is_active: Optional[bool] = None
 
@@ -59,8 +76,7 @@ class UserInDB(UserBase):
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True, defer_build=True)
 
 
 class UserResponse(UserBase):
@@ -69,15 +85,14 @@ class UserResponse(UserBase):
     role: UserRole
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 # Department schemas
 class DepartmentBase(BaseModel):
     """Base department schema."""
-    name: str = Field(..., min_length=2, max_length=255)
-    code: str = Field(..., min_length=2, max_length=10)
+    name: Annotated[str, StringConstraints(min_length=2, max_length=255)]
+    code: Annotated[str, StringConstraints(min_length=2, max_length=10)]
     description: Optional[str] = None
     head_of_department: Optional[str] = None
 
@@ -89,7 +104,7 @@ class DepartmentCreate(DepartmentBase):
 
 class DepartmentUpdate(BaseModel):
     """Schema for updating department information."""
-    name: Optional[str] = Field(None, min_length=2, max_length=255)
+    name: Optional[Annotated[str, StringConstraints(min_length=2, max_length=255)]] = None
     description: Optional[str] = None
     head_of_department: Optional[str] = None
 
@@ -99,18 +114,17 @@ class DepartmentResponse(DepartmentBase):
     id: int
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 # Student schemas
 class StudentBase(BaseModel):
     """Base student schema."""
-    student_id: str = Field(..., min_length=5, max_length=20)
-    class_name: str = Field(..., min_length=2, max_length=100)
+    student_id: Annotated[str, StringConstraints(min_length=5, max_length=20)]
+    class_name: Annotated[str, StringConstraints(min_length=2, max_length=100)]
     semester: int = Field(..., ge=1, le=8)
-    academic_year: str = Field(..., pattern=r'^\d{4}-\d{2}$')
-    cgpa: Optional[str] = Field(None, max_length=5)
+    academic_year: AcademicYear
+    cgpa: Optional[Annotated[str, StringConstraints(max_length=5)]] = None
     batch_year: int = Field(..., ge=2020, le=2030)
 
 
@@ -121,18 +135,18 @@ class StudentCreate(StudentBase):
     
     # User creation fields
     email: EmailStr
-    username: str = Field(..., min_length=3, max_length=100)
-    full_name: str = Field(..., min_length=2, max_length=255)
-    password: str = Field(..., min_length=8, max_length=100)
-    phone_number: Optional[str] = Field(None, max_length=20)
+    username: UsernameStr
+    full_name: FullNameStr
+    password: PasswordStr
+    phone_number: Optional[PhoneStr] = None
 
 
 class StudentUpdate(BaseModel):
     """Schema for updating student information."""
-    class_name: Optional[str] = Field(None, min_length=2, max_length=100)
+    class_name: Optional[Annotated[str, StringConstraints(min_length=2, max_length=100)]] = None
     semester: Optional[int] = Field(None, ge=1, le=8)
-    academic_year: Optional[str] = Field(None, pattern=r'^\d{4}-\d{2}$')
-    cgpa: Optional[str] = Field(None, max_length=5)
+    academic_year: Optional[AcademicYear] = None
+    cgpa: Optional[Annotated[str, StringConstraints(max_length=5)]] = None
 
 
 class StudentResponse(StudentBase):
@@ -144,20 +158,37 @@ class StudentResponse(StudentBase):
     current_streak: int
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+
+class StudentListItem(StudentBase):
+    """Flat student row for list endpoints, without nested user/department models."""
+    id: int
+    user_id: int
+    email: str
+    username: str
+    full_name: str
+    is_active: bool
+    department_id: int
+    department_name: str
+    department_code: str
+    total_points: int
+    current_streak: int
+    created_at: datetime
+    
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 # Faculty schemas
 class FacultyBase(BaseModel):
     """Base faculty schema."""
-    employee_id: str = Field(..., min_length=5, max_length=20)
-    designation: str = Field(..., min_length=2, max_length=100)
-    qualification: Optional[str] = Field(None, max_length=255)
-    specialization: Optional[str] = Field(None, max_length=255)
+    employee_id: Annotated[str, StringConstraints(min_length=5, max_length=20)]
+    designation: Annotated[str, StringConstraints(min_length=2, max_length=100)]
+    qualification: Optional[Annotated[str, StringConstraints(max_length=255)]] = None
+    specialization: Optional[Annotated[str, StringConstraints(max_length=255)]] = None
     experience_years: int = Field(default=0, ge=0)
-    office_location: Optional[str] = Field(None, max_length=100)
-    office_hours: Optional[str] = Field(None, max_length=200)
+    office_location: Optional[Annotated[str, StringConstraints(max_length=100)]] = None
+    office_hours: Optional[Annotated[str, StringConstraints(max_length=200)]] = None
 
 
 class FacultyCreate(FacultyBase):
@@ -167,20 +198,20 @@ class FacultyCreate(FacultyBase):
     
     # User creation fields
     email: EmailStr
-    username: str = Field(..., min_length=3, max_length=100)
-    full_name: str = Field(..., min_length=2, max_length=255)
-    password: str = Field(..., min_length=8, max_length=100)
-    phone_number: Optional[str] = Field(None, max_length=20)
+    username: UsernameStr
+    full_name: FullNameStr
+    password: PasswordStr
+    phone_number: Optional[PhoneStr] = None
 
 
 class FacultyUpdate(BaseModel):
     """Schema for updating faculty information."""
-    designation: Optional[str] = Field(None, min_length=2, max_length=100)
-    qualification: Optional[str] = Field(None, max_length=255)
-    specialization: Optional[str] = Field(None, max_length=255)
+    designation: Optional[Annotated[str, StringConstraints(min_length=2, max_length=100)]] = None
+    qualification: Optional[Annotated[str, StringConstraints(max_length=255)]] = None
+    specialization: Optional[Annotated[str, StringConstraints(max_length=255)]] = None
     experience_years: Optional[int] = Field(None, ge=0)
-    office_location: Optional[str] = Field(None, max_length=100)
-    office_hours: Optional[str] = Field(None, max_length=200)
+    office_location: Optional[Annotated[str, StringConstraints(max_length=100)]] = None
+    office_hours: Optional[Annotated[str, StringConstraints(max_length=200)]] = None
 
 
 class FacultyResponse(FacultyBase):
@@ -190,8 +221,23 @@ class FacultyResponse(FacultyBase):
     department: DepartmentResponse
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+
+class FacultyListItem(FacultyBase):
+    """Flat faculty row for list endpoints, without nested user/department models."""
+    id: int
+    user_id: int
+    email: str
+    username: str
+    full_name: str
+    is_active: bool
+    department_id: int
+    department_name: str
+    department_code: str
+    created_at: datetime
+    
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 # Authentication schemas
@@ -212,52 +258,38 @@ class TokenData(BaseModel):
 
 class LoginRequest(BaseModel):
     """Login request schema."""
-    username: str = Field(..., min_length=3)
-    password: str = Field(..., min_length=1)
+    username: Annotated[str, StringConstraints(min_length=3)]
+    password: Annotated[str, StringConstraints(min_length=1)]
 
 
 class RefreshTokenRequest(BaseModel):
     """Refresh token request schema."""
     refresh_token: str
 
+    model_config = ConfigDict(defer_build=True)
+
 
 class PasswordResetRequest(BaseModel):
     """Password reset request schema."""
     email: EmailStr
 
+    model_config = ConfigDict(defer_build=True)
+
 
 class PasswordResetConfirm(BaseModel):
     """Password reset confirmation schema."""
     token: str
-    new_password: str = Field(..., min_length=8, max_length=100)
-    
-    @validator('new_password')
-    def validate_password(cls, v):
-        """Validate password strength."""
-        if not any(c.isupper() for c in v):
-            raise ValueError('Password must contain at least one uppercase letter')
-        if not any(c.islower() for c in v):
-            raise ValueError('Password must contain at least one lowercase letter')
-        if not any(c.isdigit() for c in v):
-            raise ValueError('Password must contain at least one digit')
-        return v
+    new_password: StrongPassword
+
+    model_config = ConfigDict(defer_build=True)
 
 
 class ChangePasswordRequest(BaseModel):
     """Change password request schema."""
     current_password: str
-    new_password: str = Field(..., min_length=8, max_length=100)
-    
-    @validator('new_password')
-    def validate_password(cls, v):
-        """Validate password strength."""
-        if not any(c.isupper() for c in v):
-            raise ValueError('Password must contain at least one uppercase letter')
-        if not any(c.islower() for c in v):
-            raise ValueError('Password must contain at least one lowercase letter')
-        if not any(c.isdigit() for c in v):
-            raise ValueError('Password must contain at least one digit')
-        return v
+    new_password: StrongPassword
+
+    model_config = ConfigDict(defer_build=True)
 
 
 # Bulk operations schemas
@@ -266,12 +298,16 @@ class BulkStudentCreate(BaseModel):
     students: List[StudentCreate]
     send_welcome_email: bool = True
 
+    model_config = ConfigDict(defer_build=True)
+
 
 class BulkFacultyCreate(BaseModel):
     """Schema for bulk faculty creation."""
     faculty: List[FacultyCreate]
     send_welcome_email: bool = True
 
+    model_config = ConfigDict(defer_build=True)
+
 
 # Dashboard schemas
 class UserStats(BaseModel):
@@ -282,8 +318,17 @@ class UserStats(BaseModel):
     faculty: int
     admins: int
 
+    model_config = ConfigDict(defer_build=True)
+
 
 class DashboardSummary(BaseModel):
     """Dashboard summary schema."""
     user_stats: UserStats
     recent_registrations: List[UserResponse]
+
+    model_config = ConfigDict(defer_build=True)
+
+
+# Shared list adapters for the flat admin listings
+STUDENT_LIST_ADAPTER = TypeAdapter(List[StudentListItem])
+FACULTY_LIST_ADAPTER = TypeAdapter(List[FacultyListItem])
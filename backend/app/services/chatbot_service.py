@@ -3,32 +3,94 @@ Chatbot Service for AI-powered educational assistance using RAG
 """
 import logging
 import json
-from typing import List, Dict, Any, Optional, Tuple
+import hashlib
+import time
+from collections import OrderedDict, deque
+from typing import Deque, List, Dict, Any, Optional, Tuple
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 
-from app.services.llm_service import GroqLLMService
+from app.core.cache import cache_get_bytes, cache_set_bytes, get_redis_client
+from app.core.config import settings
+from app.services.llm_service import llm_service
 from app.services.vector_service import VectorStoreService, SearchResult
 
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+    logging.warning("msgpack not available. Chat sessions will be kept in process memory.")
+
 logger = logging.getLogger(__name__)
 
+CHAT_SESSION_CACHE_KEY = "chat:{}"
+
+# Short-lived retrieval cache for repeated questions within a course
+SEARCH_CACHE_TTL_SECONDS = 300
+SEARCH_CACHE_MAX_ENTRIES = 256
+SEARCH_CACHE_MAX_QUERY_WORDS = 64
+
+# Messages kept per in-memory session; older ones are evicted first
+MAX_CHAT_HISTORY = 100
+
+# Fixed prompt/response text used when retrieval finds nothing
+_NO_CONTEXT_PROMPT = """You are an AI educational assistant. The user is asking a question about their course material, 
+            but no specific context was found. Please provide a helpful general response and suggest they ask more specific questions."""
+
+_NO_RESULTS_MOCK = """I understand you have a question about your course material. However, I couldn't find specific content related to your question in the uploaded course materials. 
+
+Could you please:
+1. Ask a more specific question about the topics covered in your course
+2. Make sure the relevant course materials have been uploaded by your instructor
+3. Try rephrasing your question using keywords from your syllabus
+
+I'm here to help you learn from your course materials!"""
+
+_TOO_SHORT_REPLY = "Could you tell me a bit more? Ask a full question about your course material and I'll look it up for you."
+
+_SYSTEM_PROMPT_TEMPLATE = """You are an AI educational assistant helping a student with their coursework. 
+You have access to the following relevant course material to answer their question:
+
+{context_text}
+
+Instructions:
+1. Answer the student's question using ONLY the information provided in the context above
+2. If the context doesn't contain enough information to fully answer the question, say so clearly
+3. Be specific and educational in your response
+4. Reference which part of the course material (chapter) you're drawing from
+5. If applicable, provide examples or explanations to help the student understand better
+6. Keep your response concise but thorough
+7. If the student asks about something not covered in the provided context, politely redirect them to ask about topics covered in their course materials
+
+Student's Question: {user_question}
+
+Please provide a helpful, accurate response based on the course material provided."""
+
 class ChatMessage(BaseModel):
     """Represents a chat message"""
-    message_id: str
+    message_id: int  # sequence number within the session
     content: str
     role: str  # "user" or "assistant"
     timestamp: datetime
     metadata: Optional[Dict[str, Any]] = {}
 
+    model_config = ConfigDict(frozen=True, extra='forbid')
+
 class ChatSession(BaseModel):
     """Represents a chat session"""
     session_id: str
     student_id: int
     course_id: Optional[int]
-    messages: List[ChatMessage] = []
+    messages: Deque[ChatMessage] = Field(default_factory=lambda: deque(maxlen=MAX_CHAT_HISTORY))
+    user_message_count: int = 0
+    ai_message_count: int = 0
     created_at: datetime
     updated_at: datetime
 
+    # Mutable: messages, counters and updated_at change on every turn
+    model_config = ConfigDict(extra='forbid')
+
 class RAGResponse(BaseModel):
     """Response from RAG pipeline"""
     answer: str
@@ -36,50 +98,95 @@ class RAGResponse(BaseModel):
     confidence: float
     processing_time: float
 
+    model_config = ConfigDict(frozen=True, extra='forbid')
+
 class ChatbotService:
     """Main chatbot service with RAG capabilities"""
     
     def __init__(self):
-        self.llm_service = GroqLLMService()
+        # Shared instance, so chat traffic counts against the same Groq concurrency cap and rate-limit budget
+        self.llm_service = llm_service
         self.vector_service = VectorStoreService()
+        # Fallback store when Redis/msgpack are unavailable
         self.active_sessions: Dict[str, ChatSession] = {}
+        # (course_id, query digest) -> (expires_at, results), oldest first
+        self._search_cache: "OrderedDict[Tuple[Optional[int], bytes], Tuple[float, List[SearchResult]]]" = OrderedDict()
+        
+    async def _search_documents_cached(self, query: str, course_id: Optional[int], k: int) -> List[SearchResult]:
+        """Search the vector store, reusing recent results for repeated questions."""
+        # Long queries rarely repeat verbatim; don't spend cache slots on them
+        if len(query.split()) > SEARCH_CACHE_MAX_QUERY_WORDS:
+            return await self.vector_service.search_documents(query=query, course_id=course_id, k=k)
+        
+        digest = hashlib.blake2b(f"{k}:{query}".encode("utf-8"), digest_size=16).digest()
+        key = (course_id, digest)
+        now = time.monotonic()
+        
+        cached = self._search_cache.get(key)
+        if cached is not None:
+            expires_at, results = cached
+            if expires_at > now:
+                self._search_cache.move_to_end(key)
+                return results
+            del self._search_cache[key]
+        
+        results = await self.vector_service.search_documents(query=query, course_id=course_id, k=k)
+        
+        # Empty results may just mean materials are not indexed yet
+        if results:
+            self._search_cache[key] = (now + SEARCH_CACHE_TTL_SECONDS, results)
+            if len(self._search_cache) > SEARCH_CACHE_MAX_ENTRIES:
+                self._search_cache.popitem(last=False)
+        
+        return results
+    
+    def _use_session_cache(self) -> bool:
+        """Whether sessions are kept in Redis rather than process memory."""
+        return MSGPACK_AVAILABLE and get_redis_client() is not None
+    
+    def _load_session(self, session_id: str) -> Optional[ChatSession]:
+        """Load a chat session from Redis, or from process memory as a fallback."""
+        if not self._use_session_cache():
+            return self.active_sessions.get(session_id)
         
+        raw = cache_get_bytes(CHAT_SESSION_CACHE_KEY.format(session_id))
+        if raw is None:
+            return None
+        
+        try:
+            session = ChatSession.model_validate(msgpack.unpackb(raw))
+        except Exception as e:
+            logger.warning(f"Discarding unreadable chat session {session_id}: {e}")
+            return None
+        
+        session.messages = deque(session.messages, maxlen=MAX_CHAT_HISTORY)
+        return session
+    
+    def _save_session(self, session: ChatSession):
+        """Persist a chat session to Redis, or to process memory as a fallback."""
+        if not self._use_session_cache():
+            self.active_sessions[session.session_id] = session
+            return
+        
+        cache_set_bytes(
+            CHAT_SESSION_CACHE_KEY.format(session.session_id),
+            msgpack.packb(session.model_dump(mode="json")),
+            settings.chat_session_ttl_seconds
+        )
+    
     def _generate_system_prompt(self, context_docs: List[SearchResult], user_question: str) -> str:
         """Generate system prompt with retrieved context"""
         
         if not context_docs:
-            return """You are an AI educational assistant. The user is asking a question about their course material, 
-            but no specific context was found. Please provide a helpful general response and suggest they ask more specific questions."""
+            return _NO_CONTEXT_PROMPT
         
         # Build context from retrieved documents
-        context_parts = []
-        for i, doc in enumerate(context_docs):
-            context_parts.append(f"""
-Context {i+1} (from {doc.chapter_name}):
-{doc.content}
----""")
-        
-        context_text = "\n".join(context_parts)
+        context_text = "\n".join(
+            f"\nContext {i + 1} (from {doc.chapter_name}):\n{doc.content}\n---"
+            for i, doc in enumerate(context_docs)
+        )
         
-        system_prompt = f"""You are an AI educational assistant helping a student with their coursework. 
-You have access to the following relevant course material to answer their question:
-
-{context_text}
-
-Instructions:
-1. Answer the student's question using ONLY the information provided in the context above
-2. If the context doesn't contain enough information to fully answer the question, say so clearly
-3. Be specific and educational in your response
-4. Reference which part of the course material (chapter) you're drawing from
-5. If applicable, provide examples or explanations to help the student understand better
-6. Keep your response concise but thorough
-7. If the student asks about something not covered in the provided context, politely redirect them to ask about topics covered in their course materials
-
-Student's Question: {user_question}
-
-Please provide a helpful, accurate response based on the course material provided."""
-
-        return system_prompt
+        return _SYSTEM_PROMPT_TEMPLATE.format(context_text=context_text, user_question=user_question)
     
     async def process_message(
         self, 
@@ -89,12 +196,22 @@ Please provide a helpful, accurate response based on the course material provide
         course_id: Optional[int] = None
     ) -> RAGResponse:
         """Process a user message through the RAG pipeline"""
-        start_time = datetime.now()
+        start_time = time.perf_counter()
+        
+        # Skip retrieval and the LLM for empty or trivially short messages
+        question = user_message.strip()
+        if len(question) < 3 or not any(c.isalnum() for c in question):
+            return RAGResponse.model_construct(
+                answer=_TOO_SHORT_REPLY,
+                sources=[],
+                confidence=0.0,
+                processing_time=time.perf_counter() - start_time
+            )
         
         try:
             # Step 1: Retrieve relevant documents
             logger.info(f"Searching for relevant documents for query: {user_message}")
-            search_results = await self.vector_service.search_documents(
+            search_results = await self._search_documents_cached(
                 query=user_message,
                 course_id=course_id,
                 k=3  # Top 3 most relevant chunks
@@ -107,12 +224,12 @@ Please provide a helpful, accurate response based on the course material provide
             logger.info("Generating AI response")
             
             # For now, simulate the LLM response since we don't have a real API key
-            if not self.llm_service.client or "placeholder" in str(self.llm_service.client.api_key):
+            if self.llm_service.use_mock:
                 ai_response = self._generate_mock_response(search_results, user_message)
             else:
                 # Use actual Groq API
                 try:
-                    response = self.llm_service.client.chat.completions.create(
+                    response = await self.llm_service.create_chat_completion(
                         model="llama3-70b-8192",
                         messages=[
                             {"role": "system", "content": system_prompt},
@@ -132,9 +249,10 @@ Please provide a helpful, accurate response based on the course material provide
             # Step 5: Update chat session
             await self._update_chat_session(session_id, student_id, course_id, user_message, ai_response)
             
-            processing_time = (datetime.now() - start_time).total_seconds()
+            processing_time = time.perf_counter() - start_time
             
-            return RAGResponse(
+            # Built from server-side values only; skip re-validation
+            return RAGResponse.model_construct(
                 answer=ai_response,
                 sources=search_results,
                 confidence=confidence,
@@ -144,31 +262,24 @@ Please provide a helpful, accurate response based on the course material provide
         except Exception as e:
             logger.error(f"Failed to process message: {e}")
             # Return error response
-            return RAGResponse(
+            return RAGResponse.model_construct(
                 answer="I'm sorry, I encountered an error while processing your question. Please try asking again or rephrase your question.",
                 sources=[],
                 confidence=0.0,
-                processing_time=(datetime.now() - start_time).total_seconds()
+                processing_time=time.perf_counter() - start_time
             )
     
     def _generate_mock_response(self, search_results: List[SearchResult], user_message: str) -> str:
         """Generate a mock AI response for demonstration purposes"""
         if not search_results:
-            return """I understand you have a question about your course material. However, I couldn't find specific content related to your question in the uploaded course materials. 
-
-Could you please:
-1. Ask a more specific question about the topics covered in your course
-2. Make sure the relevant course materials have been uploaded by your instructor
-3. Try rephrasing your question using keywords from your syllabus
-
-I'm here to help you learn from your course materials!"""
+            return _NO_RESULTS_MOCK
 
         # Create a response based on the search results
         primary_source = search_results[0]
         
         response = f"""Based on your course material from **{primary_source.chapter_name}**, I can help answer your question.
 
-{primary_source.content[:200]}...
+{primary_source.preview}...
 
 This information relates to your question about: "{user_message}"
 
@@ -191,9 +302,17 @@ Would you like me to explain any specific part in more detail? I can help you un
         # 2. Average similarity scores
         # 3. Content length of results
         
-        num_results = len(search_results)
-        avg_score = sum(1.0 / (1.0 + result.score) for result in search_results) / num_results
-        content_quality = min(sum(len(result.content) for result in search_results) / 1000.0, 1.0)
+        # Accumulate all three in a single pass over the results
+        num_results = 0
+        score_total = 0.0
+        content_length = 0
+        for result in search_results:
+            num_results += 1
+            score_total += 1.0 / (1.0 + result.score)
+            content_length += len(result.content)
+        
+        avg_score = score_total / num_results
+        content_quality = min(content_length / 1000.0, 1.0)
         
         confidence = (avg_score * 0.4) + (content_quality * 0.3) + (min(num_results / 3.0, 1.0) * 0.3)
         return min(confidence, 0.95)  # Cap at 95%
@@ -209,42 +328,52 @@ Would you like me to explain any specific part in more detail? I can help you un
         """Update or create chat session with new messages"""
         now = datetime.now()
         
-        if session_id not in self.active_sessions:
+        # Sessions and messages are built from trusted server-side values
+        # (ids, timestamps, LLM output), so construct them without validation
+        session = self._load_session(session_id)
+        if session is None:
             # Create new session
-            self.active_sessions[session_id] = ChatSession(
+            session = ChatSession.model_construct(
                 session_id=session_id,
                 student_id=student_id,
                 course_id=course_id,
-                messages=[],
+                messages=deque(maxlen=MAX_CHAT_HISTORY),
+                user_message_count=0,
+                ai_message_count=0,
                 created_at=now,
                 updated_at=now
             )
         
-        session = self.active_sessions[session_id]
-        
-        # Add user message
-        user_msg = ChatMessage(
-            message_id=f"{session_id}_{len(session.messages)}",
+        # Add user message; ids are per-session sequence numbers taken from
+        # the counters, so they stay unique after old messages are evicted
+        seq = session.user_message_count + session.ai_message_count
+        user_msg = ChatMessage.model_construct(
+            message_id=seq,
             content=user_message,
             role="user",
-            timestamp=now
+            timestamp=now,
+            metadata={}
         )
         session.messages.append(user_msg)
+        session.user_message_count += 1
         
         # Add AI response
-        ai_msg = ChatMessage(
-            message_id=f"{session_id}_{len(session.messages)}",
+        ai_msg = ChatMessage.model_construct(
+            message_id=seq + 1,
             content=ai_response,
             role="assistant",
-            timestamp=now
+            timestamp=now,
+            metadata={}
         )
         session.messages.append(ai_msg)
+        session.ai_message_count += 1
         
         session.updated_at = now
+        self._save_session(session)
     
     async def get_chat_history(self, session_id: str) -> Optional[ChatSession]:
         """Get chat session history"""
-        return self.active_sessions.get(session_id)
+        return self._load_session(session_id)
     
     async def start_new_session(self, student_id: int, course_id: Optional[int] = None) -> str:
         """Start a new chat session"""
@@ -252,33 +381,32 @@ Would you like me to explain any specific part in more detail? I can help you un
         session_id = str(uuid4())
         
         now = datetime.now()
-        self.active_sessions[session_id] = ChatSession(
+        self._save_session(ChatSession.model_construct(
             session_id=session_id,
             student_id=student_id,
             course_id=course_id,
-            messages=[],
+            messages=deque(maxlen=MAX_CHAT_HISTORY),
+            user_message_count=0,
+            ai_message_count=0,
             created_at=now,
             updated_at=now
-        )
+        ))
         
         return session_id
     
     async def get_conversation_summary(self, session_id: str) -> Dict[str, Any]:
         """Get summary of conversation for analytics"""
-        session = self.active_sessions.get(session_id)
+        session = self._load_session(session_id)
         if not session:
             return {}
         
-        user_messages = [msg for msg in session.messages if msg.role == "user"]
-        ai_messages = [msg for msg in session.messages if msg.role == "assistant"]
-        
         return {
             'session_id': session_id,
             'student_id': session.student_id,
             'course_id': session.course_id,
-            'total_messages': len(session.messages),
-            'user_messages': len(user_messages),
-            'ai_responses': len(ai_messages),
+            'total_messages': session.user_message_count + session.ai_message_count,
+            'user_messages': session.user_message_count,
+            'ai_responses': session.ai_message_count,
             'session_duration': (session.updated_at - session.created_at).total_seconds(),
             'created_at': session.created_at.isoformat(),
             'updated_at': session.updated_at.isoformat()
@@ -2,14 +2,78 @@
 LLM Service for task generation and content processing using Groq API
 """
 import os
-import json
+import asyncio
+import hashlib
+import itertools
 import logging
-from typing import List, Dict, Any, Optional
-from groq import Groq
+import random
+import re
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
+import numpy as np
+import orjson
+from groq import AsyncGroq, APIConnectionError, InternalServerError, RateLimitError
 from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
 
+# Generated MCQ cache: exact prompt-input matches, plus paraphrased topics
+# for the same content/difficulty/count matched by embedding similarity
+MCQ_CACHE_TTL_SECONDS = 3600
+MCQ_CACHE_MAX_ENTRIES = 1024
+MCQ_TOPIC_SIMILARITY_THRESHOLD = 0.92
+
+# Retry policy for Groq calls (the SDK's own retries are disabled)
+GROQ_MAX_RETRIES = 5
+GROQ_BACKOFF_INITIAL_SECONDS = 0.5
+GROQ_BACKOFF_MAX_SECONDS = 30.0
+
+# Output budget per requested MCQ; the total scales with the count so large requests aren't cut off
+MCQ_MAX_TOKENS_PER_QUESTION = 256
+
+# Kept short: it is sent with every MCQ request and counts against the token limit
+_MCQ_SYSTEM_PROMPT = (
+    "You write multiple-choice questions for students. Reply with JSON only: "
+    '{"questions": [{"question": str, "options": [4 strings], "correct_answer": 0-3, "explanation": str}]}. '
+    "Each question has exactly one correct option and a brief explanation."
+)
+
+# Groq reset headers look like "1m26.4s", "7.66s" or "480ms"
+_RESET_DURATION_RE = re.compile(r"(?:(\d+)h)?(?:(\d+)m(?!s))?(?:([\d.]+)s)?(?:([\d.]+)ms)?$")
+
+
+def _parse_reset_seconds(value: Optional[str]) -> Optional[float]:
+    """Convert a Groq x-ratelimit-reset-* header value to seconds."""
+    if not value:
+        return None
+    
+    match = _RESET_DURATION_RE.match(value.strip())
+    if not match or not any(match.groups()):
+        return None
+    
+    hours, minutes, seconds, millis = match.groups()
+    return (
+        int(hours or 0) * 3600
+        + int(minutes or 0) * 60
+        + float(seconds or 0)
+        + float(millis or 0) / 1000
+    )
+
+
+def _retry_after_seconds(headers) -> Optional[float]:
+    """Read the server-requested wait from retry-after-ms / retry-after headers."""
+    try:
+        return float(headers["retry-after-ms"]) / 1000
+    except (KeyError, TypeError, ValueError):
+        pass
+    try:
+        return float(headers["retry-after"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
 class MCQQuestion(BaseModel):
     question: str
     options: List[str]
@@ -18,11 +82,156 @@ class MCQQuestion(BaseModel):
     difficulty: str  # "easy", "medium", "hard"
     chapter_topic: str
 
+# Mock MCQ templates as (question, options, correct_answer, explanation) with {topic} placeholders
+_MOCK_QUESTION_TEMPLATES: Tuple[Tuple[str, Tuple[str, ...], int, str], ...] = (
+    (
+        "What is the primary concept discussed in {topic}?",
+        (
+            "Basic principles of {topic}",
+            "Advanced applications of {topic}",
+            "Historical background of {topic}",
+            "Future trends in {topic}"
+        ),
+        0,
+        "The primary concept focuses on understanding the basic principles of {topic}."
+    ),
+    (
+        "Which of the following best describes {topic}?",
+        (
+            "A theoretical framework",
+            "A practical application",
+            "A comprehensive methodology",
+            "An experimental approach"
+        ),
+        2,
+        "{topic} is best described as a comprehensive methodology that encompasses both theory and practice."
+    ),
+    (
+        "What are the key benefits of understanding {topic}?",
+        (
+            "Improved problem-solving skills",
+            "Better analytical thinking",
+            "Enhanced practical knowledge",
+            "All of the above"
+        ),
+        3,
+        "Understanding {topic} provides multiple benefits including improved problem-solving, analytical thinking, and practical knowledge."
+    ),
+    (
+        "How does {topic} relate to real-world applications?",
+        (
+            "It has limited practical use",
+            "It provides theoretical foundation only",
+            "It offers direct practical applications",
+            "It requires further research"
+        ),
+        2,
+        "{topic} offers direct practical applications that can be implemented in real-world scenarios."
+    ),
+    (
+        "What is the most important aspect to remember about {topic}?",
+        (
+            "Its historical significance",
+            "Its core principles and concepts",
+            "Its future potential",
+            "Its complexity level"
+        ),
+        1,
+        "The most important aspect is understanding the core principles and concepts of {topic}."
+    ),
+)
+
+
+@lru_cache(maxsize=256)
+def _mock_question_fields(topic: str) -> Tuple[Tuple[Tuple[str, Tuple[str, ...], int, str], ...], Tuple[Tuple[str, Tuple[str, ...], int, str], ...]]:
+    """Formatted (base, extended) mock question fields for a topic; deterministic, so cached per topic."""
+    base = tuple(
+        (
+            question.format(topic=topic),
+            tuple(option.format(topic=topic) for option in options),
+            correct_answer,
+            explanation.format(topic=topic)
+        )
+        for question, options, correct_answer, explanation in _MOCK_QUESTION_TEMPLATES
+    )
+    # Past the template count, the templates repeat with a marker
+    extended = tuple((f"(Extended) {question}", *rest) for question, *rest in base)
+    return base, extended
+
+
+class _QuestionObjectScanner:
+    """
+    Incremental bracket-depth scanner over a streamed {"questions": [{...}, ...]} reply
+    (or a bare [{...}, ...] array). Returns the text of each question object as soon as
+    its closing brace arrives; text outside the JSON, such as code fences, is ignored.
+    """
+    
+    def __init__(self):
+        self._buffer: List[str] = []
+        self._depth = 0
+        # Depth of the question objects, decided by the first bracket of the reply
+        self._question_depth: Optional[int] = None
+        self._in_string = False
+        self._escaped = False
+        self._capturing = False
+    
+    def feed(self, text: str) -> List[str]:
+        completed = []
+        for char in text:
+            if self._capturing:
+                self._buffer.append(char)
+            
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+            
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                if self._question_depth is None:
+                    self._question_depth = 1 if char == "[" else 2
+                # Objects directly inside the questions array are questions
+                if char == "{" and self._depth == self._question_depth:
+                    self._capturing = True
+                    self._buffer = [char]
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._capturing and self._depth == self._question_depth:
+                    completed.append("".join(self._buffer))
+                    self._capturing = False
+                    self._buffer = []
+        return completed
+
+
 class GroqLLMService:
     """Service for interacting with Groq API for educational content generation"""
     
+    # Easy questions don't need the 70B model; the 8B one is faster and cheaper
+    SPEED_MAP = {
+        "easy": "llama-3.1-8b-instant",
+        "medium": "llama-3.3-70b-versatile",
+        "hard": "llama-3.3-70b-versatile",
+    }
+    
     def __init__(self):
         self.client = None
+        self.use_mock = True
+        # exact key -> (expires_at, questions), oldest first
+        self._mcq_cache: "OrderedDict[bytes, Tuple[float, List[MCQQuestion]]]" = OrderedDict()
+        # (content group key, unit topic embedding, exact key) for semantic lookups
+        self._mcq_topic_index: deque = deque(maxlen=MCQ_CACHE_MAX_ENTRIES)
+        # Caps concurrent Groq requests across all callers
+        self._semaphore = asyncio.Semaphore(int(os.getenv("GROQ_MAX_CONCURRENT", "8")))
+        # Latest rate-limit budget reported by Groq, valid until the reset time
+        self._remaining_requests: Optional[int] = None
+        self._remaining_tokens: Optional[int] = None
+        self._rate_limit_reset_at = 0.0
         self._initialize_client()
     
     def _initialize_client(self):
@@ -33,12 +242,106 @@ class GroqLLMService:
             if api_key == "gsk_placeholder_key":
                 logger.warning("Using placeholder Groq API key - set GROQ_API_KEY environment variable")
             
-            self.client = Groq(api_key=api_key)
+            self.client = AsyncGroq(api_key=api_key, max_retries=0)
+            self.use_mock = api_key == "gsk_placeholder_key"
             logger.info("Groq client initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize Groq client: {e}")
             self.client = None
     
+    async def create_chat_completion(self, **kwargs):
+        """Run a non-streamed Groq chat completion and return the parsed response"""
+        async with self.chat_completion(**kwargs) as response:
+            return response
+    
+    @asynccontextmanager
+    async def chat_completion(self, **kwargs) -> AsyncIterator[Any]:
+        """
+        Run a Groq chat completion while holding one slot of the shared concurrency limit
+        
+        The slot is released when the block exits, so a streamed reply counts against
+        GROQ_MAX_CONCURRENT until the caller has finished reading it.
+        Paces itself from Groq's rate-limit headers, honours retry-after on 429s
+        and retries connection/server errors with exponential backoff and jitter.
+        """
+        # Rough prompt size (~4 characters per token) plus the completion budget
+        prompt_chars = sum(len(message.get("content") or "") for message in kwargs.get("messages", []))
+        estimated_tokens = prompt_chars // 4 + kwargs.get("max_tokens", 0)
+        
+        backoff = GROQ_BACKOFF_INITIAL_SECONDS
+        for attempt in range(GROQ_MAX_RETRIES + 1):
+            await self._wait_for_rate_limit(estimated_tokens)
+            
+            # Slot is not held while backing off between attempts
+            async with self._semaphore:
+                try:
+                    raw_response = await self.client.chat.completions.with_raw_response.create(**kwargs)
+                except RateLimitError as e:
+                    if attempt == GROQ_MAX_RETRIES:
+                        raise
+                    wait = _retry_after_seconds(e.response.headers) or backoff
+                except (APIConnectionError, InternalServerError):
+                    if attempt == GROQ_MAX_RETRIES:
+                        raise
+                    wait = backoff
+                else:
+                    self._record_rate_limits(raw_response.headers)
+                    response = await raw_response.parse()
+                    try:
+                        yield response
+                    finally:
+                        # A stream abandoned part-way still gives its connection back
+                        if kwargs.get("stream"):
+                            await response.close()
+                    return
+            
+            wait = min(wait, GROQ_BACKOFF_MAX_SECONDS) + random.uniform(0, 0.25)
+            logger.warning(f"Groq request failed (attempt {attempt + 1}), retrying in {wait:.2f}s")
+            await asyncio.sleep(wait)
+            backoff = min(backoff * 2, GROQ_BACKOFF_MAX_SECONDS)
+    
+    async def _wait_for_rate_limit(self, estimated_tokens: int):
+        """Sleep until the reset time if the last reported budget can't cover this call."""
+        wait = self._rate_limit_reset_at - time.monotonic()
+        if wait <= 0:
+            return
+        
+        out_of_requests = self._remaining_requests is not None and self._remaining_requests <= 0
+        out_of_tokens = self._remaining_tokens is not None and self._remaining_tokens < estimated_tokens
+        if out_of_requests or out_of_tokens:
+            logger.info(f"Groq rate limit budget exhausted, waiting {wait:.2f}s")
+            await asyncio.sleep(wait)
+    
+    def _record_rate_limits(self, headers):
+        """Remember the request/token budget reported on a successful response."""
+        try:
+            self._remaining_requests = int(headers.get("x-ratelimit-remaining-requests"))
+            self._remaining_tokens = int(headers.get("x-ratelimit-remaining-tokens"))
+        except (TypeError, ValueError):
+            return
+        
+        resets = [
+            _parse_reset_seconds(headers.get("x-ratelimit-reset-requests")),
+            _parse_reset_seconds(headers.get("x-ratelimit-reset-tokens"))
+        ]
+        reset = max((value for value in resets if value is not None), default=0.0)
+        self._rate_limit_reset_at = time.monotonic() + reset
+    
+    async def generate_mcq_batch(self, items: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Generate MCQs for several chapters concurrently
+        
+        Args:
+            items: Keyword arguments for generate_mcq_from_content, one dict per chapter
+            
+        Returns:
+            One entry per item: its list of MCQQuestion objects, or the exception raised
+        """
+        return await asyncio.gather(
+            *(self.generate_mcq_from_content(**item) for item in items),
+            return_exceptions=True
+        )
+    
     async def generate_mcq_from_content(
         self, 
         content: str, 
@@ -62,136 +365,207 @@ class GroqLLMService:
             logger.error("Groq client not initialized")
             return self._generate_mock_questions(topic, num_questions, difficulty)
         
+        if self.use_mock:
+            # No real API key configured; mock questions are cheaper to build than to cache
+            return self._generate_mock_questions(topic, num_questions, difficulty)
+        
+        group_key, exact_key = self._mcq_cache_keys(content, topic, num_questions, difficulty)
+        topic_embedding = None
+        
+        cached = self._get_cached_mcqs(exact_key)
+        if cached is None:
+            # Encoding is CPU-bound; keep it off the event loop
+            topic_embedding = await asyncio.to_thread(self._embed_topic, topic)
+            cached = self._find_similar_cached_mcqs(group_key, topic_embedding)
+        if cached is not None:
+            logger.info(f"Serving {len(cached)} cached MCQ questions for topic: {topic}")
+            return cached
+        
         try:
-            prompt = self._create_mcq_prompt(content, topic, num_questions, difficulty)
-            
-            # For now, return mock data since we need actual Groq API key
-            # In production, this would call the actual API
             logger.info(f"Generating {num_questions} MCQ questions for topic: {topic}")
-            return self._generate_mock_questions(topic, num_questions, difficulty)
+            
+            questions = [
+                question async for question in
+                self._stream_generated_mcqs(content, topic, num_questions, difficulty)
+            ]
+            if not questions:
+                raise ValueError("No valid questions in model response")
+            if len(questions) < num_questions:
+                logger.warning(f"Model returned {len(questions)} of {num_questions} requested questions for topic: {topic}")
+            
+            self._cache_mcqs(group_key, exact_key, topic_embedding, questions)
+            return questions
             
         except Exception as e:
             logger.error(f"Error generating MCQ questions: {e}")
             return self._generate_mock_questions(topic, num_questions, difficulty)
     
+    def _mcq_cache_keys(self, content: str, topic: str, num_questions: int, difficulty: str) -> Tuple[bytes, bytes]:
+        """Hash the normalized prompt inputs into (content group key, exact key)."""
+        # Only the first 2000 characters of content reach the prompt
+        group = hashlib.blake2b(digest_size=16)
+        group.update(content[:2000].encode("utf-8"))
+        group.update(f"\x00{difficulty}\x00{num_questions}".encode("utf-8"))
+        group_key = group.digest()
+        
+        exact = hashlib.blake2b(group_key, digest_size=16)
+        exact.update(topic.strip().lower().encode("utf-8"))
+        return group_key, exact.digest()
+    
+    def _get_cached_mcqs(self, exact_key: bytes) -> Optional[List[MCQQuestion]]:
+        """Return copies of cached questions for an exact key, or None."""
+        entry = self._mcq_cache.get(exact_key)
+        if entry is None:
+            return None
+        
+        expires_at, questions = entry
+        if expires_at <= time.monotonic():
+            del self._mcq_cache[exact_key]
+            return None
+        
+        self._mcq_cache.move_to_end(exact_key)
+        # Callers may mutate the questions; hand out copies
+        return [question.model_copy(deep=True) for question in questions]
+    
+    def _embed_topic(self, topic: str) -> Optional[np.ndarray]:
+        """Unit-length topic embedding, or None when embeddings are unavailable."""
+        try:
+            # Imported lazily: loading the vector store is only worth it on a cache miss
+            from app.services.vector_service import vector_service
+            embedding = vector_service.embedding_service.encode_single(topic)
+        except Exception as e:
+            logger.warning(f"Topic embedding failed: {e}")
+            return None
+        
+        norm = float(np.linalg.norm(embedding)) if embedding.size else 0.0
+        if norm == 0.0:
+            return None
+        return embedding / norm
+    
+    def _find_similar_cached_mcqs(self, group_key: bytes, topic_embedding: Optional[np.ndarray]) -> Optional[List[MCQQuestion]]:
+        """Look up questions cached for the same content under a similar topic."""
+        if topic_embedding is None:
+            return None
+        
+        candidates = [
+            (embedding, exact_key)
+            for key, embedding, exact_key in self._mcq_topic_index
+            if key == group_key
+        ]
+        if not candidates:
+            return None
+        
+        similarities = np.stack([embedding for embedding, _ in candidates]) @ topic_embedding
+        best = int(np.argmax(similarities))
+        if similarities[best] < MCQ_TOPIC_SIMILARITY_THRESHOLD:
+            return None
+        
+        return self._get_cached_mcqs(candidates[best][1])
+    
+    def _cache_mcqs(
+        self,
+        group_key: bytes,
+        exact_key: bytes,
+        topic_embedding: Optional[np.ndarray],
+        questions: List[MCQQuestion]
+    ):
+        """Store generated questions under both cache tiers."""
+        self._mcq_cache[exact_key] = (
+            time.monotonic() + MCQ_CACHE_TTL_SECONDS,
+            [question.model_copy(deep=True) for question in questions]
+        )
+        self._mcq_cache.move_to_end(exact_key)
+        if len(self._mcq_cache) > MCQ_CACHE_MAX_ENTRIES:
+            self._mcq_cache.popitem(last=False)
+        
+        if topic_embedding is not None:
+            self._mcq_topic_index.append((group_key, topic_embedding, exact_key))
+    
     def _create_mcq_prompt(self, content: str, topic: str, num_questions: int, difficulty: str) -> str:
-        """Create a well-structured prompt for MCQ generation"""
-        return f"""
-        You are an expert educator creating multiple-choice questions for students.
-        
-        Topic: {topic}
-        Difficulty Level: {difficulty}
-        Content: {content[:2000]}...
-        
-        Generate {num_questions} multiple-choice questions based on the above content.
-        Each question should:
-        1. Be clear and unambiguous
-        2. Have 4 options (A, B, C, D)
-        3. Have exactly one correct answer
-        4. Include a brief explanation for the correct answer
-        5. Be at {difficulty} difficulty level
-        
-        Format your response as valid JSON:
-        {{
-            "questions": [
-                {{
-                    "question": "Question text here?",
-                    "options": ["Option A", "Option B", "Option C", "Option D"],
-                    "correct_answer": 0,
-                    "explanation": "Explanation for correct answer",
-                    "difficulty": "{difficulty}",
-                    "chapter_topic": "{topic}"
-                }}
-            ]
-        }}
+        """Create the user prompt for MCQ generation (format rules live in the system prompt)"""
+        return (
+            f"Topic: {topic}\n"
+            f"Difficulty: {difficulty}\n"
+            f"Write {num_questions} questions from this content:\n{content[:2000]}"
+        )
+    
+    async def stream_mcq_from_content(
+        self,
+        content: str,
+        topic: str,
+        num_questions: int = 5,
+        difficulty: str = "medium"
+    ) -> AsyncIterator[MCQQuestion]:
         """
+        Yield MCQ questions as soon as each one is complete in the streamed reply
+        
+        Falls back to mock questions when no real API key is configured.
+        """
+        if not self.client or self.use_mock:
+            for question in self._generate_mock_questions(topic, num_questions, difficulty):
+                yield question
+            return
+        
+        async for question in self._stream_generated_mcqs(content, topic, num_questions, difficulty):
+            yield question
+    
+    async def _stream_generated_mcqs(
+        self,
+        content: str,
+        topic: str,
+        num_questions: int,
+        difficulty: str
+    ) -> AsyncIterator[MCQQuestion]:
+        """Stream a Groq completion and parse each question object as it closes"""
+        # The concurrency slot stays held until the stream has been read
+        async with self.chat_completion(
+            model=self.SPEED_MAP.get(difficulty, self.SPEED_MAP["medium"]),
+            messages=[
+                {"role": "system", "content": _MCQ_SYSTEM_PROMPT},
+                {"role": "user", "content": self._create_mcq_prompt(content, topic, num_questions, difficulty)}
+            ],
+            # Deterministic output keeps the MCQ cache meaningful
+            temperature=0,
+            max_tokens=MCQ_MAX_TOKENS_PER_QUESTION * num_questions,
+            stream=True
+        ) as stream:
+            scanner = _QuestionObjectScanner()
+            produced = 0
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                
+                for raw_question in scanner.feed(delta):
+                    try:
+                        item = orjson.loads(raw_question)
+                        question = MCQQuestion.model_validate({**item, "difficulty": difficulty, "chapter_topic": topic})
+                    except Exception as e:
+                        logger.warning(f"Skipping malformed generated question: {e}")
+                        continue
+                    
+                    yield question
+                    produced += 1
+                    if produced >= num_questions:
+                        return
     
     def _generate_mock_questions(self, topic: str, num_questions: int, difficulty: str) -> List[MCQQuestion]:
         """Generate mock MCQ questions for development/testing"""
-        mock_questions = []
-        
-        question_templates = [
-            {
-                "question": f"What is the primary concept discussed in {topic}?",
-                "options": [
-                    f"Basic principles of {topic}",
-                    f"Advanced applications of {topic}",
-                    f"Historical background of {topic}",
-                    f"Future trends in {topic}"
-                ],
-                "correct_answer": 0,
-                "explanation": f"The primary concept focuses on understanding the basic principles of {topic}."
-            },
-            {
-                "question": f"Which of the following best describes {topic}?",
-                "options": [
-                    "A theoretical framework",
-                    "A practical application",
-                    "A comprehensive methodology",
-                    "An experimental approach"
-                ],
-                "correct_answer": 2,
-                "explanation": f"{topic} is best described as a comprehensive methodology that encompasses both theory and practice."
-            },
-            {
-                "question": f"What are the key benefits of understanding {topic}?",
-                "options": [
-                    "Improved problem-solving skills",
-                    "Better analytical thinking",
-                    "Enhanced practical knowledge",
-                    "All of the above"
-                ],
-                "correct_answer": 3,
-                "explanation": f"Understanding {topic} provides multiple benefits including improved problem-solving, analytical thinking, and practical knowledge."
-            },
-            {
-                "question": f"How does {topic} relate to real-world applications?",
-                "options": [
-                    "It has limited practical use",
-                    "It provides theoretical foundation only",
-                    "It offers direct practical applications",
-                    "It requires further research"
-                ],
-                "correct_answer": 2,
-                "explanation": f"{topic} offers direct practical applications that can be implemented in real-world scenarios."
-            },
-            {
-                "question": f"What is the most important aspect to remember about {topic}?",
-                "options": [
-                    "Its historical significance",
-                    "Its core principles and concepts",
-                    "Its future potential",
-                    "Its complexity level"
-                ],
-                "correct_answer": 1,
-                "explanation": f"The most important aspect is understanding the core principles and concepts of {topic}."
-            }
-        ]
-        
-        for i in range(min(num_questions, len(question_templates))):
-            template = question_templates[i]
-            mock_questions.append(MCQQuestion(
-                question=template["question"],
-                options=template["options"],
-                correct_answer=template["correct_answer"],
-                explanation=template["explanation"],
+        base, extended = _mock_question_fields(topic)
+        # Fields are pre-validated constants; each call still gets its own (mutable) MCQQuestion objects
+        mock_questions = [
+            MCQQuestion.model_construct(
+                question=question,
+                options=list(options),
+                correct_answer=correct_answer,
+                explanation=explanation,
                 difficulty=difficulty,
                 chapter_topic=topic
-            ))
-        
-        # If more questions needed, cycle through templates with variations
-        while len(mock_questions) < num_questions:
-            base_idx = len(mock_questions) % len(question_templates)
-            template = question_templates[base_idx]
-            
-            mock_questions.append(MCQQuestion(
-                question=f"(Extended) {template['question']}",
-                options=template["options"],
-                correct_answer=template["correct_answer"],
-                explanation=template["explanation"],
-                difficulty=difficulty,
-                chapter_topic=topic
-            ))
+            )
+            for question, options, correct_answer, explanation in itertools.islice(
+                itertools.chain(base, itertools.cycle(extended)), num_questions
+            )
+        ]
         
         logger.info(f"Generated {len(mock_questions)} mock questions for {topic}")
         return mock_questions
@@ -4,28 +4,207 @@ PDF Processing Service for handling document uploads and content extraction
 import os
 import logging
 import asyncio
-from typing import List, Dict, Any, Optional, Tuple
+import bisect
+import hashlib
+import multiprocessing
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator
 from pathlib import Path
-import aiofiles
-from PyPDF2 import PdfReader
+from dataclasses import dataclass
+import numpy as np
+import orjson
 import fitz  # PyMuPDF
+import pypdfium2 as pdfium
 from pydantic import BaseModel
 
+# JIT for the chunk-boundary scan
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    logging.warning("Numba not available. Install numba to JIT-compile PDF chunking.")
+
+from app.utils.pdf_extraction import extract_pages, extract_page_range
+
 # Import vector service for embedding storage
 from .vector_service import vector_service
 
 logger = logging.getLogger(__name__)
 
+# Documents with fewer pages are extracted in one thread; process dispatch would cost more than it saves
+PARALLEL_EXTRACTION_MIN_PAGES = 16
+
+
+def _extraction_worker_count() -> int:
+    """Worker count for extraction pools; a positive PDF_EXTRACTION_WORKERS overrides the CPU-based default"""
+    default = min(8, os.cpu_count() or 1)
+    configured = os.getenv("PDF_EXTRACTION_WORKERS", "").strip()
+    if not configured:
+        return default
+    try:
+        workers = int(configured)
+    except ValueError:
+        logger.warning(f"Ignoring non-integer PDF_EXTRACTION_WORKERS={configured!r}; using {default}")
+        return default
+    return workers if workers > 0 else default
+
+
+EXTRACTION_MAX_WORKERS = _extraction_worker_count()
+
+# PyMuPDF holds the GIL while extracting, so large documents are split across processes;
+# see _get_pdf_pool
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+
+# Page count/metadata kept per (path, mtime) so info lookups don't re-open recently parsed PDFs
+PDF_INFO_CACHE_MAX_ENTRIES = 32
+
+# Uploads are copied to disk in pieces of this size instead of being read whole
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Upload pieces are buffered up to this size and written in one thread hop
+UPLOAD_WRITE_BATCH_SIZE = 8 * 1024 * 1024
+
+# Leading characters of a document kept on PDFContent; the full text lives on only as chunks
+CONTENT_PREVIEW_CHARS = 3000
+
+# Code points str.isspace() (and so regex \s) accepts; the highest is U+3000
+_WHITESPACE_CODES = np.array([code for code in range(0x3001) if chr(code).isspace()], dtype=np.uint32)
+
+
+def _whitespace_offsets(content: str) -> np.ndarray:
+    """Character offsets of every whitespace character, found in one vectorised scan.
+    
+    UTF-32 gives one fixed-width code unit per character, so array indices are string offsets.
+    """
+    codes = np.frombuffer(content.encode("utf-32-le"), dtype=np.uint32)
+    return np.flatnonzero(np.isin(codes, _WHITESPACE_CODES))
+
+
+def _chunk_bounds_kernel(
+    content_length: int, spaces: np.ndarray, chunk_size: int, overlap: int, min_break: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Start/end offsets of overlapping chunks, breaking at whitespace where that keeps > min_break chars.
+    
+    Written as a plain scalar loop over numpy arrays so numba can compile it.
+    """
+    # Every step advances by at least this much, which bounds the number of chunks
+    min_step = max(min(chunk_size, min_break + 1) - overlap, 1)
+    starts = np.empty(content_length // min_step + 2, dtype=np.int64)
+    ends = np.empty(content_length // min_step + 2, dtype=np.int64)
+    count = 0
+    start = 0
+    while start < content_length:
+        end = min(start + chunk_size, content_length)
+        
+        # Break at the last whitespace unless the chunk already ends on one or the break loses too much
+        if end < content_length:
+            space_pos = np.searchsorted(spaces, end) - 1
+            if space_pos >= 0 and spaces[space_pos] != end - 1 and spaces[space_pos] > start + min_break:
+                end = spaces[space_pos]
+        
+        starts[count] = start
+        ends[count] = end
+        count += 1
+        
+        if end >= content_length:
+            break
+        start = max(end - overlap, start + 1)
+    return starts[:count], ends[:count]
+
+
+_compute_chunk_bounds = njit(cache=True)(_chunk_bounds_kernel) if NUMBA_AVAILABLE else _chunk_bounds_kernel
+
+
+class _FilenameCharTable(dict):
+    """str.translate table keeping alphanumerics, spaces, '-' and '_'; filled lazily per code point"""
+    
+    def __missing__(self, code: int) -> Optional[int]:
+        char = chr(code)
+        self[code] = code if char.isalnum() or char in " -_" else None
+        return self[code]
+
+
+_FILENAME_TABLE = _FilenameCharTable()
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    """Process pool for large-document extraction, started on first use and reused across uploads.
+    
+    Workers are spawned rather than forked from the threaded server process; they only
+    import app.utils.pdf_extraction, so the vector store is never loaded in them.
+    """
+    global _pdf_pool
+    if _pdf_pool is None:
+        _pdf_pool = ProcessPoolExecutor(
+            max_workers=EXTRACTION_MAX_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pdf_pool
+
+
+def shutdown_pdf_pool() -> None:
+    """Stop extraction worker processes, if any were started (called on application shutdown)"""
+    global _pdf_pool
+    if _pdf_pool is not None:
+        _pdf_pool.shutdown(cancel_futures=True)
+        _pdf_pool = None
+
+
+def _new_content_hash():
+    """Hash used to recognise re-uploads of an already processed PDF"""
+    return hashlib.blake2b(digest_size=16)
+
+
+def _file_content_digest(file_path: str) -> str:
+    """Content digest of a file on disk, read in upload-sized chunks"""
+    with open(file_path, 'rb') as f:
+        return hashlib.file_digest(f, _new_content_hash).hexdigest()
+
+
+def _sync_write_bytes(path: Path, data: bytes) -> None:
+    """Write a file in one go; dispatched to a thread once per write"""
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+async def read_upload_chunks(upload_file, chunk_size: int = UPLOAD_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Yield an uploaded file's content chunk by chunk (anything with an async read(n), e.g. UploadFile)"""
+    while chunk := await upload_file.read(chunk_size):
+        yield chunk
+
+
+def _join_pages(content_parts: List[Optional[str]]) -> Tuple[str, List[int]]:
+    """Join per-page text (None for empty pages) and record where each page starts.
+    
+    page_offsets[i] is the character offset of page i + 1 in the joined text; empty
+    pages share the offset of the next page with content.
+    """
+    page_offsets: List[int] = []
+    kept_parts: List[str] = []
+    offset = 0
+    for part in content_parts:
+        page_offsets.append(offset)
+        if part is not None:
+            kept_parts.append(part)
+            offset += len(part) + 1  # "\n" separator
+    return "\n".join(kept_parts), page_offsets
+
+
 class PDFContent(BaseModel):
     filename: str
     total_pages: int
-    content: str
+    content_preview: str  # First CONTENT_PREVIEW_CHARS characters of the document
+    content_length: int
     chunks: List[str]
     metadata: Dict[str, Any]
     file_size: int
     upload_path: str
 
-class ContentChunk(BaseModel):
+@dataclass(slots=True)
+class ContentChunk:
     chunk_id: str
     content: str
     page_number: int
@@ -42,13 +221,22 @@ class PDFProcessingService:
         # Updated chunking parameters as requested: 500 char chunks with 100 char overlap
         self.chunk_size = 500  # Characters per chunk
         self.chunk_overlap = 100  # Character overlap between chunks
+        # Blocking PyMuPDF/file work for single documents, kept off the event loop
+        self._exec = ThreadPoolExecutor(max_workers=EXTRACTION_MAX_WORKERS, thread_name_prefix="pdf-extract")
+        # Chunking and other pure-Python CPU work, kept off the event loop
+        self._cpu_exec = ThreadPoolExecutor(max_workers=2, thread_name_prefix="pdf-cpu")
+        # (path, mtime_ns) -> (page count, raw PyMuPDF metadata), oldest first
+        self._document_info_cache: "OrderedDict[Tuple[str, int], Tuple[int, Dict[str, Any]]]" = OrderedDict()
+        # Processed content by file digest, so re-uploads skip extraction and embedding
+        self._pdf_cache_dir = self.upload_dir / "processed"
+        self._pdf_cache_dir.mkdir(exist_ok=True)
     
-    async def save_uploaded_file(self, file_content: bytes, filename: str, course_id: int, chapter_name: str) -> str:
+    async def save_uploaded_file(self, file_stream: AsyncIterator[bytes], filename: str, course_id: int, chapter_name: str) -> str:
         """
-        Save uploaded PDF file to disk
+        Stream uploaded PDF file to disk
         
         Args:
-            file_content: Raw file bytes
+            file_stream: Async iterator of file chunks (see read_upload_chunks)
             filename: Original filename
             course_id: Associated course ID
             chapter_name: Chapter name for organization
@@ -56,11 +244,8 @@ class PDFProcessingService:
         Returns:
             File path where the PDF was saved
         """
+        file_path = None
         try:
-            # Validate file size
-            if len(file_content) > self.max_file_size:
-                raise ValueError(f"File size exceeds maximum limit of {self.max_file_size / (1024*1024):.1f}MB")
-            
             # Create directory structure: uploads/pdfs/course_<id>/
             course_dir = self.upload_dir / f"course_{course_id}"
             course_dir.mkdir(exist_ok=True)
@@ -69,38 +254,85 @@ class PDFProcessingService:
             safe_filename = self._generate_safe_filename(filename, chapter_name)
             file_path = course_dir / safe_filename
             
-            # Save file
-            async with aiofiles.open(file_path, 'wb') as f:
-                await f.write(file_content)
-            
-            logger.info(f"PDF saved successfully: {file_path}")
+            # Save file in batches of chunks, validating size as it arrives
+            size_so_far = 0
+            batch: List[bytes] = []
+            batch_size = 0
+            f = await asyncio.to_thread(open, file_path, 'wb')
+            try:
+                async for chunk in file_stream:
+                    size_so_far += len(chunk)
+                    if size_so_far > self.max_file_size:
+                        raise ValueError(f"File size exceeds maximum limit of {self.max_file_size / (1024*1024):.1f}MB")
+                    batch.append(chunk)
+                    batch_size += len(chunk)
+                    if batch_size >= UPLOAD_WRITE_BATCH_SIZE:
+                        await asyncio.to_thread(f.writelines, batch)
+                        batch, batch_size = [], 0
+                if batch:
+                    await asyncio.to_thread(f.writelines, batch)
+            finally:
+                await asyncio.to_thread(f.close)
+            
+            logger.info(f"PDF saved successfully: {file_path} ({size_so_far} bytes)")
             return str(file_path)
             
         except Exception as e:
             logger.error(f"Error saving PDF file {filename}: {e}")
+            # Don't leave a partial upload behind
+            if file_path is not None:
+                file_path.unlink(missing_ok=True)
             raise
     
-    async def process_pdf(self, file_path: str, course_id: int = 1, chapter_name: str = "Unknown Chapter", extract_images: bool = False) -> PDFContent:
+    async def process_pdf(
+        self,
+        file_path: str,
+        course_id: int = 1,
+        chapter_name: str = "Unknown Chapter",
+        extract_images: bool = False,
+        content_digest: Optional[str] = None
+    ) -> PDFContent:
         """
         Process PDF file and extract content
         
         Args:
             file_path: Path to the PDF file
             extract_images: Whether to extract images (future feature)
+            content_digest: Digest of the file content if already known (computed from disk otherwise)
             
         Returns:
             PDFContent object with extracted data
         """
         try:
             file_path_obj = Path(file_path)
-            if not file_path_obj.exists():
-                raise FileNotFoundError(f"PDF file not found: {file_path}")
+            try:
+                file_stat = file_path_obj.stat()
+            except FileNotFoundError:
+                raise FileNotFoundError(f"PDF file not found: {file_path}") from None
+            
+            if content_digest is None:
+                content_digest = await asyncio.get_running_loop().run_in_executor(self._exec, _file_content_digest, file_path)
+            
+            # Identical content was processed before: reuse it instead of re-parsing
+            cached = await self._load_processed_pdf(content_digest)
+            if cached is not None:
+                return await self._reuse_processed_pdf(
+                    cached, content_digest, file_path, file_stat, course_id, chapter_name
+                )
             
             # Extract content using PyMuPDF (more robust)
-            content, metadata, total_pages = await self._extract_with_pymupdf(file_path)
+            content, metadata, total_pages, page_offsets = await self._extract_with_pymupdf(file_path)
             
             # Create content chunks
-            chunks = self._create_content_chunks(content)
+            # Chunking is CPU-bound; keep it off the event loop
+            chunks = await asyncio.get_running_loop().run_in_executor(
+                self._cpu_exec, self._create_content_chunks, content, page_offsets
+            )
+            chunk_texts = [chunk.content for chunk in chunks]
+            content_preview = content[:CONTENT_PREVIEW_CHARS]
+            content_length = len(content)
+            # Chunks cover the whole text; don't hold a second copy through embedding
+            del content, chunks
             
             # Prepare metadata for vector storage
             vector_metadata = metadata.copy()
@@ -108,157 +340,227 @@ class PDFProcessingService:
                 'course_id': course_id,
                 'chapter_name': chapter_name,
                 'total_pages': total_pages,
-                'file_size': file_path_obj.stat().st_size,
-                'upload_timestamp': file_path_obj.stat().st_ctime
+                'file_size': file_stat.st_size,
+                'upload_timestamp': file_stat.st_ctime,
+                'content_digest': content_digest
             })
             
             # Store in vector database
-            await self._store_in_vector_db(content, file_path, chunks, vector_metadata)
+            await self._store_in_vector_db(file_path, chunk_texts, vector_metadata)
             
             # Create PDFContent object
             pdf_content = PDFContent(
                 filename=file_path_obj.name,
                 total_pages=total_pages,
-                content=content,
-                chunks=[chunk.content for chunk in chunks],
+                content_preview=content_preview,
+                content_length=content_length,
+                chunks=chunk_texts,
                 metadata=metadata,
-                file_size=file_path_obj.stat().st_size,
+                file_size=file_stat.st_size,
                 upload_path=file_path
             )
             
-            logger.info(f"PDF processed successfully: {pdf_content.filename} ({total_pages} pages, {len(chunks)} chunks)")
+            # Only processing output is cached; whether it is indexed is asked of the vector store
+            await self._save_processed_pdf(content_digest, {"pdf_content": pdf_content.model_dump()})
+            
+            logger.info(f"PDF processed successfully: {pdf_content.filename} ({total_pages} pages, {len(chunk_texts)} chunks)")
             return pdf_content
             
         except Exception as e:
             logger.error(f"Error processing PDF {file_path}: {e}")
             raise
     
-    async def _extract_with_pymupdf(self, file_path: str) -> Tuple[str, Dict[str, Any], int]:
-        """Extract content using PyMuPDF for better text extraction"""
+    async def _reuse_processed_pdf(
+        self,
+        cached: Dict[str, Any],
+        content_digest: str,
+        file_path: str,
+        file_stat: os.stat_result,
+        course_id: int,
+        chapter_name: str
+    ) -> PDFContent:
+        """Build the result for a re-uploaded PDF from its cached processing record"""
+        pdf_content = PDFContent.model_validate(cached["pdf_content"]).model_copy(
+            update={"filename": Path(file_path).name, "upload_path": file_path}
+        )
+        
+        # Chunks may already be embedded for this course/chapter; otherwise index them without re-parsing
+        if not vector_service.is_document_indexed(content_digest, course_id, chapter_name):
+            vector_metadata = pdf_content.metadata.copy()
+            vector_metadata.update({
+                'course_id': course_id,
+                'chapter_name': chapter_name,
+                'total_pages': pdf_content.total_pages,
+                'file_size': file_stat.st_size,
+                'upload_timestamp': file_stat.st_ctime,
+                'content_digest': content_digest
+            })
+            await self._store_in_vector_db(file_path, pdf_content.chunks, vector_metadata)
+        
+        logger.info(f"Reused processed content for {pdf_content.filename} ({content_digest})")
+        return pdf_content
+    
+    async def _load_processed_pdf(self, content_digest: str) -> Optional[Dict[str, Any]]:
+        """Load the processing record for a content digest, or None if it was never processed"""
+        cache_path = self._pdf_cache_dir / f"{content_digest}.json"
         try:
-            doc = fitz.open(file_path)
-            content_parts = []
-            metadata = {}
-            
-            # Extract document metadata
-            metadata = {
-                "title": doc.metadata.get("title", ""),
-                "author": doc.metadata.get("author", ""),
-                "subject": doc.metadata.get("subject", ""),
-                "creator": doc.metadata.get("creator", ""),
-                "creation_date": doc.metadata.get("creationDate", ""),
-                "modification_date": doc.metadata.get("modDate", "")
-            }
-            
-            # Extract text from each page
-            for page_num in range(doc.page_count):
-                page = doc[page_num]
-                page_text = page.get_text("text")
-                
-                if page_text.strip():  # Only add non-empty pages
-                    content_parts.append(f"\n--- Page {page_num + 1} ---\n{page_text}")
-            
+            record = orjson.loads(await asyncio.to_thread(cache_path.read_bytes))
+        except FileNotFoundError:
+            return None
+        except (OSError, orjson.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable processed-PDF cache entry {cache_path}: {e}")
+            return None
+        
+        # Records written before PDFContent dropped the full text are re-processed
+        if "content_preview" not in record["pdf_content"]:
+            return None
+        return record
+    
+    async def _save_processed_pdf(self, content_digest: str, record: Dict[str, Any]) -> None:
+        """Persist a processing record; written to a temp file first so readers never see a partial entry"""
+        cache_path = self._pdf_cache_dir / f"{content_digest}.json"
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.{id(record)}.tmp")
+        try:
+            await asyncio.to_thread(_sync_write_bytes, tmp_path, orjson.dumps(record))
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"Failed to cache processed PDF {content_digest}: {e}")
+            tmp_path.unlink(missing_ok=True)
+    
+    @asynccontextmanager
+    async def _open(self, file_path: str) -> AsyncIterator["fitz.Document"]:
+        """Open a PDF off the event loop and close it when done"""
+        doc = await asyncio.get_running_loop().run_in_executor(self._exec, fitz.open, file_path)
+        try:
+            yield doc
+        finally:
             doc.close()
-            
-            full_content = "\n".join(content_parts)
-            return full_content, metadata, doc.page_count
-            
-        except Exception as e:
-            logger.error(f"PyMuPDF extraction failed for {file_path}: {e}")
-            # Fallback to PyPDF2
-            return await self._extract_with_pypdf2(file_path)
     
-    async def _extract_with_pypdf2(self, file_path: str) -> Tuple[str, Dict[str, Any], int]:
-        """Fallback extraction using PyPDF2"""
+    def _get_cached_document_info(self, file_path: str, mtime_ns: int) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """Page count and metadata for this version of the file, if recently opened"""
+        key = (file_path, mtime_ns)
+        entry = self._document_info_cache.get(key)
+        if entry is not None:
+            self._document_info_cache.move_to_end(key)
+        return entry
+    
+    def _cache_document_info(self, file_path: str, mtime_ns: int, doc: "fitz.Document") -> Tuple[int, Dict[str, Any]]:
+        """Remember an open document's page count and metadata; the mtime in the key invalidates edits"""
+        entry = (doc.page_count, doc.metadata or {})
+        key = (file_path, mtime_ns)
+        self._document_info_cache[key] = entry
+        self._document_info_cache.move_to_end(key)
+        if len(self._document_info_cache) > PDF_INFO_CACHE_MAX_ENTRIES:
+            self._document_info_cache.popitem(last=False)
+        return entry
+    
+    async def _extract_with_pymupdf(self, file_path: str) -> Tuple[str, Dict[str, Any], int, List[int]]:
+        """Extract content using PyMuPDF for better text extraction"""
+        loop = asyncio.get_running_loop()
         try:
-            with open(file_path, 'rb') as file:
-                pdf_reader = PdfReader(file)
-                content_parts = []
-                metadata = {}
-                
-                # Extract metadata
-                if pdf_reader.metadata:
-                    metadata = {
-                        "title": pdf_reader.metadata.get("/Title", ""),
-                        "author": pdf_reader.metadata.get("/Author", ""),
-                        "subject": pdf_reader.metadata.get("/Subject", ""),
-                        "creator": pdf_reader.metadata.get("/Creator", ""),
-                        "creation_date": str(pdf_reader.metadata.get("/CreationDate", "")),
-                        "modification_date": str(pdf_reader.metadata.get("/ModDate", ""))
-                    }
-                
-                # Extract text from each page
-                for page_num, page in enumerate(pdf_reader.pages):
-                    try:
-                        page_text = page.extract_text()
-                        if page_text.strip():
-                            content_parts.append(f"\n--- Page {page_num + 1} ---\n{page_text}")
-                    except Exception as e:
-                        logger.warning(f"Failed to extract page {page_num + 1}: {e}")
-                        continue
+            async with self._open(file_path) as doc:
+                total_pages = doc.page_count
+                self._cache_document_info(file_path, os.stat(file_path).st_mtime_ns, doc)
                 
-                full_content = "\n".join(content_parts)
-                return full_content, metadata, len(pdf_reader.pages)
+                # Extract document metadata
+                metadata = {
+                    "title": doc.metadata.get("title", ""),
+                    "author": doc.metadata.get("author", ""),
+                    "subject": doc.metadata.get("subject", ""),
+                    "creator": doc.metadata.get("creator", ""),
+                    "creation_date": doc.metadata.get("creationDate", ""),
+                    "modification_date": doc.metadata.get("modDate", "")
+                }
                 
+                # Extraction never runs on the event loop: small documents reuse this handle
+                # in one thread, larger ones get one contiguous page range per worker process
+                if total_pages < PARALLEL_EXTRACTION_MIN_PAGES or EXTRACTION_MAX_WORKERS == 1:
+                    content_parts = await loop.run_in_executor(self._exec, extract_pages, doc, 0, total_pages)
+                else:
+                    step = -(-total_pages // EXTRACTION_MAX_WORKERS)
+                    pool = _get_pdf_pool()
+                    ranges = await asyncio.gather(*(
+                        loop.run_in_executor(pool, extract_page_range, file_path, start, min(start + step, total_pages))
+                        for start in range(0, total_pages, step)
+                    ))
+                    # Reassembled in page order
+                    content_parts = [part for page_range in ranges for part in page_range]
+        except fitz.FileDataError as e:
+            logger.error(f"PyMuPDF could not parse {file_path}: {e}")
+            # Fallback to pypdfium2 only for files PyMuPDF cannot read
+            return await loop.run_in_executor(self._exec, self._extract_with_pdfium, file_path)
+        
+        full_content, page_offsets = _join_pages(content_parts)
+        return full_content, metadata, total_pages, page_offsets
+    
+    def _extract_with_pdfium(self, file_path: str) -> Tuple[str, Dict[str, Any], int, List[int]]:
+        """Fallback extraction using pypdfium2"""
+        try:
+            pdf = pdfium.PdfDocument(file_path)
         except Exception as e:
-            logger.error(f"PyPDF2 extraction failed for {file_path}: {e}")
+            logger.error(f"pypdfium2 extraction failed for {file_path}: {e}")
             raise
+        
+        try:
+            total_pages = len(pdf)
+            content_parts: List[Optional[str]] = [None] * total_pages
+            
+            # Extract metadata
+            pdf_metadata = pdf.get_metadata_dict()
+            metadata = {
+                "title": pdf_metadata.get("Title", ""),
+                "author": pdf_metadata.get("Author", ""),
+                "subject": pdf_metadata.get("Subject", ""),
+                "creator": pdf_metadata.get("Creator", ""),
+                "creation_date": pdf_metadata.get("CreationDate", ""),
+                "modification_date": pdf_metadata.get("ModDate", "")
+            }
+            
+            # Extract text from each page
+            for page_num in range(total_pages):
+                try:
+                    page_text = pdf[page_num].get_textpage().get_text_range()
+                    if page_text.strip():
+                        content_parts[page_num] = f"\n--- Page {page_num + 1} ---\n{page_text}"
+                except Exception as e:
+                    logger.warning(f"Failed to extract page {page_num + 1}: {e}")
+                    continue
+            
+            full_content, page_offsets = _join_pages(content_parts)
+            return full_content, metadata, total_pages, page_offsets
+        finally:
+            pdf.close()
     
-    def _create_content_chunks(self, content: str) -> List[ContentChunk]:
+    def _create_content_chunks(self, content: str, page_offsets: List[int]) -> List[ContentChunk]:
         """Split content into manageable chunks for processing - Character-based chunking"""
         chunks = []
         
         if not content.strip():
             return chunks
         
-        chunk_index = 0
-        start_idx = 0
-        content_length = len(content)
+        # Whitespace offsets are located once; the boundary walk over them runs as one (JIT) call
+        spaces = _whitespace_offsets(content)
+        starts, ends = _compute_chunk_bounds(
+            len(content), spaces, self.chunk_size, self.chunk_overlap, int(self.chunk_size * 0.8)
+        )
         
-        while start_idx < content_length:
-            # Calculate end index for this chunk (500 characters)
-            end_idx = min(start_idx + self.chunk_size, content_length)
-            
-            # Extract chunk content
-            chunk_content = content[start_idx:end_idx]
-            
-            # Try to break at word boundary if we're not at the end
-            if end_idx < content_length and not chunk_content.endswith(' '):
-                # Find the last space within the chunk to avoid breaking words
-                last_space = chunk_content.rfind(' ')
-                if last_space > start_idx + (self.chunk_size * 0.8):  # Only if we don't lose too much content
-                    end_idx = start_idx + last_space
-                    chunk_content = content[start_idx:end_idx]
-            
+        for start_idx, end_idx in zip(starts.tolist(), ends.tolist()):
             # Clean up the chunk content
-            chunk_content = chunk_content.strip()
+            chunk_content = content[start_idx:end_idx].strip()
             
             if chunk_content:  # Only add non-empty chunks
-                # Create chunk object
-                chunk = ContentChunk(
-                    chunk_id=f"chunk_{chunk_index:03d}",
+                chunks.append(ContentChunk(
+                    chunk_id=f"chunk_{len(chunks):03d}",
                     content=chunk_content,
-                    page_number=self._estimate_page_number(chunk_content),
-                    chunk_index=chunk_index,
+                    page_number=max(bisect.bisect_right(page_offsets, start_idx), 1),
+                    chunk_index=len(chunks),
                     word_count=len(chunk_content.split())
-                )
-                
-                chunks.append(chunk)
-                chunk_index += 1
-            
-            # Move start index with overlap (100 characters back)
-            if end_idx >= content_length:
-                break
-            start_idx = end_idx - self.chunk_overlap
-            
-            # Ensure we don't go backwards
-            if start_idx < 0:
-                start_idx = end_idx
+                ))
         
         logger.info(f"Created {len(chunks)} content chunks (500 chars each, 100 char overlap)")
         return chunks
     
-    async def _store_in_vector_db(self, content: str, file_path: str, chunks: List[ContentChunk], metadata: Dict[str, Any]) -> bool:
+    async def _store_in_vector_db(self, file_path: str, chunks: List[str], metadata: Dict[str, Any]) -> bool:
         """Store PDF content in vector database with chunking"""
         try:
             # Extract course_id and chapter_name from metadata or file path
@@ -271,13 +573,20 @@ class PDFProcessingService:
                 'total_pages': metadata.get('total_pages', 0),
                 'file_size': metadata.get('file_size', 0),
                 'upload_timestamp': metadata.get('upload_timestamp'),
+                'content_digest': metadata.get('content_digest'),
                 'pdf_metadata': metadata
             }
             
-            # Index the document in vector database using our character-based chunks
+            # Index the document in vector database using our character-based chunks;
+            # all of them go down in one call so they are embedded as a batch
+            chunks = [chunk for chunk in chunks if chunk.strip()]
+            if not chunks:
+                logger.warning(f"No text chunks to index for {Path(file_path).name}")
+                return False
+            
             try:
                 success = await vector_service.index_document_with_chunks(
-                    chunks=[chunk.content for chunk in chunks],
+                    chunks=chunks,
                     source_file=Path(file_path).name,
                     course_id=course_id,
                     chapter_name=chapter_name,
@@ -292,46 +601,37 @@ class PDFProcessingService:
                 return success
             except Exception as e:
                 logger.warning(f"Vector database not available, continuing without indexing: {e}")
-                return True  # Return success even without vector database for now
+                return False
             
         except Exception as e:
             logger.error(f"Error storing PDF in vector database: {e}")
             return False
     
-    def _estimate_page_number(self, chunk_content: str) -> int:
-        """Estimate page number from chunk content (looks for page markers)"""
-        lines = chunk_content.split('\n')
-        for line in lines:
-            if line.strip().startswith('--- Page ') and line.strip().endswith(' ---'):
-                try:
-                    page_num = int(line.split()[2])
-                    return page_num
-                except (IndexError, ValueError):
-                    continue
-        return 1  # Default to page 1 if no marker found
-    
     def _generate_safe_filename(self, original_filename: str, chapter_name: str) -> str:
         """Generate a safe filename for storage"""
         # Clean chapter name
-        safe_chapter = "".join(c for c in chapter_name if c.isalnum() or c in (' ', '-', '_')).strip()
+        safe_chapter = chapter_name.translate(_FILENAME_TABLE).strip()
         safe_chapter = safe_chapter.replace(' ', '_')[:50]  # Limit length
         
         # Get file extension
         file_ext = Path(original_filename).suffix
         
         # Create safe filename
-        import time
-        timestamp = int(time.time())
+        timestamp = time.time_ns() // 1_000_000_000
         safe_filename = f"{safe_chapter}_{timestamp}{file_ext}"
         
         return safe_filename
     
     async def delete_pdf(self, file_path: str) -> bool:
-        """Delete PDF file from disk"""
+        """Delete PDF file from disk, along with its processed-content cache record"""
         try:
             file_path_obj = Path(file_path)
             if file_path_obj.exists():
+                content_digest = await asyncio.get_running_loop().run_in_executor(
+                    self._exec, _file_content_digest, file_path
+                )
                 file_path_obj.unlink()
+                (self._pdf_cache_dir / f"{content_digest}.json").unlink(missing_ok=True)
                 logger.info(f"PDF deleted successfully: {file_path}")
                 return True
             else:
@@ -345,31 +645,34 @@ class PDFProcessingService:
         """Get basic information about a PDF file"""
         try:
             file_path_obj = Path(file_path)
-            if not file_path_obj.exists():
-                raise FileNotFoundError(f"PDF file not found: {file_path}")
+            try:
+                file_stat = file_path_obj.stat()
+            except FileNotFoundError:
+                raise FileNotFoundError(f"PDF file not found: {file_path}") from None
             
-            # Use PyMuPDF for quick info extraction
-            doc = fitz.open(file_path)
+            # Reuse what an earlier open of this exact file version saw, else ask PyMuPDF
+            cached = self._get_cached_document_info(file_path, file_stat.st_mtime_ns)
+            if cached is None:
+                async with self._open(file_path) as doc:
+                    cached = self._cache_document_info(file_path, file_stat.st_mtime_ns, doc)
+            total_pages, metadata = cached
             
-            info = {
+            return {
                 "filename": file_path_obj.name,
-                "file_size": file_path_obj.stat().st_size,
-                "total_pages": doc.page_count,
-                "created": file_path_obj.stat().st_ctime,
-                "modified": file_path_obj.stat().st_mtime,
-                "metadata": doc.metadata if doc.metadata else {}
+                "file_size": file_stat.st_size,
+                "total_pages": total_pages,
+                "created": file_stat.st_ctime,
+                "modified": file_stat.st_mtime,
+                "metadata": dict(metadata)
             }
             
-            doc.close()
-            return info
-            
         except Exception as e:
             logger.error(f"Error getting PDF info for {file_path}: {e}")
             raise
     
     async def upload_and_process_pdf(
         self, 
-        file_content: bytes, 
+        file_stream: AsyncIterator[bytes], 
         filename: str, 
         course_id: int, 
         chapter_name: str,
@@ -379,7 +682,7 @@ class PDFProcessingService:
         Complete PDF upload and processing workflow with vector database storage
         
         Args:
-            file_content: Raw PDF file bytes
+            file_stream: Async iterator of PDF file chunks
             filename: Original filename
             course_id: Course ID for organization
             chapter_name: Chapter name
@@ -391,21 +694,26 @@ class PDFProcessingService:
         try:
             logger.info(f"Starting PDF upload and processing: {filename} for course {course_id}, chapter '{chapter_name}'")
             
-            # Step 1: Save the uploaded PDF file
-            file_path = await self.save_uploaded_file(file_content, filename, course_id, chapter_name)
+            # Step 1: Save the uploaded PDF file, hashing it on the way to disk
+            content_hash = _new_content_hash()
+            
+            async def hashed_stream():
+                async for chunk in file_stream:
+                    content_hash.update(chunk)
+                    yield chunk
+            
+            file_path = await self.save_uploaded_file(hashed_stream(), filename, course_id, chapter_name)
             
             # Step 2: Process PDF and store in vector database
             pdf_content = await self.process_pdf(
                 file_path=file_path,
                 course_id=course_id,
                 chapter_name=chapter_name,
-                extract_images=False
+                extract_images=False,
+                content_digest=content_hash.hexdigest()
             )
             
-            # Step 3: Get basic file info
-            pdf_info = await self.get_pdf_info(file_path)
-            
-            # Step 4: Prepare response with vector database statistics
+            # Step 3: Prepare response with vector database statistics
             try:
                 from .vector_service import vector_service
                 vector_stats = await vector_service.get_statistics()
@@ -434,7 +742,7 @@ class PDFProcessingService:
                     "chapter_name": chapter_name,
                     "description": description,
                     "chunks_created": len(pdf_content.chunks),
-                    "content_length": len(pdf_content.content)
+                    "content_length": pdf_content.content_length
                 },
                 "vector_database": {
                     "stored": True,
@@ -1,21 +1,54 @@
 """
 Task Generation Service for intelligent task assignment and performance analysis
 """
+import asyncio
+import heapq
 import logging
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func, desc
+from sqlalchemy import and_, case, func, desc, insert
 
-from app.models.user import Student
-from app.models.course import Course, Chapter
-from app.models.exam import ExamResult, ExamResponse
-from app.models.task import Task, TaskQuestion, TaskAssignment
+from app.models.user import User, Student
+from app.models.course import Chapter, CourseEnrollment
+from app.models.exam import ExamResult, ExamResponse, ExamQuestion
+from app.models.task import (
+    Task, TaskQuestion, TaskAssignment, TaskType, TaskDifficulty, QuestionType,
+    TASK_DIFFICULTY_BY_VALUE, PARTITION_TASK_RESPONSES, ensure_task_response_partitions
+)
 from app.services.llm_service import llm_service, MCQQuestion
 from app.services.pdf_service import pdf_service
 
 logger = logging.getLogger(__name__)
 
+# Personalized task goals mapped onto the stored task types
+TASK_TYPE_BY_GOAL = {
+    "improvement": TaskType.REMEDIAL,
+    "reinforcement": TaskType.PRACTICE,
+    "challenge": TaskType.PRACTICE,
+}
+
+# Bound on plans/results waiting between weekly scheduling stages
+TASK_PIPELINE_QUEUE_SIZE = 8
+
+# Concurrent LLM generations during weekly scheduling
+TASK_GENERATION_CONCURRENCY = 10
+
+
+@dataclass(slots=True)
+class _TaskPlan:
+    """Everything needed to generate and store one personalized task; plain data, no ORM objects"""
+    student_id: int
+    course_id: int
+    task_type: str
+    performance_analysis: Dict[str, Any]
+    target_chapters: List[Dict[str, Any]]
+    chapter_contents: List[str]
+    difficulty: str
+    num_questions: int
+
+
 class TaskGenerationService:
     """Service for intelligent task generation based on student performance"""
     
@@ -36,12 +69,14 @@ class TaskGenerationService:
             Dict containing performance analysis data
         """
         try:
-            # Get student's exam results with chapter breakdown
-            exam_results = db.query(ExamResult).filter(
+            # Exam count and average score in one aggregate query
+            total_exams, average_percentage = db.query(
+                func.count(ExamResult.id), func.avg(ExamResult.percentage)
+            ).filter(
                 ExamResult.student_id == student_id
-            ).all()
+            ).one()
             
-            if not exam_results:
+            if not total_exams:
                 logger.info(f"No exam results found for student {student_id}")
                 return {
                     "student_id": student_id,
@@ -51,40 +86,31 @@ class TaskGenerationService:
                     "recommendation": "Complete more assessments to get personalized recommendations"
                 }
             
-            # Analyze chapter-wise performance
-            chapter_performance = {}
-            total_score = 0
-            total_exams = 0
-            
-            for result in exam_results:
-                # Get exam responses to analyze chapter-wise performance
-                responses = db.query(ExamResponse).filter(
-                    ExamResponse.exam_result_id == result.id
-                ).all()
-                
-                # Calculate chapter performance from responses
-                chapter_scores = self._calculate_chapter_performance(db, responses)
-                
-                for chapter_id, score in chapter_scores.items():
-                    if chapter_id not in chapter_performance:
-                        chapter_performance[chapter_id] = []
-                    chapter_performance[chapter_id].append(score)
-                
-                total_score += result.score
-                total_exams += 1
-            
-            # Calculate average performance per chapter
-            chapter_averages = {}
-            for chapter_id, scores in chapter_performance.items():
-                chapter_averages[chapter_id] = sum(scores) / len(scores)
+            # Chapter-wise correctness over all of the student's auto-graded responses, aggregated in SQL
+            chapter_rows = db.query(
+                ExamQuestion.chapter_id,
+                Chapter.title,
+                func.sum(case((ExamResponse.is_correct.is_(True), 1), else_=0)),
+                func.count(ExamResponse.id)
+            ).join(
+                ExamResult, ExamResponse.exam_result_id == ExamResult.id
+            ).join(
+                ExamQuestion, ExamResponse.question_id == ExamQuestion.id
+            ).join(
+                Chapter, ExamQuestion.chapter_id == Chapter.id
+            ).filter(
+                ExamResult.student_id == student_id,
+                ExamResponse.is_correct.isnot(None)
+            ).group_by(
+                ExamQuestion.chapter_id, Chapter.title
+            ).all()
             
             # Identify weak and strong chapters
             weak_chapters = []
             strong_chapters = []
             
-            for chapter_id, avg_score in chapter_averages.items():
-                chapter = db.query(Chapter).filter(Chapter.id == chapter_id).first()
-                chapter_name = chapter.name if chapter else f"Chapter {chapter_id}"
+            for chapter_id, chapter_name, correct, total in chapter_rows:
+                avg_score = correct / total
                 
                 if avg_score < self.performance_threshold:
                     weak_chapters.append({
@@ -101,19 +127,22 @@ class TaskGenerationService:
                         "needs_improvement": False
                     })
             
-            # Sort by performance (weakest first for weak chapters)
-            weak_chapters.sort(key=lambda x: x["performance"])
-            strong_chapters.sort(key=lambda x: x["performance"], reverse=True)
+            # Only the extremes are reported: pick them without sorting every chapter
+            weakest_chapters = heapq.nsmallest(5, weak_chapters, key=lambda x: x["performance"])
+            strongest_chapters = heapq.nlargest(3, strong_chapters, key=lambda x: x["performance"])
             
-            overall_performance = total_score / total_exams if total_exams > 0 else 0.0
+            # Percentages are stored 0-100; performance is reported as a 0-1 fraction
+            overall_performance = (average_percentage or 0.0) / 100
             
             analysis = {
                 "student_id": student_id,
-                "weak_chapters": weak_chapters[:5],  # Top 5 weak areas
-                "strong_chapters": strong_chapters[:3],  # Top 3 strong areas
+                "weak_chapters": weakest_chapters,  # Top 5 weak areas
+                "strong_chapters": strongest_chapters,  # Top 3 strong areas
                 "overall_performance": round(overall_performance, 2),
                 "total_exams_taken": total_exams,
-                "recommendation": self._generate_recommendation(weak_chapters, overall_performance)
+                "recommendation": self._generate_recommendation(
+                    weakest_chapters, len(weak_chapters), overall_performance
+                )
             }
             
             logger.info(f"Performance analysis completed for student {student_id}: {len(weak_chapters)} weak chapters identified")
@@ -129,39 +158,14 @@ class TaskGenerationService:
                 "recommendation": "Unable to analyze performance at this time"
             }
     
-    def _calculate_chapter_performance(self, db: Session, responses: List[ExamResponse]) -> Dict[int, float]:
-        """Calculate performance per chapter from exam responses"""
-        chapter_scores = {}
-        
-        for response in responses:
-            if response.question and response.question.chapter_id:
-                chapter_id = response.question.chapter_id
-                is_correct = response.selected_option == response.question.correct_option
-                
-                if chapter_id not in chapter_scores:
-                    chapter_scores[chapter_id] = {"correct": 0, "total": 0}
-                
-                chapter_scores[chapter_id]["total"] += 1
-                if is_correct:
-                    chapter_scores[chapter_id]["correct"] += 1
-        
-        # Convert to percentage scores
-        chapter_averages = {}
-        for chapter_id, scores in chapter_scores.items():
-            if scores["total"] > 0:
-                chapter_averages[chapter_id] = scores["correct"] / scores["total"]
-        
-        return chapter_averages
-    
-    def _generate_recommendation(self, weak_chapters: List[Dict], overall_performance: float) -> str:
-        """Generate personalized recommendation based on performance"""
+    def _generate_recommendation(self, weak_chapters: List[Dict], weak_count: int, overall_performance: float) -> str:
+        """Generate personalized recommendation based on performance (weak_chapters weakest first)"""
         if not weak_chapters:
             if overall_performance >= 0.85:
                 return "Excellent performance! Consider exploring advanced topics or helping peers."
             else:
                 return "Good performance overall. Keep up the consistent effort!"
         
-        weak_count = len(weak_chapters)
         if weak_count == 1:
             return f"Focus on improving {weak_chapters[0]['chapter_name']} with additional practice."
         elif weak_count <= 3:
@@ -190,121 +194,173 @@ class TaskGenerationService:
             Task ID if successful, None otherwise
         """
         try:
-            # Analyze student performance
-            performance_analysis = await self.analyze_student_performance(db, student_id)
-            
-            if task_type == "improvement" and performance_analysis["weak_chapters"]:
-                # Focus on weak areas
-                target_chapters = performance_analysis["weak_chapters"][:3]
-                difficulty = "medium"
-                num_questions = min(self.max_questions_per_task, max(self.min_questions_per_task, len(target_chapters) * 3))
-            elif task_type == "reinforcement" and performance_analysis["strong_chapters"]:
-                # Reinforce strong areas
-                target_chapters = performance_analysis["strong_chapters"][:2]
-                difficulty = "medium"
-                num_questions = self.min_questions_per_task
-            else:
-                # General practice task
-                target_chapters = performance_analysis["weak_chapters"][:2] if performance_analysis["weak_chapters"] else []
-                if not target_chapters:
-                    # Get random chapters from the course
-                    chapters = db.query(Chapter).filter(Chapter.course_id == course_id).limit(2).all()
-                    target_chapters = [{"chapter_id": ch.id, "chapter_name": ch.name} for ch in chapters]
-                difficulty = "easy"
-                num_questions = self.min_questions_per_task
-            
-            if not target_chapters:
-                logger.warning(f"No target chapters found for student {student_id} in course {course_id}")
+            plan = await self._plan_personalized_task(db, student_id, course_id, task_type)
+            if plan is None:
                 return None
             
-            # Create task
-            task_title = self._generate_task_title(task_type, target_chapters)
-            task_description = await llm_service.generate_task_description(
-                [ch["chapter_name"] for ch in target_chapters],
-                performance_analysis
-            )
-            
-            # Create Task record
-            task = Task(
-                title=task_title,
-                description=task_description,
-                course_id=course_id,
-                created_by=1,  # System-generated tasks
-                task_type=task_type,
-                difficulty_level=difficulty,
-                total_questions=num_questions,
-                time_limit_minutes=num_questions * 2,  # 2 minutes per question
-                is_active=True,
-                created_at=datetime.utcnow()
-            )
-            
-            db.add(task)
-            db.flush()  # Get task ID
-            
-            # Generate questions for each target chapter
-            questions_created = 0
-            for chapter_info in target_chapters:
-                chapter_id = chapter_info["chapter_id"]
-                chapter_name = chapter_info["chapter_name"]
-                
-                # Get chapter content (mock for now)
-                chapter_content = await self._get_chapter_content(db, chapter_id)
-                
-                # Generate questions using LLM
-                questions_per_chapter = max(1, num_questions // len(target_chapters))
-                mcq_questions = await llm_service.generate_mcq_from_content(
-                    chapter_content, 
-                    chapter_name, 
-                    questions_per_chapter, 
-                    difficulty
-                )
-                
-                # Create TaskQuestion records
-                for i, mcq in enumerate(mcq_questions):
-                    if questions_created >= num_questions:
-                        break
-                    
-                    task_question = TaskQuestion(
-                        task_id=task.id,
-                        question_text=mcq.question,
-                        option_a=mcq.options[0],
-                        option_b=mcq.options[1],
-                        option_c=mcq.options[2],
-                        option_d=mcq.options[3],
-                        correct_option=mcq.correct_answer,
-                        explanation=mcq.explanation,
-                        chapter_id=chapter_id,
-                        difficulty_level=mcq.difficulty,
-                        question_order=questions_created + 1
-                    )
-                    
-                    db.add(task_question)
-                    questions_created += 1
-            
-            # Update task with actual question count
-            task.total_questions = questions_created
-            
-            # Assign task to student
-            assignment = TaskAssignment(
-                task_id=task.id,
-                student_id=student_id,
-                assigned_by=1,  # System assignment
-                assigned_at=datetime.utcnow(),
-                due_date=datetime.utcnow() + timedelta(days=7),  # 1 week deadline
-                status="assigned"
-            )
-            
-            db.add(assignment)
-            db.commit()
-            
-            logger.info(f"Generated personalized {task_type} task {task.id} for student {student_id} with {questions_created} questions")
-            return task.id
+            task_description, chapter_questions = await self._generate_task_content(plan)
+            return self._save_personalized_task(db, plan, task_description, chapter_questions)
             
         except Exception as e:
             logger.error(f"Error generating personalized task for student {student_id}: {e}")
             db.rollback()
             return None
     
+    async def _plan_personalized_task(
+        self,
+        db: Session,
+        student_id: int,
+        course_id: int,
+        task_type: str
+    ) -> Optional[_TaskPlan]:
+        """Pick target chapters, difficulty and size for a task and load the chapter content"""
+        # Analyze student performance
+        performance_analysis = await self.analyze_student_performance(db, student_id)
+        
+        if task_type == "improvement" and performance_analysis["weak_chapters"]:
+            # Focus on weak areas
+            target_chapters = performance_analysis["weak_chapters"][:3]
+            difficulty = "medium"
+            num_questions = min(self.max_questions_per_task, max(self.min_questions_per_task, len(target_chapters) * 3))
+        elif task_type == "reinforcement" and performance_analysis["strong_chapters"]:
+            # Reinforce strong areas
+            target_chapters = performance_analysis["strong_chapters"][:2]
+            difficulty = "medium"
+            num_questions = self.min_questions_per_task
+        else:
+            # General practice task
+            target_chapters = performance_analysis["weak_chapters"][:2] if performance_analysis["weak_chapters"] else []
+            if not target_chapters:
+                # Get random chapters from the course
+                chapters = db.query(Chapter.id, Chapter.title).filter(Chapter.course_id == course_id).limit(2).all()
+                target_chapters = [{"chapter_id": chapter_id, "chapter_name": title} for chapter_id, title in chapters]
+            difficulty = "easy"
+            num_questions = self.min_questions_per_task
+        
+        if not target_chapters:
+            logger.warning(f"No target chapters found for student {student_id} in course {course_id}")
+            return None
+        
+        # Get chapter content (mock for now); each chapter's query runs before its PDF await
+        chapter_contents = list(await asyncio.gather(*(
+            self._get_chapter_content(db, chapter_info["chapter_id"])
+            for chapter_info in target_chapters
+        )))
+        
+        return _TaskPlan(
+            student_id=student_id,
+            course_id=course_id,
+            task_type=task_type,
+            performance_analysis=performance_analysis,
+            target_chapters=target_chapters,
+            chapter_contents=chapter_contents,
+            difficulty=difficulty,
+            num_questions=num_questions
+        )
+    
+    async def _generate_task_content(self, plan: _TaskPlan) -> Tuple[str, List[List[MCQQuestion]]]:
+        """LLM stage: task description and MCQs per target chapter (no database access)"""
+        # Generate questions for all target chapters at once, alongside the description
+        questions_per_chapter = max(1, plan.num_questions // len(plan.target_chapters))
+        task_description, batch_results = await asyncio.gather(
+            llm_service.generate_task_description(
+                [ch["chapter_name"] for ch in plan.target_chapters],
+                plan.performance_analysis
+            ),
+            llm_service.generate_mcq_batch([
+                {
+                    "content": chapter_content,
+                    "topic": chapter_info["chapter_name"],
+                    "num_questions": questions_per_chapter,
+                    "difficulty": plan.difficulty
+                }
+                for chapter_info, chapter_content in zip(plan.target_chapters, plan.chapter_contents)
+            ])
+        )
+        
+        # A failed chapter only costs its own questions
+        chapter_questions = []
+        for chapter_info, result in zip(plan.target_chapters, batch_results):
+            if isinstance(result, Exception):
+                logger.warning(f"MCQ generation failed for chapter {chapter_info['chapter_id']}: {result}")
+                continue
+            chapter_questions.append(result)
+        
+        if not chapter_questions:
+            raise RuntimeError(f"MCQ generation failed for every target chapter of student {plan.student_id}")
+        
+        return task_description, chapter_questions
+    
+    def _save_personalized_task(
+        self,
+        db: Session,
+        plan: _TaskPlan,
+        task_description: str,
+        chapter_questions: List[List[MCQQuestion]]
+    ) -> int:
+        """Store the task, its questions and the student's assignment in one transaction"""
+        # Create Task record
+        task = Task(
+            title=self._generate_task_title(plan.task_type, plan.target_chapters),
+            description=task_description,
+            course_id=plan.course_id,
+            chapter_id=plan.target_chapters[0]["chapter_id"],
+            created_by_id=None,  # System-generated tasks
+            is_auto_generated=True,
+            task_type=TASK_TYPE_BY_GOAL.get(plan.task_type, TaskType.PRACTICE),
+            difficulty_level=TASK_DIFFICULTY_BY_VALUE[plan.difficulty],
+            total_questions=plan.num_questions,
+            time_limit_minutes=plan.num_questions * 2,  # 2 minutes per question
+            is_active=True
+        )
+        
+        db.add(task)
+        db.flush()  # Get task ID
+        
+        # Collect TaskQuestion rows for a single multi-row INSERT
+        question_rows = []
+        for mcq in (mcq for mcq_questions in chapter_questions for mcq in mcq_questions):
+            if len(question_rows) >= plan.num_questions:
+                break
+            
+            option_labels = "ABCDEFGH"[:len(mcq.options)]
+            question_rows.append({
+                "task_id": task.id,
+                "question_number": len(question_rows) + 1,
+                "question_text": mcq.question,
+                "question_type": QuestionType.MCQ,
+                "options": dict(zip(option_labels, mcq.options)),
+                "correct_answer": option_labels[mcq.correct_answer],
+                "explanation": mcq.explanation,
+                "difficulty_level": TASK_DIFFICULTY_BY_VALUE.get(mcq.difficulty, TaskDifficulty.MEDIUM),
+                "is_auto_generated": True
+            })
+        
+        question_ids = []
+        if question_rows:
+            question_ids = db.scalars(
+                insert(TaskQuestion).returning(TaskQuestion.id),
+                question_rows
+            ).all()
+        questions_created = len(question_ids)
+        
+        # Update task with actual question count
+        task.total_questions = questions_created
+        
+        # Assign task to student
+        assignment = TaskAssignment(
+            task_id=task.id,
+            student_id=plan.student_id,
+            due_date=datetime.utcnow() + timedelta(days=7),  # 1 week deadline
+            is_auto_assigned=True  # System assignment
+        )
+        
+        db.add(assignment)
+        db.commit()
+        
+        logger.info(f"Generated personalized {plan.task_type} task {task.id} for student {plan.student_id} with {questions_created} questions")
+        return task.id
+    
     def _generate_task_title(self, task_type: str, target_chapters: List[Dict]) -> str:
         """Generate an appropriate title for the task"""
         chapter_names = [ch["chapter_name"] for ch in target_chapters[:2]]
@@ -330,7 +386,7 @@ class TaskGenerationService:
             if hasattr(chapter, 'pdf_path') and chapter.pdf_path:
                 try:
                     pdf_content = await pdf_service.process_pdf(chapter.pdf_path)
-                    return pdf_content.content[:3000]  # First 3000 characters
+                    return pdf_content.content_preview  # First 3000 characters
                 except Exception as e:
                     logger.warning(f"Could not extract PDF content for chapter {chapter_id}: {e}")
             
@@ -339,7 +395,7 @@ class TaskGenerationService:
                 return chapter.description
             else:
                 return f"""
-                This chapter covers the fundamental concepts and principles of {chapter.name}.
+                This chapter covers the fundamental concepts and principles of {chapter.title}.
                 Students will learn about the key topics, practical applications, and theoretical foundations.
                 The material includes important definitions, examples, and case studies that demonstrate
                 real-world applications of the concepts discussed.
@@ -350,34 +406,97 @@ class TaskGenerationService:
             return f"Educational content for {chapter_id}"
     
     async def schedule_weekly_tasks(self, db: Session) -> Dict[str, Any]:
-        """Schedule weekly tasks for all active students"""
+        """
+        Schedule weekly tasks for all active students
+        
+        Runs as three stages joined by bounded queues so content loading, LLM generation
+        and database writes for different students overlap:
+        planner (analysis + chapter content) -> generators (LLM) -> writer (DB).
+        TASK_GENERATION_CONCURRENCY generators share the plan queue, bounding LLM fan-out.
+        Only the planner and writer touch the session, and neither awaits mid-transaction.
+        """
         try:
-            students = db.query(Student).filter(Student.is_active == True).all()
+            # Weekly runs keep the monthly task_responses partitions ahead of incoming rows
+            if PARTITION_TASK_RESPONSES:
+                with db.get_bind().engine.begin() as conn:
+                    ensure_task_response_partitions(conn)
+            
+            student_ids = [
+                student_id for (student_id,) in db.query(Student.id).join(
+                    User, Student.user_id == User.id
+                ).filter(User.is_active == True).all()
+            ]
+            # Limit to 1 course per student per week: their lowest active enrollment
+            course_by_student = dict(
+                db.query(CourseEnrollment.student_id, func.min(CourseEnrollment.course_id)).filter(
+                    CourseEnrollment.student_id.in_(student_ids),
+                    CourseEnrollment.status == "active"
+                ).group_by(CourseEnrollment.student_id).all()
+            ) if student_ids else {}
+            
             results = {
-                "total_students": len(students),
+                "total_students": len(student_ids),
                 "tasks_generated": 0,
                 "errors": []
             }
             
-            for student in students:
+            def record_error(student_id: int, e: Exception) -> None:
+                error_msg = f"Failed to generate task for student {student_id}: {e}"
+                logger.error(error_msg)
+                results["errors"].append(error_msg)
+            
+            plan_queue: asyncio.Queue = asyncio.Queue(maxsize=TASK_PIPELINE_QUEUE_SIZE)
+            save_queue: asyncio.Queue = asyncio.Queue(maxsize=TASK_PIPELINE_QUEUE_SIZE)
+            
+            async def planner():
                 try:
-                    # Get student's enrolled courses
-                    courses = db.query(Course).join(
-                        # Assuming enrollment relationship exists
-                        Course.id == student.id  # This would be the proper join in real implementation
-                    ).all()
-                    
-                    for course in courses[:1]:  # Limit to 1 course per student per week
-                        task_id = await self.generate_personalized_task(
-                            db, student.id, course.id, "improvement"
-                        )
-                        if task_id:
-                            results["tasks_generated"] += 1
-                        
-                except Exception as e:
-                    error_msg = f"Failed to generate task for student {student.id}: {e}"
-                    logger.error(error_msg)
-                    results["errors"].append(error_msg)
+                    for student_id in student_ids:
+                        course_id = course_by_student.get(student_id)
+                        if course_id is None:
+                            continue
+                        try:
+                            plan = await self._plan_personalized_task(db, student_id, course_id, "improvement")
+                        except Exception as e:
+                            record_error(student_id, e)
+                            continue
+                        if plan is not None:
+                            await plan_queue.put(plan)
+                finally:
+                    for _ in range(TASK_GENERATION_CONCURRENCY):
+                        await plan_queue.put(None)
+            
+            async def generator():
+                try:
+                    while (plan := await plan_queue.get()) is not None:
+                        try:
+                            content = await self._generate_task_content(plan)
+                        except Exception as e:
+                            record_error(plan.student_id, e)
+                            continue
+                        await save_queue.put((plan, content))
+                finally:
+                    await save_queue.put(None)
+            
+            async def writer():
+                active_generators = TASK_GENERATION_CONCURRENCY
+                while active_generators:
+                    item = await save_queue.get()
+                    if item is None:
+                        active_generators -= 1
+                        continue
+                    plan, (task_description, chapter_questions) = item
+                    try:
+                        self._save_personalized_task(db, plan, task_description, chapter_questions)
+                        results["tasks_generated"] += 1
+                    except Exception as e:
+                        db.rollback()
+                        record_error(plan.student_id, e)
+            
+            await asyncio.gather(
+                planner(),
+                *(generator() for _ in range(TASK_GENERATION_CONCURRENCY)),
+                writer()
+            )
             
             logger.info(f"Weekly task scheduling completed: {results['tasks_generated']} tasks generated for {results['total_students']} students")
             return results
@@ -4,15 +4,20 @@ Contains business logic for user management operations.
 """
 
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, func
 from typing import List, Optional
 from fastapi import HTTPException, status
 
-from app.models.user import User, UserRole, Department, Student, Faculty
+from app.models.user import (
+    User, UserRole, Department, Student, Faculty,
+    DEPARTMENT_CACHE_KEY, DEPARTMENT_LIST_CACHE_KEY
+)
 from app.schemas.user import (
     UserCreate, UserUpdate, StudentCreate, FacultyCreate,
-    DepartmentCreate, DepartmentUpdate
+    DepartmentCreate, DepartmentUpdate, DepartmentResponse
 )
+from app.core.cache import cache_get_json, cache_set_json
+from app.core.config import settings
 from app.core.security import get_password_hash, verify_password
 import logging
 
@@ -31,16 +36,19 @@ class UserService:
     
     def get_user_by_email(self, email: str) -> Optional[User]:
         """Get user by email."""
-        return self.db.query(User).filter(User.email == email).first()
+        return self.db.query(User).filter(func.lower(User.email) == email.lower()).first()
     
     def get_user_by_username(self, username: str) -> Optional[User]:
         """Get user by username."""
-        return self.db.query(User).filter(User.username == username).first()
+        return self.db.query(User).filter(func.lower(User.username) == username.lower()).first()
     
     def authenticate_user(self, username: str, password: str) -> Optional[User]:
         """Authenticate user with username/email and password."""
         user = self.db.query(User).filter(
-            or_(User.username == username, User.email == username)
+            or_(
+                func.lower(User.username) == username.lower(),
+                func.lower(User.email) == username.lower()
+            )
         ).first()
         
         if user and verify_password(password, user.hashed_password):
@@ -51,7 +59,10 @@ class UserService:
         """Create a new user."""
         # Check if user already exists
         existing_user = self.db.query(User).filter(
-            or_(User.email == user_data.email, User.username == user_data.username)
+            or_(
+                func.lower(User.email) == user_data.email.lower(),
+                func.lower(User.username) == user_data.username.lower()
+            )
         ).first()
         
         if existing_user:
@@ -152,6 +163,35 @@ class DepartmentService:
         """Get department by ID."""
         return self.db.query(Department).filter(Department.id == department_id).first()
     
+    def get_department(self, department_id: int) -> Optional[dict]:
+        """Get a serialized department, served from cache when possible."""
+        key = DEPARTMENT_CACHE_KEY.format(department_id)
+        cached = cache_get_json(key)
+        if cached is not None:
+            return cached
+        
+        department = self.get_department_by_id(department_id)
+        if not department:
+            return None
+        
+        data = DepartmentResponse.model_validate(department).model_dump(mode="json")
+        cache_set_json(key, data, settings.department_cache_ttl_seconds)
+        return data
+    
+    def get_all_departments_cached(self) -> List[dict]:
+        """Get every serialized department, served from cache when possible."""
+        cached = cache_get_json(DEPARTMENT_LIST_CACHE_KEY)
+        if cached is not None:
+            return cached
+        
+        departments = self.db.query(Department).order_by(Department.id).all()
+        data = [
+            DepartmentResponse.model_validate(dept).model_dump(mode="json")
+            for dept in departments
+        ]
+        cache_set_json(DEPARTMENT_LIST_CACHE_KEY, data, settings.department_cache_ttl_seconds)
+        return data
+    
     def get_department_by_code(self, code: str) -> Optional[Department]:
         """Get department by code."""
         return self.db.query(Department).filter(Department.code == code).first()
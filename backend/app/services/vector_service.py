@@ -2,11 +2,12 @@
 Vector Database Service for document embeddings and semantic search
 """
 import os
-import json
+import orjson
 import logging
 import asyncio
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Set, Tuple
 from pathlib import Path
+from functools import cached_property
 import numpy as np
 
 # Vector database imports
@@ -27,10 +28,13 @@ except ImportError:
     EMBEDDING_AVAILABLE = False
     logging.warning("Sentence transformers not available. Install sentence-transformers.")
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 logger = logging.getLogger(__name__)
 
+# Texts per forward pass when embedding a document's chunks
+EMBEDDING_BATCH_SIZE = 64
+
 class DocumentChunk(BaseModel):
     """Represents a chunk of document content"""
     content: str
@@ -49,6 +53,13 @@ class SearchResult(BaseModel):
     course_id: int
     chapter_name: str
 
+    model_config = ConfigDict(frozen=True, extra='forbid')
+
+    @cached_property
+    def preview(self) -> str:
+        """First 200 characters of the content, sliced once per result."""
+        return self.content[:200]
+
 class EmbeddingService:
     """Service for generating text embeddings"""
     
@@ -76,7 +87,9 @@ class EmbeddingService:
             return np.array([])
         
         try:
-            embeddings = self.model.encode(texts, show_progress_bar=True)
+            embeddings = self.model.encode(
+                texts, batch_size=EMBEDDING_BATCH_SIZE, convert_to_numpy=True, show_progress_bar=False
+            )
             return embeddings
         except Exception as e:
             logger.error(f"Failed to generate embeddings: {e}")
@@ -94,6 +107,8 @@ class FAISSVectorStore:
         self.index_path = Path(index_path)
         self.index = None
         self.metadata = {}
+        # (content digest, course_id, chapter_name) of every document with chunks in the index
+        self._indexed_documents: Set[Tuple[str, int, str]] = set()
         self._initialize_index()
     
     def _initialize_index(self):
@@ -114,8 +129,10 @@ class FAISSVectorStore:
                 self.index = faiss.read_index(str(index_file))
                 # Load metadata
                 if metadata_file.exists():
-                    with open(metadata_file, 'r') as f:
-                        self.metadata = json.load(f)
+                    # JSON object keys are strings; positions in the index are ints
+                    self.metadata = {int(idx): meta for idx, meta in orjson.loads(metadata_file.read_bytes()).items()}
+                    for meta in self.metadata.values():
+                        self._record_indexed_document(meta)
                 logger.info(f"Loaded existing FAISS index with {self.index.ntotal} vectors")
             else:
                 # Create new index
@@ -154,6 +171,7 @@ class FAISSVectorStore:
                     'course_id': chunk.course_id,
                     'chapter_name': chunk.chapter_name
                 }
+                self._record_indexed_document(self.metadata[start_id + i])
             
             logger.info(f"Added {len(chunks)} documents to FAISS index")
             self._save_index()
@@ -161,6 +179,16 @@ class FAISSVectorStore:
         except Exception as e:
             logger.error(f"Failed to add documents to FAISS index: {e}")
     
+    def _record_indexed_document(self, meta: Dict[str, Any]):
+        """Remember which document a stored chunk came from, when it carries a content digest"""
+        content_digest = meta['metadata'].get('content_digest')
+        if content_digest:
+            self._indexed_documents.add((content_digest, meta['course_id'], meta['chapter_name']))
+    
+    def has_document(self, content_digest: str, course_id: int, chapter_name: str) -> bool:
+        """Whether chunks of this content are in the index for the course/chapter"""
+        return (content_digest, course_id, chapter_name) in self._indexed_documents
+    
     def search(self, query_embedding: np.ndarray, k: int = 5) -> List[SearchResult]:
         """Search for similar documents"""
         if not self.index or self.index.ntotal == 0:
@@ -197,8 +225,9 @@ class FAISSVectorStore:
         try:
             faiss.write_index(self.index, str(self.index_path.with_suffix('.index')))
             # Save metadata
-            with open(self.index_path.with_suffix('.metadata'), 'w') as f:
-                json.dump(self.metadata, f, indent=2)
+            self.index_path.with_suffix('.metadata').write_bytes(
+                orjson.dumps(self.metadata, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_INDENT_2)
+            )
             logger.info("FAISS index saved successfully")
         except Exception as e:
             logger.error(f"Failed to save FAISS index: {e}")
@@ -260,11 +289,12 @@ class VectorStoreService:
             # Create document chunks
             doc_chunks = []
             for i, chunk_content in enumerate(chunks):
-                chunk_meta = metadata or {}
-                chunk_meta.update({
+                # Each chunk gets its own copy; sharing one dict left every chunk with the last index
+                chunk_meta = {
+                    **(metadata or {}),
                     'chunk_index': i,
                     'total_chunks': len(chunks)
-                })
+                }
                 
                 doc_chunks.append(DocumentChunk(
                     content=chunk_content,
@@ -305,11 +335,12 @@ class VectorStoreService:
             # Create document chunks from provided chunks
             doc_chunks = []
             for i, chunk_content in enumerate(chunks):
-                chunk_meta = metadata or {}
-                chunk_meta.update({
+                # Each chunk gets its own copy; sharing one dict left every chunk with the last index
+                chunk_meta = {
+                    **(metadata or {}),
                     'chunk_index': i,
                     'total_chunks': len(chunks)
-                })
+                }
                 
                 doc_chunks.append(DocumentChunk(
                     content=chunk_content,
@@ -320,9 +351,8 @@ class VectorStoreService:
                     chapter_name=chapter_name
                 ))
             
-            # Generate embeddings
-            chunk_texts = [chunk.content for chunk in doc_chunks]
-            embeddings = self.embedding_service.encode_text(chunk_texts)
+            # Generate embeddings for all chunks in one batched call
+            embeddings = self.embedding_service.encode_text(chunks)
             
             if embeddings.size == 0:
                 logger.error("Failed to generate embeddings")
@@ -366,6 +396,10 @@ class VectorStoreService:
             logger.error(f"Failed to search documents: {e}")
             return []
     
+    def is_document_indexed(self, content_digest: str, course_id: int, chapter_name: str) -> bool:
+        """Whether a document's chunks are already searchable for the course/chapter"""
+        return self.vector_store.has_document(content_digest, course_id, chapter_name)
+    
     async def get_statistics(self) -> Dict[str, Any]:
         """Get vector store statistics"""
         try:
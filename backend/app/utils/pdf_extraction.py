@@ -0,0 +1,34 @@
+"""
+Page-level PDF text extraction.
+Imports nothing but PyMuPDF so extraction worker processes start without the
+service layer (and its embedding model / vector index).
+"""
+from typing import List, Optional
+
+import fitz  # PyMuPDF
+
+# Block extraction with words split across line ends re-joined inside MuPDF
+PAGE_TEXT_FLAGS = fitz.TEXTFLAGS_BLOCKS | fitz.TEXT_DEHYPHENATE
+
+
+def extract_pages(doc: "fitz.Document", start: int, stop: int) -> List[Optional[str]]:
+    """Extract formatted page text for pages [start, stop) of an open document"""
+    page_texts: List[Optional[str]] = []
+    for page_num in range(start, stop):
+        # Block mode skips the layout pass of "text" mode
+        blocks = [block[4] for block in doc[page_num].get_text("blocks", flags=PAGE_TEXT_FLAGS) if block[6] == 0]
+        # Only keep non-empty pages; header and blocks are joined in one copy
+        if any(text and not text.isspace() for text in blocks):
+            page_texts.append("".join([f"\n--- Page {page_num + 1} ---\n", *blocks]))
+        else:
+            page_texts.append(None)
+    return page_texts
+
+
+def extract_page_range(file_path: str, start: int, stop: int) -> List[Optional[str]]:
+    """Extract pages [start, stop) from a freshly opened document.
+
+    Runs in a worker process, which opens its own handle; documents can't be shared across workers.
+    """
+    with fitz.open(file_path) as doc:
+        return extract_pages(doc, start, stop)
@@ -0,0 +1,328 @@
+"""
+Tests for the Groq LLM service.
+Covers streamed MCQ parsing, the shared concurrency limit and rate-limit/retry handling.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from groq import APIConnectionError, RateLimitError
+
+import app.services.llm_service as llm_module
+from app.services.llm_service import (
+    GROQ_BACKOFF_INITIAL_SECONDS, GROQ_MAX_RETRIES, MCQ_MAX_TOKENS_PER_QUESTION, GroqLLMService,
+    _QuestionObjectScanner, _parse_reset_seconds, _retry_after_seconds
+)
+
+
+QUESTION = '{"question": "Q?", "options": ["a", "b", "c", "d"], "correct_answer": 1, "explanation": "E"}'
+
+
+def scan(*pieces):
+    """Feed pieces to a fresh scanner and collect every completed question object."""
+    scanner = _QuestionObjectScanner()
+    return [raw for piece in pieces for raw in scanner.feed(piece)]
+
+
+class TestQuestionObjectScanner:
+    """Test incremental extraction of question objects from a streamed reply."""
+
+    def test_whole_reply(self):
+        assert scan('{"questions": [' + QUESTION + ", " + QUESTION + "]}") == [QUESTION, QUESTION]
+
+    def test_tokens_split_anywhere(self):
+        reply = '{"questions": [' + QUESTION + "," + QUESTION + "]}"
+        pieces = [reply[i:i + 3] for i in range(0, len(reply), 3)]
+        assert scan(*pieces) == [QUESTION, QUESTION]
+
+    def test_question_emitted_when_its_brace_closes(self):
+        scanner = _QuestionObjectScanner()
+        assert scanner.feed('{"questions": [' + QUESTION[:-1]) == []
+        assert scanner.feed("}") == [QUESTION]
+
+    def test_braces_inside_strings(self):
+        question = '{"question": "What does {x} or [y] mean?", "options": ["}", "{", "]", "["]}'
+        assert scan('{"questions": [' + question + "]}") == [question]
+
+    def test_escaped_quotes(self):
+        question = '{"question": "Say \\"}\\" twice", "explanation": "back\\\\slash"}'
+        assert scan('{"questions": [' + question + "]}") == [question]
+
+    def test_bare_top_level_array(self):
+        assert scan("[" + QUESTION + ", " + QUESTION + "]") == [QUESTION, QUESTION]
+
+    def test_code_fences_ignored(self):
+        reply = '```json\n{"questions": [' + QUESTION + "]}\n```"
+        assert scan(reply) == [QUESTION]
+
+
+def _chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+class _FakeStream:
+    """Async stream of reply chunks that records how many streams are open at once."""
+
+    def __init__(self, tracker, pieces):
+        self.tracker = tracker
+        self.pieces = pieces
+        self.closed = False
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        self.tracker["open"] += 1
+        self.tracker["max_open"] = max(self.tracker["max_open"], self.tracker["open"])
+        for piece in self.pieces:
+            await asyncio.sleep(0.01)
+            yield _chunk(piece)
+
+    async def close(self):
+        # The service closes every stream it opened, read to the end or not
+        if not self.closed:
+            self.closed = True
+            self.tracker["open"] -= 1
+
+
+class _FakeRawResponse:
+    def __init__(self, stream):
+        self.headers = {}
+        self._stream = stream
+
+    async def parse(self):
+        return self._stream
+
+
+def _streaming_service(tracker, pieces, max_concurrent):
+    service = GroqLLMService()
+    service.use_mock = False
+    service._semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def create(**kwargs):
+        return _FakeRawResponse(_FakeStream(tracker, pieces))
+
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+        with_raw_response=SimpleNamespace(create=create)
+    )))
+    return service
+
+
+class TestStreamedGeneration:
+    """Test that streamed generations respect the shared concurrency limit."""
+
+    def test_semaphore_held_until_stream_consumed(self):
+        tracker = {"open": 0, "max_open": 0}
+        pieces = ['{"questions": [', QUESTION, "]}"]
+        service = _streaming_service(tracker, pieces, max_concurrent=2)
+
+        async def run():
+            return await asyncio.gather(*(
+                service.generate_mcq_from_content(f"content {i}", f"topic {i}", 1, "medium")
+                for i in range(6)
+            ))
+
+        results = asyncio.run(run())
+
+        assert tracker["max_open"] == 2
+        assert all(len(questions) == 1 and questions[0].question == "Q?" for questions in results)
+
+    def test_slot_released_when_stream_stops_early(self):
+        tracker = {"open": 0, "max_open": 0}
+        pieces = ['{"questions": [', QUESTION, ", ", QUESTION, "]}"]
+        service = _streaming_service(tracker, pieces, max_concurrent=1)
+
+        async def run():
+            first = await service.generate_mcq_from_content("content a", "topic a", 1, "medium")
+            second = await service.generate_mcq_from_content("content b", "topic b", 1, "medium")
+            return first, second
+
+        first, second = asyncio.run(run())
+
+        assert len(first) == len(second) == 1
+        assert tracker["open"] == 0
+        assert not service._semaphore.locked()
+
+    def test_output_budget_scales_with_question_count(self):
+        tracker = {"open": 0, "max_open": 0}
+        pieces = ['{"questions": [', ", ".join([QUESTION] * 12), "]}"]
+        service = _streaming_service(tracker, pieces, max_concurrent=1)
+        requests = []
+        create = service.client.chat.completions.with_raw_response.create
+
+        async def recording_create(**kwargs):
+            requests.append(kwargs)
+            return await create(**kwargs)
+
+        service.client.chat.completions.with_raw_response.create = recording_create
+        questions = asyncio.run(service.generate_mcq_from_content("content", "topic", 12, "medium"))
+
+        assert len(questions) == 12
+        assert requests[0]["max_tokens"] == 12 * MCQ_MAX_TOKENS_PER_QUESTION
+
+
+def _groq_request():
+    return httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions")
+
+
+def _rate_limit_error(headers):
+    response = httpx.Response(429, headers=headers, request=_groq_request())
+    return RateLimitError("rate limited", response=response, body=None)
+
+
+class _ScriptedCompletions:
+    """Completion endpoint that raises or answers according to a script, one entry per call."""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        outcome = self.script.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+class _ParsedRawResponse:
+    def __init__(self, headers=None):
+        self.headers = headers or {}
+
+    async def parse(self):
+        return "parsed"
+
+
+@pytest.fixture
+def retry_service(monkeypatch):
+    """Service with a scriptable Groq endpoint and recorded (not real) sleeps."""
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+
+    monkeypatch.setattr(llm_module.asyncio, "sleep", fake_sleep)
+    monkeypatch.setattr(llm_module.random, "uniform", lambda low, high: 0.0)
+
+    service = GroqLLMService()
+
+    def script(*outcomes):
+        completions = _ScriptedCompletions(outcomes)
+        service.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+            with_raw_response=completions
+        )))
+        return completions
+
+    return service, script, sleeps
+
+
+class TestRateLimitHeaders:
+    """Test parsing of Groq rate-limit and retry headers."""
+
+    @pytest.mark.parametrize("value, seconds", [
+        ("1m26.4s", 86.4),
+        ("7.66s", 7.66),
+        ("480ms", 0.48),
+        ("2h", 7200),
+        ("1h2m3s", 3723),
+    ])
+    def test_reset_durations(self, value, seconds):
+        assert _parse_reset_seconds(value) == pytest.approx(seconds)
+
+    @pytest.mark.parametrize("value", [None, "", "soon", "12 parsecs", "m"])
+    def test_reset_garbage(self, value):
+        assert _parse_reset_seconds(value) is None
+
+    def test_retry_after_ms_preferred(self):
+        assert _retry_after_seconds({"retry-after-ms": "1500", "retry-after": "9"}) == 1.5
+
+    def test_retry_after_seconds(self):
+        assert _retry_after_seconds({"retry-after": "3"}) == 3.0
+
+    def test_retry_after_missing_or_invalid(self):
+        assert _retry_after_seconds({}) is None
+        assert _retry_after_seconds({"retry-after": "Wed, 21 Oct 2026 07:28:00 GMT"}) is None
+
+
+class TestGroqRetries:
+    """Test the retry/backoff loop around Groq completions."""
+
+    def test_rate_limit_honours_retry_after(self, retry_service):
+        service, script, sleeps = retry_service
+        completions = script(_rate_limit_error({"retry-after": "2"}), _ParsedRawResponse())
+
+        assert asyncio.run(service.create_chat_completion(messages=[])) == "parsed"
+        assert completions.calls == 2
+        assert sleeps == [2.0]
+
+    def test_rate_limit_without_header_uses_backoff(self, retry_service):
+        service, script, sleeps = retry_service
+        script(_rate_limit_error({}), _ParsedRawResponse())
+
+        asyncio.run(service.create_chat_completion(messages=[]))
+        assert sleeps == [GROQ_BACKOFF_INITIAL_SECONDS]
+
+    def test_connection_errors_back_off_exponentially(self, retry_service):
+        service, script, sleeps = retry_service
+        error = APIConnectionError(request=_groq_request())
+        completions = script(error, error, error, _ParsedRawResponse())
+
+        assert asyncio.run(service.create_chat_completion(messages=[])) == "parsed"
+        assert completions.calls == 4
+        assert sleeps == [GROQ_BACKOFF_INITIAL_SECONDS * 2 ** i for i in range(3)]
+
+    def test_gives_up_after_max_retries(self, retry_service):
+        service, script, sleeps = retry_service
+        error = APIConnectionError(request=_groq_request())
+        completions = script(*[error] * (GROQ_MAX_RETRIES + 1))
+
+        with pytest.raises(APIConnectionError):
+            asyncio.run(service.create_chat_completion(messages=[]))
+        assert completions.calls == GROQ_MAX_RETRIES + 1
+        assert len(sleeps) == GROQ_MAX_RETRIES
+        assert not service._semaphore.locked()
+
+
+class TestRateLimitPacing:
+    """Test pacing from the budget reported in Groq's response headers."""
+
+    def test_waits_for_reset_when_requests_exhausted(self, retry_service):
+        service, script, sleeps = retry_service
+        script(_ParsedRawResponse({
+            "x-ratelimit-remaining-requests": "0",
+            "x-ratelimit-remaining-tokens": "5000",
+            "x-ratelimit-reset-requests": "2s",
+            "x-ratelimit-reset-tokens": "480ms",
+        }), _ParsedRawResponse())
+
+        async def run():
+            await service.create_chat_completion(messages=[])
+            await service.create_chat_completion(messages=[])
+
+        asyncio.run(run())
+        assert len(sleeps) == 1
+        assert 1.5 < sleeps[0] <= 2.0
+
+    def test_waits_when_tokens_cannot_cover_call(self, retry_service):
+        service, script, sleeps = retry_service
+        service._record_rate_limits({
+            "x-ratelimit-remaining-requests": "10",
+            "x-ratelimit-remaining-tokens": "100",
+            "x-ratelimit-reset-tokens": "1m",
+        })
+
+        asyncio.run(service._wait_for_rate_limit(estimated_tokens=500))
+        assert len(sleeps) == 1 and sleeps[0] > 55
+
+    def test_no_wait_with_budget_left(self, retry_service):
+        service, script, sleeps = retry_service
+        service._record_rate_limits({
+            "x-ratelimit-remaining-requests": "10",
+            "x-ratelimit-remaining-tokens": "5000",
+            "x-ratelimit-reset-requests": "30s",
+        })
+
+        asyncio.run(service._wait_for_rate_limit(estimated_tokens=500))
+        assert sleeps == []
@@ -0,0 +1,135 @@
+"""
+Tests for weekly task scheduling.
+Runs the planner/generator/writer pipeline against an in-memory SQLite database
+with the LLM service stubbed out.
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.user import User, UserRole, Student
+from app.models.course import Chapter, CourseEnrollment
+from app.models.task import Task, TaskQuestion, TaskAssignment
+from app.services import task_service
+from app.services.llm_service import MCQQuestion
+from app.services.task_service import TASK_GENERATION_CONCURRENCY, TaskGenerationService
+
+# More students than generators, so every generator sees work and a sentinel
+STUDENT_COUNT = TASK_GENERATION_CONCURRENCY + 5
+
+
+class _StubLLMService:
+    """Answers task generation requests instantly, without calling Groq."""
+
+    async def generate_task_description(self, weak_chapters, student_performance):
+        return "Practice task"
+
+    async def generate_mcq_batch(self, items):
+        return [
+            [
+                MCQQuestion(
+                    question=f"{item['topic']} question {i}?",
+                    options=["a", "b", "c", "d"],
+                    correct_answer=0,
+                    explanation="Because a.",
+                    difficulty=item["difficulty"],
+                    chapter_topic=item["topic"]
+                )
+                for i in range(item["num_questions"])
+            ]
+            for item in items
+        ]
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """Session on a fresh in-memory database with active students enrolled in one course."""
+    monkeypatch.setattr(task_service, "llm_service", _StubLLMService())
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+
+    for i in range(1, STUDENT_COUNT + 1):
+        session.add(User(
+            id=i, email=f"student{i}@test.com", username=f"student{i}", full_name=f"Student {i}",
+            hashed_password="x", role=UserRole.STUDENT, is_active=True
+        ))
+        session.add(Student(
+            id=i, user_id=i, student_id=f"S{i:03d}", department_id=1, class_name="A",
+            semester=1, academic_year="2024-25", batch_year=2024
+        ))
+        session.add(CourseEnrollment(student_id=i, course_id=1, status="active"))
+    session.add(Chapter(id=1, course_id=1, title="Graphs", chapter_number=1))
+    session.add(Chapter(id=2, course_id=1, title="Trees", chapter_number=2))
+    session.commit()
+
+    yield session
+    session.close()
+
+
+def run_weekly(service, session):
+    """Run the weekly job, failing the test instead of hanging if the pipeline never finishes."""
+    return asyncio.run(asyncio.wait_for(service.schedule_weekly_tasks(session), timeout=10))
+
+
+class TestWeeklyScheduling:
+    """Test that the weekly job finishes and accounts for every student, whatever fails."""
+
+    def test_weekly_tasks_for_every_student(self, db):
+        results = run_weekly(TaskGenerationService(), db)
+
+        assert results == {"total_students": STUDENT_COUNT, "tasks_generated": STUDENT_COUNT, "errors": []}
+        assert db.query(Task).count() == STUDENT_COUNT
+        assert db.query(TaskAssignment).count() == STUDENT_COUNT
+        assert db.query(TaskQuestion).count() > 0
+
+    def test_failed_plan_is_reported_and_others_continue(self, db, monkeypatch):
+        service = TaskGenerationService()
+        plan = service._plan_personalized_task
+
+        async def failing_plan(session, student_id, course_id, task_type):
+            if student_id == 3:
+                raise RuntimeError("analysis failed")
+            return await plan(session, student_id, course_id, task_type)
+
+        monkeypatch.setattr(service, "_plan_personalized_task", failing_plan)
+        results = run_weekly(service, db)
+
+        assert results["tasks_generated"] == STUDENT_COUNT - 1
+        assert len(results["errors"]) == 1
+        assert "student 3" in results["errors"][0]
+        assert db.query(TaskAssignment).filter(TaskAssignment.student_id == 3).count() == 0
+
+    def test_failed_generation_is_reported_and_job_finishes(self, db, monkeypatch):
+        service = TaskGenerationService()
+        generate = service._generate_task_content
+
+        async def failing_generation(plan):
+            if plan.student_id == 5:
+                raise RuntimeError("generation failed")
+            return await generate(plan)
+
+        monkeypatch.setattr(service, "_generate_task_content", failing_generation)
+        results = run_weekly(service, db)
+
+        assert results["tasks_generated"] == STUDENT_COUNT - 1
+        assert len(results["errors"]) == 1
+        assert "student 5" in results["errors"][0]
+
+    def test_every_generation_failing_still_finishes(self, db, monkeypatch):
+        service = TaskGenerationService()
+
+        async def failing_generation(plan):
+            raise RuntimeError("LLM unavailable")
+
+        monkeypatch.setattr(service, "_generate_task_content", failing_generation)
+        results = run_weekly(service, db)
+
+        assert results["tasks_generated"] == 0
+        assert len(results["errors"]) == STUDENT_COUNT
+        assert db.query(Task).count() == 0